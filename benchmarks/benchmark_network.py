@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark building and simulating large networks.
+
+Builds randomly wired networks of two-input NAND gates of increasing size and
+reports the time taken to build them, the memory they use and the time taken
+to simulate one cycle with each of the network engines, toggling one switch
+before every cycle. The time and memory per device should stay roughly
+constant as the number of devices grows.
+
+Usage
+-----
+python benchmarks/benchmark_network.py [<number of devices> ...]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from names import Names  # noqa: E402
+from devices import Devices  # noqa: E402
+from network import Network  # noqa: E402
+
+DEFAULT_SIZES = [1000, 2000, 4000, 8000, 16000]
+NUMBER_OF_SWITCHES = 16
+NUMBER_OF_CYCLES = 5
+ENGINES = [
+    "DICT_ENGINE",
+    "COMPILED_ENGINE",
+    "EVENT_ENGINE",
+    "LEVELIZED_ENGINE",
+    "CODEGEN_ENGINE",
+]
+try:
+    import numpy  # noqa: F401
+
+    ENGINES.append("VECTORISED_ENGINE")
+except ImportError:  # the vectorised engine requires numpy
+    pass
+
+
+def build_network(number_of_gates, seed=0):
+    """Return a network of NAND gates fed by a few switches.
+
+    Every gate is driven by the outputs of two earlier devices, so the network
+    is acyclic and settles quickly.
+    """
+    generator = random.Random(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+
+    [I1, I2] = names.lookup(["I1", "I2"])
+    switch_ids = names.lookup(
+        ["".join(["SW", str(i)]) for i in range(NUMBER_OF_SWITCHES)]
+    )
+    gate_ids = names.lookup(
+        ["".join(["G", str(i)]) for i in range(number_of_gates)]
+    )
+
+    for switch_id in switch_ids:
+        devices.make_device(switch_id, devices.SWITCH, generator.randrange(2))
+    sources = list(switch_ids)
+    for gate_id in gate_ids:
+        devices.make_device(gate_id, devices.NAND, 2)
+        network.make_connection(generator.choice(sources), None, gate_id, I1)
+        network.make_connection(generator.choice(sources), None, gate_id, I2)
+        sources.append(gate_id)
+
+    return network
+
+
+def measure_memory(number_of_gates):
+    """Return the number of bytes allocated to build the network."""
+    tracemalloc.start()
+    network = build_network(number_of_gates)  # kept until it is measured
+    network.devices.store.update_fanouts()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del network
+    return allocated
+
+
+def time_cycles(network, engine, cycles=NUMBER_OF_CYCLES):
+    """Return the mean time taken to execute one simulation cycle."""
+    devices = network.devices
+    [switch_id] = devices.find_devices(devices.SWITCH)[:1]
+    network.engine = getattr(network, engine)
+    network.execute_network()  # compile the network if the engine needs it
+    start = time.perf_counter()
+    for cycle in range(cycles):
+        devices.set_switch(switch_id, cycle % 2)
+        if not network.execute_network():
+            raise RuntimeError("Network oscillating.")
+    return (time.perf_counter() - start) / cycles
+
+
+def main(arg_list):
+    """Run the benchmark for the network sizes given in arg_list."""
+    sizes = [int(arg) for arg in arg_list] or DEFAULT_SIZES
+    print(
+        "{:>10} {:>12} {:>16}".format("devices", "build (s)", "bytes/device")
+        + "".join(
+            " {:>24}".format(engine + " us/device") for engine in ENGINES
+        )
+    )
+    for size in sizes:
+        start = time.perf_counter()
+        network = build_network(size)
+        build_time = time.perf_counter() - start
+        number_of_devices = size + NUMBER_OF_SWITCHES
+        row = "{:>10} {:>12.3f} {:>16.0f}".format(
+            number_of_devices,
+            build_time,
+            measure_memory(size) / number_of_devices,
+        )
+        for engine in ENGINES:
+            cycle_time = time_cycles(network, engine)
+            row += " {:>24.2f}".format(cycle_time * 1e6 / number_of_devices)
+        print(row)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,288 @@
+"""Generate and compile a Python function that executes the network.
+
+Used in the Logic Simulator project to remove the overhead of interpreting
+the network for every device in every iteration. The generated source of a
+network can be cached on disk, so that it is only generated once.
+
+SPHINX-IGNORE
+Classes
+-------
+CodegenNetwork - compiled network executed by generated Python code.
+SPHINX-IGNORE
+"""
+import hashlib
+import os
+import tempfile
+
+
+class CodegenNetwork:
+    """Compiled network executed by a generated Python function.
+
+    The source of a settle() function is generated from the flat arrays of
+    network.get_compiled_network(). Every signal and D-type memory is held in
+    a local variable, and every device is executed with inlined straight-line
+    code in the same order as Network.execute_network(), so that it gives
+    the same results as executing the Device objects.
+
+    If cache_directory is given, the source is stored there in a file named
+    after the hash of the netlist, and is read from it instead of being
+    generated again.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    network:
+        instance of the network.Network() class.
+    cache_directory:
+        directory of the cached sources, or None.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    get_netlist_hash(self):
+        Returns the hash of the compiled network.
+    generate_source(self):
+        Returns the source of the settle function.
+    execute_network(self):
+        Executes all the devices in the network for one simulation cycle.
+    SPHINX-IGNORE
+    """
+
+    # Change whenever the generated source changes, to invalidate the cache
+    source_format = 1
+
+    def __init__(self, devices, network, cache_directory=None):
+        """Generate or load the source and compile the settle function."""
+        self.devices = devices
+        self.network = network
+        self.compiled = network.get_compiled_network()
+        self.cache_directory = cache_directory
+
+        self.netlist_hash = self.get_netlist_hash()
+        self.source = None
+        self.settle = None
+        if not self.compiled.complete:
+            return  # code cannot be generated for unconnected inputs
+        if cache_directory is not None:
+            self.source = self._read_cache()
+        if self.source is None:
+            self.source = self.generate_source()
+            if cache_directory is not None:
+                self._write_cache()
+
+        namespace = {}
+        exec(compile(self.source, self._cache_path(), "exec"), namespace)
+        self.settle = namespace["settle"]
+
+    def get_netlist_hash(self):
+        """Return the hash of the compiled network."""
+        compiled = self.compiled
+        digest = hashlib.sha256()
+        digest.update(str(self.source_format).encode())
+        for values in [
+            compiled.kinds,
+            compiled.output_slots,
+            compiled.fanin_start,
+            compiled.fanin,
+            self.devices.signal_types,
+        ]:
+            digest.update(repr(list(values)).encode())
+        return digest.hexdigest()
+
+    def _cache_path(self):
+        """Return the path of the cached source."""
+        file_name = "".join(["logsim_", self.netlist_hash, ".py"])
+        if self.cache_directory is None:
+            return file_name
+        return os.path.join(self.cache_directory, file_name)
+
+    def _read_cache(self):
+        """Return the cached source, or None if it is not cached."""
+        try:
+            with open(self._cache_path()) as cache_file:
+                return cache_file.read()
+        except OSError:
+            return None
+
+    def _write_cache(self):
+        """Store the source in the cache directory."""
+        os.makedirs(self.cache_directory, exist_ok=True)
+        # Write to a temporary file first so that a partly written file is
+        # never read
+        handle, temporary_path = tempfile.mkstemp(
+            dir=self.cache_directory, suffix=".tmp"
+        )
+        with os.fdopen(handle, "w") as cache_file:
+            cache_file.write(self.source)
+        os.replace(temporary_path, self._cache_path())
+
+    def generate_source(self):
+        """Return the source of the settle function.
+
+        settle(signals, switch_states, memories, limit) executes all devices
+        until the signals settle, and returns True if they settle within
+        limit iterations.
+        """
+        compiled = self.compiled
+        devices = self.devices
+        LOW, HIGH, RISING, FALLING = (
+            devices.LOW,
+            devices.HIGH,
+            devices.RISING,
+            devices.FALLING,
+        )
+        number_of_slots = len(compiled.slots)
+        first_d_type = compiled.kind_ranges[compiled.D_TYPE][0]
+        first_switch = compiled.kind_ranges[compiled.SWITCH][0]
+
+        lines = [
+            "def settle(signals, switch_states, memories, limit):",
+            "    tl = {!r}".format(compiled.towards_low),
+            "    th = {!r}".format(compiled.towards_high),
+        ]
+        lines += [
+            "    s{0} = signals[{0}]".format(slot)
+            for slot in range(number_of_slots)
+        ]
+        first, last = compiled.kind_ranges[compiled.D_TYPE]
+        lines += [
+            "    m{0} = memories[{0}]".format(index)
+            for index in range(last - first)
+        ]
+        first, last = compiled.kind_ranges[compiled.SWITCH]
+        lines += [
+            "    w{0} = switch_states[{0}]".format(index)
+            for index in range(last - first)
+        ]
+        lines += [
+            "    steady = True",
+            "    iterations = 0",
+            "    while iterations < limit:",
+            "        iterations += 1",
+            "        steady = True",
+        ]
+
+        def update(slot, low_condition):
+            """Return the lines updating the slot towards its target."""
+            return [
+                "        n = tl[s{0}] if {1} else th[s{0}]".format(
+                    slot, low_condition
+                ),
+                "        if n != s{0}:".format(slot),
+                "            s{0} = n".format(slot),
+                "            steady = False",
+            ]
+
+        gate_rules = {
+            compiled.AND: (HIGH, HIGH),
+            compiled.OR: (LOW, LOW),
+            compiled.NAND: (HIGH, LOW),
+            compiled.NOR: (LOW, HIGH),
+        }
+        for number, kind_code in enumerate(compiled.kinds):
+            output_slot = compiled.output_slots[number]
+            inputs = [
+                "s" + str(slot)
+                for slot in compiled.fanin[
+                    compiled.fanin_start[number] : compiled.fanin_start[
+                        number + 1
+                    ]
+                ]
+            ]
+            # Names are not part of the netlist hash, so only the device
+            # numbers are given
+            lines.append("        # device {}".format(number))
+            if kind_code == compiled.SWITCH:
+                lines += update(
+                    output_slot, "w{} == {}".format(number - first_switch, LOW)
+                )
+            elif kind_code == compiled.D_TYPE:
+                clock_signal, set_signal, clear_signal, data_signal = inputs
+                memory = "m" + str(number - first_d_type)
+                lines += [
+                    "        if {} == {}:".format(clock_signal, RISING),
+                    "            if {0} == {1} or {0} == {2}:".format(
+                        data_signal, HIGH, FALLING
+                    ),
+                    "                {} = {}".format(memory, HIGH),
+                    "            elif {0} == {1} or {0} == {2}:".format(
+                        data_signal, LOW, RISING
+                    ),
+                    "                {} = {}".format(memory, LOW),
+                    "        if {} == {}:".format(set_signal, HIGH),
+                    "            {} = {}".format(memory, HIGH),
+                    "        if {} == {}:".format(clear_signal, HIGH),
+                    "            {} = {}".format(memory, LOW),
+                ]
+                lines += update(output_slot, "{} == {}".format(memory, LOW))
+                lines += update(
+                    output_slot + 1, "{} == {}".format(memory, HIGH)
+                )
+            elif kind_code == compiled.CLOCK:
+                lines += [
+                    "        if s{} == {}:".format(output_slot, RISING),
+                    "            s{} = {}".format(output_slot, HIGH),
+                    "            steady = False",
+                    "        elif s{} == {}:".format(output_slot, FALLING),
+                    "            s{} = {}".format(output_slot, LOW),
+                    "            steady = False",
+                ]
+            elif kind_code == compiled.NOT:
+                lines += update(
+                    output_slot, "{} == {}".format(inputs[0], HIGH)
+                )
+            elif kind_code == compiled.XOR:
+                lines += update(
+                    output_slot, "{} == {}".format(inputs[0], inputs[1])
+                )
+            else:
+                # If all the inputs are x, then the output is y, else the
+                # output is the inverse of y
+                x, y = gate_rules[kind_code]
+                all_x = " and ".join(
+                    "{} == {}".format(signal, x) for signal in inputs
+                )
+                if y == LOW:
+                    lines += update(output_slot, "({})".format(all_x))
+                else:
+                    lines += update(output_slot, "not ({})".format(all_x))
+
+        lines += [
+            "        if steady:",
+            "            break",
+        ]
+        lines += [
+            "    signals[{0}] = s{0}".format(slot)
+            for slot in range(number_of_slots)
+        ]
+        first, last = compiled.kind_ranges[compiled.D_TYPE]
+        lines += [
+            "    memories[{0}] = m{0}".format(index)
+            for index in range(last - first)
+        ]
+        lines.append("    return steady")
+        return "\n".join(lines) + "\n"
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Return True if successful and the network does not oscillate.
+        """
+        compiled = self.compiled
+        compiled.load_state()
+        compiled.update_clocks()
+        if self.settle is None:
+            result = False
+        elif self.devices.BLANK in compiled.signals:
+            # The generated code assumes that every signal can be updated
+            result = compiled.settle()
+        else:
+            result = self.settle(
+                compiled.signals,
+                compiled.switch_states,
+                compiled.dtype_memories,
+                self.network.get_iteration_limit(),
+            )
+        compiled.store_state()
+        return result
@@ -9,47 +9,131 @@ Device - stores device properties.
 Devices - makes and stores all the devices in the logic network.
 """
 import random
+from array import array
 
 from names import Names
+from store import DeviceStore, InputPorts, OutputSignals
+from store import NONE, from_stored, to_stored
 from symbol_types import DeviceType, DTypeInputType, DTypeOutputType
 
 
 class Device:
     """Store device properties.
 
+    A Device is a view of the properties of one device in the DeviceStore
+    of the devices.Devices() class, so that every property is held in an
+    array. A new view is made whenever a device is looked up, and views of
+    the same device compare equal. inputs and outputs behave as
+    dictionaries.
+
     Parameters
     ----------
-    device_id:
-        device ID.
+    store:
+        instance of the store.DeviceStore() class.
+    index:
+        index of the device in the store.
 
     Methods
     -------
     No public methods.
     """
 
-    def __init__(self, device_id: int):
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: DeviceStore, index: int):
         """Initialise device properties."""
-        self.device_id = device_id
+        self._store = store
+        self._index = index
+
+    def __eq__(self, other):
+        """Return True if both views are of the same device."""
+        if not isinstance(other, Device):
+            return NotImplemented
+        return self._store is other._store and self._index == other._index
+
+    def __hash__(self):
+        """Return the hash of the index of the device."""
+        return hash(self._index)
+
+    @property
+    def inputs(self):
+        """Return the inputs dictionary.
+
+        It stores
+        {input_id: (connected_output_device_id, connected_output_port_id)}.
+        """
+        return InputPorts(self._store, self._index)
+
+    @property
+    def outputs(self):
+        """Return the outputs dictionary, which stores {output_id: signal}."""
+        return OutputSignals(self._store, self._index)
+
+    @property
+    def device_id(self):
+        """Return the device ID."""
+        return self._store.device_ids[self._index]
+
+    @property
+    def device_kind(self):
+        """Return the device kind."""
+        return from_stored(self._store.kinds[self._index])
+
+    @device_kind.setter
+    def device_kind(self, device_kind):
+        """Set the device kind."""
+        self._store.kinds[self._index] = to_stored(device_kind)
+
+    @property
+    def clock_half_period(self):
+        """Return the clock half period, or None."""
+        return from_stored(self._store.clock_half_periods[self._index])
+
+    @clock_half_period.setter
+    def clock_half_period(self, clock_half_period):
+        """Set the clock half period."""
+        self._store.clock_half_periods[self._index] = to_stored(
+            clock_half_period
+        )
 
-        # inputs dictionary stores
-        # {input_id: (connected_output_device_id, connected_output_port_id)}
-        self.inputs = {}
+    @property
+    def clock_counter(self):
+        """Return the clock counter, or None."""
+        return from_stored(self._store.clock_counters[self._index])
 
-        # outputs dictionary stores {output_id: output_signal}
-        self.outputs = {}
+    @clock_counter.setter
+    def clock_counter(self, clock_counter):
+        """Set the clock counter."""
+        self._store.clock_counters[self._index] = to_stored(clock_counter)
 
-        self.device_kind = None
-        self.clock_half_period = None
-        self.clock_counter = None
-        self.switch_state = None
-        self.dtype_memory = None
+    @property
+    def switch_state(self):
+        """Return the switch state, or None."""
+        return from_stored(self._store.switch_states[self._index])
+
+    @switch_state.setter
+    def switch_state(self, switch_state):
+        """Set the switch state."""
+        self._store.switch_states[self._index] = to_stored(switch_state)
+
+    @property
+    def dtype_memory(self):
+        """Return the D-type memory, or None."""
+        return from_stored(self._store.dtype_memories[self._index])
+
+    @dtype_memory.setter
+    def dtype_memory(self, dtype_memory):
+        """Set the D-type memory."""
+        self._store.dtype_memories[self._index] = to_stored(dtype_memory)
 
 
 class Devices:
     """Make and store devices.
 
     This class contains many functions for making devices and ports.
-    It stores all the devices in a list.
+    The properties and ports of all the devices are held in the arrays of a
+    DeviceStore, indexed by device ID and by device kind so that lookups do
+    not have to scan the devices. The Device objects are views of them.
 
     Parameters
     ----------
@@ -60,10 +144,14 @@ class Devices:
     -------
     get_device(self, device_id):
         Returns the Device object corresponding to the device ID.
+    get_store_index(self, device_id):
+        Returns the index of the device in the store.
     find_devices(self, device_kind=None):
         Returns a list of device_ids of the specified device_kind.
     add_device(self, device_id, device_kind):
         Adds the specified device to the network.
+    remove_device(self, device_id):
+        Removes the specified device from the network.
     add_input(self, device_id, input_id):
         Adds the specified input to the specified device.
     add_output(self, device_id, output_id, signal=0):
@@ -76,23 +164,35 @@ class Devices:
         Sets switch_state of specified device to signal.
     make_switch(self, device_id, initial_state):
         Makes a switch device and sets its initial state.
-    make_clock(self, device_id, clock_half_period):
+    make_clock(self, device_id, clock_half_period, cold_start=True):
         Makes a clock device with the specified half period.
     make_gate(self, device_id, device_kind, no_of_inputs):
         Makes logic gates with the specified number of inputs.
-    make_d_type(self, device_id):
+    make_d_type(self, device_id, cold_start=True):
         Makes a D-type device.
     cold_startup(self):
         Simulates cold start-up of D-types and clocks.
     make_device(self, device_id, device_kind, device_property=None):
         Creates the specified device and returns errors if unsuccessful.
+    make_devices(self, device_ids, device_kind, device_property=None,
+        cold_start=True):
+        Creates the specified devices of one kind and returns their errors.
     """
 
     def __init__(self, names: Names):
         """Initialise devices list and constants."""
         self.names = names
 
-        self.devices_list = []
+        self.store = DeviceStore()
+        # _kind_index stores {device_kind: array of device IDs} in the order
+        # the devices were added
+        self._kind_index = {}
+        # structure_version is incremented whenever a device or port is added
+        # or removed, so that compiled forms of the network can be rebuilt
+        self.structure_version = 0
+        # startup_count is incremented by every cold start-up, which changes
+        # the state of the D-types and clocks outside of a simulation cycle
+        self.startup_count = 0
 
         [
             self.NO_ERROR,
@@ -156,13 +256,35 @@ class Devices:
         )
 
         self.max_gate_inputs = 16
+        # _gate_input_ids caches the IDs of the gate inputs I1, I2, ...
+        self._gate_input_ids = []
+
+    @property
+    def devices_list(self):
+        """Return views of all the devices in the order they were added."""
+        store = self.store
+        return [
+            Device(store, index)
+            for index, device_id in enumerate(store.device_ids)
+            if device_id != NONE
+        ]
+
+    def get_store_index(self, device_id):
+        """Return the index of the device in the store, or None."""
+        try:
+            index = self.store.device_indices[device_id]
+        except (IndexError, TypeError):
+            return None
+        if index == NONE or device_id < 0:
+            return None
+        return index
 
     def get_device(self, device_id: int):
         """Return the Device object corresponding to device_id."""
-        for device in self.devices_list:
-            if device.device_id == device_id:
-                return device
-        return None
+        index = self.get_store_index(device_id)
+        if index is None:
+            return None
+        return Device(self.store, index)
 
     def find_devices(self, device_kind=None):
         """Return a list of device IDs of the specified device_kind.
@@ -170,19 +292,50 @@ class Devices:
         Return a list of all device IDs in the network if no device_kind is
         specified.
         """
-        device_id_list = []
-        for device in self.devices_list:
-            if device_kind is None:
-                device_id_list.append(device.device_id)
-            elif device.device_kind == device_kind:
-                device_id_list.append(device.device_id)
-        return device_id_list
+        if device_kind is None:
+            return [
+                device_id
+                for device_id in self.store.device_ids
+                if device_id != NONE
+            ]
+        return list(self._kind_index.get(device_kind, ()))
 
     def add_device(self, device_id, device_kind):
-        """Add the specified device to the network."""
-        new_device = Device(device_id)
-        new_device.device_kind = device_kind
-        self.devices_list.append(new_device)
+        """Add the specified device to the network.
+
+        Nothing is added if there is already a device with the device ID.
+        """
+        if self.get_store_index(device_id) is not None:
+            return
+        self.store.add_device(device_id, device_kind)
+        self._kind_index.setdefault(device_kind, array("i")).append(device_id)
+        self.structure_version += 1
+
+    def remove_device(self, device_id):
+        """Remove the specified device from the network.
+
+        Return True if successful. The inputs connected to the outputs of
+        the removed device are disconnected.
+        """
+        index = self.get_store_index(device_id)
+        if index is None:
+            return False
+        self._kind_index[from_stored(self.store.kinds[index])].remove(
+            device_id
+        )
+        self.store.remove_device(index)
+        self.structure_version += 1
+        return True
+
+    def _set_new_ports(self, device_id, input_ids, output_ids):
+        """Give a new device unconnected inputs and LOW outputs."""
+        self.store.set_ports(
+            self.get_store_index(device_id),
+            input_ids,
+            output_ids,
+            [(NONE, NONE)] * len(input_ids),
+            [self.LOW] * len(output_ids),
+        )
 
     def add_input(self, device_id, input_id):
         """Add the specified input to the specified device.
@@ -191,7 +344,9 @@ class Devices:
         """
         device = self.get_device(device_id)
         if device is not None:
-            device.inputs.setdefault(input_id)
+            if input_id not in device.inputs:
+                device.inputs[input_id] = None
+                self.structure_version += 1
             return True
         else:
             return False
@@ -203,6 +358,8 @@ class Devices:
         """
         device = self.get_device(device_id)
         if device is not None:
+            if output_id not in device.outputs:
+                self.structure_version += 1
             device.outputs[output_id] = signal
             return True
         else:
@@ -258,38 +415,68 @@ class Devices:
     def make_switch(self, device_id, initial_state):
         """Make a switch device and set its initial state."""
         self.add_device(device_id, self.SWITCH)
-        self.add_output(device_id, output_id=None)
+        self._set_new_ports(device_id, (), (None,))
         self.set_switch(device_id, initial_state)
 
-    def make_clock(self, device_id, clock_half_period):
+    def make_clock(self, device_id, clock_half_period, cold_start=True):
         """Make a clock device with the specified half period.
 
         clock_half_period is an integer > 0. It is the number of simulation
-        cycles before the clock switches state.
+        cycles before the clock switches state. If cold_start is False, the
+        clock starts LOW at the beginning of its cycle until cold_startup()
+        is called.
         """
         self.add_device(device_id, self.CLOCK)
+        self._set_new_ports(device_id, (), (None,))
         device = self.get_device(device_id)
         device.clock_half_period = clock_half_period
-        self.cold_startup()  # clock initialised to a random point in its cycle
+        device.clock_counter = 0
+        if cold_start:
+            # Clock initialised to a random point in its cycle
+            self._cold_start_device(device)
+
+    def _get_gate_input_ids(self, no_of_inputs):
+        """Return the IDs of the inputs I1, I2, ... of a gate."""
+        while len(self._gate_input_ids) < no_of_inputs:
+            input_name = "".join(["I", str(len(self._gate_input_ids) + 1)])
+            self._gate_input_ids.extend(self.names.lookup([input_name]))
+        return self._gate_input_ids[:no_of_inputs]
 
     def make_gate(self, device_id, device_kind, no_of_inputs):
         """Make logic gates with the specified number of inputs."""
         self.add_device(device_id, device_kind)
-        self.add_output(device_id, output_id=None)
+        self._set_new_ports(
+            device_id, self._get_gate_input_ids(no_of_inputs), (None,)
+        )
 
-        for input_number in range(1, no_of_inputs + 1):
-            input_name = "".join(["I", str(input_number)])
-            [input_id] = self.names.lookup([input_name])
-            self.add_input(device_id, input_id)
+    def make_d_type(self, device_id, cold_start=True):
+        """Make a D-type device.
 
-    def make_d_type(self, device_id):
-        """Make a D-type device."""
+        If cold_start is False, its memory is LOW until cold_startup() is
+        called.
+        """
         self.add_device(device_id, self.D_TYPE)
-        for input_id in self.dtype_input_ids:
-            self.add_input(device_id, input_id)
-        for output_id in self.dtype_output_ids:
-            self.add_output(device_id, output_id)
-        self.cold_startup()  # D-type initialised to a random state
+        self._set_new_ports(
+            device_id, self.dtype_input_ids, self.dtype_output_ids
+        )
+        device = self.get_device(device_id)
+        device.dtype_memory = self.LOW
+        if cold_start:
+            # D-type initialised to a random state
+            self._cold_start_device(device)
+
+    def _cold_start_device(self, device):
+        """Simulate cold start-up of the device if it is a D-type or clock."""
+        if device.device_kind == self.D_TYPE:
+            device.dtype_memory = random.choice([self.LOW, self.HIGH])
+
+        elif device.device_kind == self.CLOCK:
+            clock_signal = random.choice([self.LOW, self.HIGH])
+            self.add_output(
+                device.device_id, output_id=None, signal=clock_signal
+            )
+            # Initialise it to a random point in its cycle.
+            device.clock_counter = random.randrange(device.clock_half_period)
 
     def cold_startup(self):
         """Simulate cold start-up of D-types and clocks.
@@ -297,80 +484,98 @@ class Devices:
         Set the memory of the D-types to a random state and make the clocks
         begin from a random point in their cycles.
         """
-        for device in self.devices_list:
-            if device.device_kind == self.D_TYPE:
-                device.dtype_memory = random.choice([self.LOW, self.HIGH])
-
-            elif device.device_kind == self.CLOCK:
-                clock_signal = random.choice([self.LOW, self.HIGH])
-                self.add_output(
-                    device.device_id, output_id=None, signal=clock_signal
-                )
-                # Initialise it to a random point in its cycle.
-                device.clock_counter = random.randrange(
-                    device.clock_half_period
-                )
+        self.startup_count += 1
+        for device_kind in [self.D_TYPE, self.CLOCK]:
+            for device_id in self._kind_index.get(device_kind, ()):
+                self._cold_start_device(self.get_device(device_id))
 
-    def make_device(self, device_id, device_kind, device_property=None):
-        """Create the specified device.
+    def _check_qualifier(self, device_kind, device_property):
+        """Return self.NO_ERROR if the device property suits the device kind.
 
-        Return self.NO_ERROR if successful. Return corresponding error if not.
+        Return the corresponding error if not.
         """
-        # Device has already been added to the devices_list
-        if self.get_device(device_id) is not None:
-            error_type = self.DEVICE_PRESENT
-
-        elif device_kind == self.SWITCH:
+        if device_kind == self.SWITCH:
             # Device property is the switch initial state: 0(LOW) or 1(HIGH)
             if device_property is None:
-                error_type = self.NO_QUALIFIER
+                return self.NO_QUALIFIER
             elif device_property not in [self.LOW, self.HIGH]:
-                error_type = self.INVALID_QUALIFIER
-            else:
-                self.make_switch(device_id, device_property)
-                error_type = self.NO_ERROR
+                return self.INVALID_QUALIFIER
 
         elif device_kind == self.CLOCK:
             # Device property is the clock half period > 0
             if device_property is None:
-                error_type = self.NO_QUALIFIER
+                return self.NO_QUALIFIER
             elif device_property <= 0:
-                error_type = self.INVALID_QUALIFIER
-            else:
-                self.make_clock(device_id, device_property)
-                error_type = self.NO_ERROR
+                return self.INVALID_QUALIFIER
+
+        elif device_kind in [self.NOT, self.XOR, self.D_TYPE]:
+            if device_property is not None:
+                return self.QUALIFIER_PRESENT
 
         elif device_kind in self.gate_types:
             # Device property is the number of inputs
-            if device_kind == self.NOT:
-                if device_property is not None:
-                    error_type = self.QUALIFIER_PRESENT
-                else:
-                    self.make_gate(device_id, device_kind, 1)
-                    error_type = self.NO_ERROR
-            elif device_kind == self.XOR:
-                if device_property is not None:
-                    error_type = self.QUALIFIER_PRESENT
-                else:
-                    self.make_gate(device_id, device_kind, 2)
-                    error_type = self.NO_ERROR
-            else:  # other gates
-                if device_property is None:
-                    error_type = self.NO_QUALIFIER
-                elif device_property not in range(1, 17):  # between 1 and 16
-                    error_type = self.INVALID_QUALIFIER
-                else:
-                    self.make_gate(device_id, device_kind, device_property)
-                    error_type = self.NO_ERROR
+            if device_property is None:
+                return self.NO_QUALIFIER
+            elif device_property not in range(1, self.max_gate_inputs + 1):
+                return self.INVALID_QUALIFIER
 
-        elif device_kind == self.D_TYPE:
-            if device_property is not None:
-                error_type = self.QUALIFIER_PRESENT
-            else:
-                self.make_d_type(device_id)
-                error_type = self.NO_ERROR
+        else:
+            return self.BAD_DEVICE
+
+        return self.NO_ERROR
 
+    def _build_device(
+        self, device_id, device_kind, device_property, cold_start=True
+    ):
+        """Create a device whose device property has been checked."""
+        if device_kind == self.SWITCH:
+            self.make_switch(device_id, device_property)
+        elif device_kind == self.CLOCK:
+            self.make_clock(device_id, device_property, cold_start)
+        elif device_kind == self.D_TYPE:
+            self.make_d_type(device_id, cold_start)
+        elif device_kind == self.NOT:
+            self.make_gate(device_id, device_kind, 1)
+        elif device_kind == self.XOR:
+            self.make_gate(device_id, device_kind, 2)
         else:
-            error_type = self.BAD_DEVICE
+            self.make_gate(device_id, device_kind, device_property)
+
+    def make_device(self, device_id, device_kind, device_property=None):
+        """Create the specified device.
 
+        Return self.NO_ERROR if successful. Return corresponding error if not.
+        """
+        # Device has already been added to the devices_list
+        if self.get_device(device_id) is not None:
+            return self.DEVICE_PRESENT
+
+        error_type = self._check_qualifier(device_kind, device_property)
+        if error_type == self.NO_ERROR:
+            self._build_device(device_id, device_kind, device_property)
         return error_type
+
+    def make_devices(
+        self, device_ids, device_kind, device_property=None, cold_start=True
+    ):
+        """Create the specified devices, which all have the same kind.
+
+        The device property is only checked once. If cold_start is False,
+        new D-types and clocks are not started up, so that a whole network
+        can be built with a single cold_startup() at the end. Return a list
+        of the error of each device, which is self.NO_ERROR if it was
+        created.
+        """
+        error_type = self._check_qualifier(device_kind, device_property)
+        errors = []
+        for device_id in device_ids:
+            if self.get_device(device_id) is not None:
+                errors.append(self.DEVICE_PRESENT)
+            elif error_type != self.NO_ERROR:
+                errors.append(error_type)
+            else:
+                self._build_device(
+                    device_id, device_kind, device_property, cold_start
+                )
+                errors.append(self.NO_ERROR)
+        return errors
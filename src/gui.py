@@ -30,6 +30,7 @@ from devices import Devices
 from monitors import Monitors
 from network import Network
 from scanner import Scanner
+from simulator import Simulator
 from parse import Parser
 from exceptions import Errors
 
@@ -50,6 +51,8 @@ class Gui(wx.Frame):
     devices: Devices
     network: Network
     monitors: Monitors
+    processes: int
+        Number of processes to run the network with.
 
     SPHINX-IGNORE
     Public Methods
@@ -73,6 +76,7 @@ class Gui(wx.Frame):
         devices: Devices,
         network: Network,
         monitors: Monitors,
+        processes: int = 1,
     ):
         """Initialise widgets and layout."""
         super().__init__(parent=None, title=title, size=(1200, 820))
@@ -80,6 +84,8 @@ class Gui(wx.Frame):
         self.names = names
         self.network = network
         self.monitors = monitors
+        self.processes = processes
+        self.simulator = Simulator(devices, network, monitors, processes)
         self.cycles_completed = [0]  # use list to force pass by reference
 
         # Open maximised
@@ -189,6 +195,9 @@ class Gui(wx.Frame):
         self.devices = Devices(self.names)
         self.network = Network(self.names, self.devices)
         self.monitors = Monitors(self.names, self.devices, self.network)
+        self.simulator = Simulator(
+            self.devices, self.network, self.monitors, self.processes
+        )
         self.cycles_completed[0] = 0
 
         errors = Errors()
@@ -266,19 +275,25 @@ class Gui(wx.Frame):
         Return True if successful.
         """
         self.Canvas.signals = []
-        for i in range(cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
-                print(_("Error! Network oscillating."))
-                return False
+        if not self.simulator.run(cycles):
+            cycle = self.simulator.get_oscillation_report()[0]
+            print(_("Error! Network oscillating in cycle {}.").format(cycle))
+            for message in self.simulator.get_oscillation_messages():
+                print(message)
+            return False
         # self.monitors.display_signals()
+        # Only draw the cycles still held in every trace, as the older ones
+        # are dropped while dumping
+        held_cycles = self.monitors.get_held_cycles()
         for (
             device_id,
             pin_id,
         ), value in self.monitors.monitors_dictionary.items():
             signal_name = self.devices.get_signal_name(device_id, pin_id)
-            self.Canvas.signals.append([signal_name, value])
+            self.Canvas.signals.append(
+                [signal_name, value[len(value) - held_cycles :]]
+            )
+        self.Canvas.first_cycle = self.simulator.cycles_completed - held_cycles
         self.Canvas.cycles = cycles
         self.Canvas.render()
         return True
@@ -113,6 +113,7 @@ class Canvas(wxcanvas.GLCanvas):
         # for single output devices, signal_name is device_name.
         # for double output devices (d-type),
         # signal_name is device_name + '.Q' or '.QBAR'
+        self.first_cycle = 0  # cycle of the first level in the signals
 
         self.Bind(wx.EVT_PAINT, self.on_paint)
         self.Bind(wx.EVT_SIZE, self.on_size)
@@ -166,7 +167,9 @@ class Canvas(wxcanvas.GLCanvas):
                 GL.glColor3f(1, 1, 1)  # White text
                 # X-axis labels (time)
                 self.render_text(
-                    str(i), 125 + i * self.scale_x, size.height - 30
+                    str(self.first_cycle + i),
+                    125 + i * self.scale_x,
+                    size.height - 30,
                 )
                 # Generate vertical grid lines
                 GL.glColor3f(0.6, 0.6, 0.6)  # light grey grid lines
@@ -180,8 +183,6 @@ class Canvas(wxcanvas.GLCanvas):
                 GL.glEnd()
             # Draw signals
             for i, signal in enumerate(self.signals, 1):
-                signal_copy = signal[-1].copy()
-                signal_copy.insert(0, signal_copy[0])
                 # Draw two horizontal gridlines for each signal
                 GL.glColor3f(0.6, 0.6, 0.6)
                 GL.glLineWidth(0.25)
@@ -191,16 +192,15 @@ class Canvas(wxcanvas.GLCanvas):
                 )  # Horizontal line at value of 0
                 GL.glVertex2f(
                     130
-                    + len(
-                        self.signals[0][-1] * 50
-                    ),  # lines extend depending on number of cycles
+                    + len(self.signals[0][-1])
+                    * 50,  # lines extend depending on number of cycles
                     size.height - 2 * i * self.scale_y,
                 )
                 GL.glVertex2f(
                     130, size.height - 2 * i * self.scale_y + self.scale_y
                 )  # Horizontal line at value of 1
                 GL.glVertex2f(
-                    130 + len(self.signals[0][-1] * 50),
+                    130 + len(self.signals[0][-1]) * 50,
                     size.height - 2 * i * self.scale_y + self.scale_y,
                 )
                 GL.glEnd()
@@ -211,7 +211,7 @@ class Canvas(wxcanvas.GLCanvas):
                 GL.glLineWidth(3)
                 # Draw signal line
                 self.draw_signal(
-                    signal_copy,
+                    signal[-1].get_buffer(),
                     (130, size.height - 2 * i * self.scale_y),
                     colour_index,
                 )
@@ -316,11 +316,15 @@ class Canvas(wxcanvas.GLCanvas):
         self.Refresh()  # triggers the paint event
 
     def draw_signal(self, signal, offset, colour_index):
-        """Draw line for a given signal."""
-        self.max_X = self.scale_x * (len(signal) - 1)
+        """Draw line for a given signal.
+
+        The signal levels are read in place, and the first level is drawn
+        for an extra cycle at the start.
+        """
+        self.max_X = self.scale_x * len(signal)
         GL.glBegin(GL.GL_LINE_STRIP)
-        for i in range(len(signal)):
-            sig_val = signal[i]
+        for i in range(len(signal) + 1):
+            sig_val = signal[max(i - 1, 0)]
             # Choose colour
             GL.glColor3f(
                 self.line_colours[colour_index][0],
@@ -342,16 +346,15 @@ class Canvas(wxcanvas.GLCanvas):
                     offset[0] + i * self.scale_x, offset[1] + self.scale_y
                 )
 
-            try:
-                if signal[i + 1] != 0:
-                    if signal[i + 1] != 1:
-                        signal[i + 1] = 0.01
-                next_val = (signal[i + 1]) * self.scale_y
+            if i < len(signal):
+                next_val = signal[i]
+                if next_val != 0:
+                    if next_val != 1:
+                        next_val = 0.01
                 GL.glVertex2f(
-                    offset[0] + i * self.scale_x, offset[1] + next_val
+                    offset[0] + i * self.scale_x,
+                    offset[1] + next_val * self.scale_y,
                 )
-            except IndexError:
-                pass
         GL.glEnd()
 
 
@@ -1023,7 +1026,7 @@ class ConnectionsWidget(wx.BoxSizer):
         if pin2_id is not None:
             connection += "." + self.names.get_name_string(pin2_id)
 
-        first_device.inputs[pin1_id] = None
+        self.network.break_connection(device1_id, pin1_id)
         print(
             _(
                 "Successfully broke connection {}. "
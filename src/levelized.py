@@ -0,0 +1,318 @@
+"""Execute the network with the logic gates in topological order.
+
+Used in the Logic Simulator project to execute deep combinational networks,
+which need one iteration of Network.execute_network() per level of logic.
+
+SPHINX-IGNORE
+Classes
+-------
+LevelizedNetwork - compiled network that executes gates in level order.
+SPHINX-IGNORE
+"""
+from netlist import CompiledNetwork
+
+
+class LevelizedNetwork(CompiledNetwork):
+    """Compiled network that executes the logic gates in level order.
+
+    The strongly connected components of the graph of gates are found once.
+    A component of more than one gate, or of a gate connected to itself, is
+    a feedback loop, and every other gate is acyclic. The components are
+    sorted into levels, where a component is one level above the highest
+    level component connected to its inputs. Switch, D-type and clock
+    outputs have no level, which cuts every path through a D-type.
+
+    Each pass executes the switches, D-types and clocks as before, and then
+    the components level by level. An acyclic gate is executed once, and
+    the gates of a loop are executed until their outputs stop changing, up
+    to the iteration limit of the loop. A loop that does not settle leaves
+    the pass unsteady, as its inputs may still be changing in it. Acyclic
+    logic therefore settles in a fixed number of passes whatever its depth,
+    and a loop that still does not settle in the last pass is reported in
+    oscillating_loop.
+
+    Gates read RISING inputs as HIGH and FALLING inputs as LOW, so that every
+    gate sees the final value of its inputs within a pass. D-types still see
+    the RISING and FALLING signals, and so still catch clock edges.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    network:
+        instance of the network.Network() class.
+
+    Attributes
+    ----------
+    levels: list
+        Device numbers of the acyclic gates on each level.
+    loops: list
+        Device numbers of the gates of each feedback loop.
+    gate_order: list
+        Device numbers of all gates in execution order.
+    oscillating_loop: list
+        Device IDs of the first loop that did not settle in the last pass of
+        the last cycle, if it failed to settle, or None.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    get_loop_device_ids(self):
+        Returns the device IDs of the gates of each feedback loop.
+    get_loop_limit(self, loop):
+        Returns the iteration limit of the loop.
+    settle(self):
+        Executes all devices until the signals settle.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self, devices, network):
+        """Compile the network and sort its gates into levels."""
+        super().__init__(devices, network)
+
+        # Final value of each signal, None for BLANK
+        self.resolved = [None] * len(devices.signal_types)
+        for signal in [devices.LOW, devices.FALLING]:
+            self.resolved[signal] = devices.LOW
+        for signal in [devices.HIGH, devices.RISING]:
+            self.resolved[signal] = devices.HIGH
+
+        # (x, y) pairs of the gates: if all inputs are x, the output is y
+        self.gate_rules = {
+            self.AND: (devices.HIGH, devices.HIGH),
+            self.OR: (devices.LOW, devices.LOW),
+            self.NAND: (devices.HIGH, devices.LOW),
+            self.NOR: (devices.LOW, devices.HIGH),
+        }
+
+        self.levels = []
+        self.loops = []
+        # schedule holds the device number of each acyclic gate and the list
+        # of device numbers of each loop, in execution order
+        self.schedule = []
+        self._levelize()
+        self.gate_order = []
+        for item in self.schedule:
+            if isinstance(item, list):
+                self.gate_order.extend(item)
+            else:
+                self.gate_order.append(item)
+        self.oscillating_loop = None
+        # Loops that did not settle in the current pass
+        self.unsettled_loops = []
+
+    def _get_gate_fanouts(self):
+        """Return {number: [numbers of the gates its output is connected to]}.
+
+        Only connections from one gate to another are included.
+        """
+        first_gate = self.kind_ranges[self.NOT][0]
+        fanouts = {
+            number: [] for number in range(first_gate, len(self.device_list))
+        }
+        for number in fanouts:
+            start, end = self.fanin_start[number], self.fanin_start[number + 1]
+            for slot in self.fanin[start:end]:
+                source = self.slot_devices[slot] if slot >= 0 else -1
+                if source >= first_gate:
+                    fanouts[source].append(number)
+        return fanouts
+
+    def _find_components(self, fanouts):
+        """Return the strongly connected components in topological order.
+
+        Uses an iterative form of Tarjan's algorithm, which finds the
+        components in reverse topological order.
+        """
+        index = {}
+        lowest = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in fanouts:
+            if root in index:
+                continue
+            index[root] = lowest[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, 0)]
+            while work:
+                number, next_fanout = work[-1]
+                if next_fanout < len(fanouts[number]):
+                    work[-1] = (number, next_fanout + 1)
+                    fanout = fanouts[number][next_fanout]
+                    if fanout not in index:
+                        index[fanout] = lowest[fanout] = len(index)
+                        stack.append(fanout)
+                        on_stack.add(fanout)
+                        work.append((fanout, 0))
+                    elif fanout in on_stack:
+                        lowest[number] = min(lowest[number], index[fanout])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowest[parent] = min(lowest[parent], lowest[number])
+                if lowest[number] == index[number]:
+                    component = []
+                    member = None
+                    while member != number:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                    components.append(sorted(component))
+        components.reverse()
+        return components
+
+    def _levelize(self):
+        """Sort the strongly connected components of the gates into levels."""
+        fanouts = self._get_gate_fanouts()
+        components = self._find_components(fanouts)
+
+        component_levels = {}  # {gate number: level of its component}
+        scheduled = []  # (level, position, component)
+        for position, component in enumerate(components):
+            level = 0
+            for number in component:
+                start = self.fanin_start[number]
+                end = self.fanin_start[number + 1]
+                for slot in self.fanin[start:end]:
+                    source = self.slot_devices[slot] if slot >= 0 else -1
+                    if source in component_levels:
+                        level = max(level, component_levels[source] + 1)
+            for number in component:
+                component_levels[number] = level
+            scheduled.append((level, position, component))
+
+        for level, position, component in sorted(scheduled):
+            while len(self.levels) <= level:
+                self.levels.append([])
+            [number] = component[:1]
+            if len(component) > 1 or number in fanouts[number]:
+                self.loops.append(component)
+                self.schedule.append(component)
+            else:
+                self.levels[level].append(number)
+                self.schedule.append(number)
+
+    def get_loop_device_ids(self):
+        """Return the device IDs of the gates of each feedback loop."""
+        return [
+            [self.device_ids[number] for number in loop] for loop in self.loops
+        ]
+
+    def _execute_gate(self, number):
+        """Simulate the gate and update its output signal.
+
+        Return False if the output cannot be updated.
+        """
+        devices = self.devices
+        signals = self.signals
+        resolved = self.resolved
+        kind_code = self.kinds[number]
+        input_slots = self.fanin[
+            self.fanin_start[number] : self.fanin_start[number + 1]
+        ]
+        if kind_code == self.NOT:
+            target = devices.LOW
+            if resolved[signals[input_slots[0]]] != devices.HIGH:
+                target = devices.HIGH
+        elif kind_code == self.XOR:
+            # Output is high only if both inputs are different
+            target = devices.HIGH
+            if (
+                resolved[signals[input_slots[0]]]
+                == resolved[signals[input_slots[1]]]
+            ):
+                target = devices.LOW
+        else:
+            # If all the inputs are x, then the output is y, else the output
+            # is the inverse of y
+            x, y = self.gate_rules[kind_code]
+            target = y
+            for slot in input_slots:
+                if resolved[signals[slot]] != x:
+                    target = devices.LOW if y == devices.HIGH else devices.HIGH
+                    break
+        if target == devices.LOW:
+            towards = self.towards_low
+        else:
+            towards = self.towards_high
+        return self._update_slot(self.output_slots[number], towards)
+
+    def get_loop_limit(self, loop):
+        """Return the iteration limit of the loop.
+
+        This is the largest limit set in network.loop_iteration_limits for a
+        device in the loop, or network.iteration_limit if there is none.
+        """
+        limits = self.network.loop_iteration_limits
+        loop_limits = [
+            limits[self.device_ids[number]]
+            for number in loop
+            if self.device_ids[number] in limits
+        ]
+        if loop_limits:
+            return max(loop_limits)
+        return self.network.iteration_limit
+
+    def _execute_loop(self, loop):
+        """Execute the gates of the loop until their outputs stop changing.
+
+        Return False if a gate cannot be executed. If the loop does not
+        settle within its iteration limit, the pass is not steady and the
+        loop is kept in unsettled_loops.
+        """
+        resolved = self.resolved
+        signals = self.signals
+        for _ in range(self.get_loop_limit(loop)):
+            changed = False
+            for number in loop:
+                slot = self.output_slots[number]
+                old_signal = resolved[signals[slot]]
+                if not self._execute_gate(number):
+                    return False
+                if resolved[signals[slot]] != old_signal:
+                    changed = True
+            if not changed:
+                return True
+        self.steady_state = False
+        self.unsettled_loops.append(loop)
+        return True
+
+    def settle(self):
+        """Execute all devices until the signals settle.
+
+        Return True if successful and the signals settle within the
+        iteration limit of the network.
+        """
+        self.oscillating_loop = None
+        if not self.complete:
+            return False
+        iterations = 0
+        while iterations < self.network.iteration_limit:
+            iterations += 1
+            self.steady_state = True
+            self.unsettled_loops = []
+            if not (
+                self._execute_switches()
+                # Execute D-type devices before clocks to catch the rising
+                # edge of the clock
+                and self._execute_d_types()
+                and self._execute_clocks()
+            ):
+                return False
+            for item in self.schedule:
+                if isinstance(item, list):
+                    if not self._execute_loop(item):
+                        return False
+                elif not self._execute_gate(item):
+                    return False
+            if self.steady_state:
+                break
+        if self.unsettled_loops:
+            self.oscillating_loop = [
+                self.device_ids[number] for number in self.unsettled_loops[0]
+            ]
+        return self.steady_state
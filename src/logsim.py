@@ -7,8 +7,16 @@ runs either the command line user interface or the graphical user interface.
 Usage
 -----
 Show help: logsim.py -h
-Command line user interface: logsim.py -c <file path>
-Graphical user interface: logsim.py [<file path>]
+Command line user interface:
+    logsim.py [-j <processes>] [-r] [-d <VCD path>] -c <file path>
+Graphical user interface:
+    logsim.py [-j <processes>] [-r] [-d <VCD path>] [<file path>]
+
+The -j option runs the independent parts of the network in the given number
+of processes. The -r option records the monitored signals as runs of equal
+levels, which saves memory when they rarely change. The -d option writes the
+monitored signals to a Value Change Dump file as they are simulated, and
+only keeps their last cycles in memory.
 """
 import getopt
 from pathlib import Path
@@ -77,12 +85,31 @@ def main(arg_list):
     usage_message = (
         "Usage:\n"
         "Show help: logsim.py -h\n"
-        "Command line user interface: logsim.py -c <file path>\n"
-        "Graphical user interface: logsim.py [<file path>]"
+        "Command line user interface: "
+        "logsim.py [-j <processes>] [-r] [-d <VCD path>] -c <file path>\n"
+        "Graphical user interface: "
+        "logsim.py [-j <processes>] [-r] [-d <VCD path>] [<file path>]"
     )
     try:
-        options, arguments = getopt.getopt(arg_list, "hc:")
-    except getopt.GetoptError:
+        options, arguments = getopt.getopt(arg_list, "hc:j:rd:")
+        # The number of processes, the trace type and the dump file apply to
+        # either user interface
+        processes = 1
+        run_length_traces = False
+        dump_path = None
+        for option, value in options:
+            if option == "-j":
+                processes = int(value)
+                if processes < 1:
+                    raise ValueError
+            elif option == "-r":
+                run_length_traces = True
+            elif option == "-d":
+                dump_path = value
+        options = [
+            option for option in options if option[0] not in ["-j", "-r", "-d"]
+        ]
+    except (getopt.GetoptError, ValueError):
         print("Error: invalid command line arguments\n")
         print(usage_message)
         sys.exit()
@@ -92,6 +119,7 @@ def main(arg_list):
     devices = Devices(names)
     network = Network(names, devices)
     monitors = Monitors(names, devices, network)
+    monitors.run_length_traces = run_length_traces
 
     for option, path in options:
         if option == "-h":  # print the usage message
@@ -105,8 +133,13 @@ def main(arg_list):
             if parser.errors.error_counter > 0:
                 parser.errors.print_error_messages(names, scanner)
                 return
+            if dump_path is not None and not monitors.start_dump(dump_path):
+                print("Error: could not open " + dump_path)
+                return
             # Initialise an instance of the userint.UserInterface() class
-            userint = UserInterface(names, devices, network, monitors)
+            userint = UserInterface(
+                names, devices, network, monitors, processes
+            )
             userint.command_interface()
 
     if not options:  # no option given, use the graphical user interface
@@ -121,13 +154,23 @@ def main(arg_list):
             if parser.errors.error_counter > 0:
                 parser.errors.print_error_messages(names, scanner)
                 return
+        if dump_path is not None and not monitors.start_dump(dump_path):
+            print("Error: could not open " + dump_path)
+            return
 
         app = App()
         gui = Gui(
-            _("Logic Simulator"), path, names, devices, network, monitors
+            _("Logic Simulator"),
+            path,
+            names,
+            devices,
+            network,
+            monitors,
+            processes,
         )
         gui.Show(True)
         app.MainLoop()
+        monitors.stop_dump()
 
 
 if __name__ == "__main__":
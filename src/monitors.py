@@ -10,17 +10,34 @@ Monitors - records and displays specified output signals.
 """
 from typing import Union
 import collections
+import operator
 
 from names import Names
 from devices import Devices
 from network import Network
+from traces import SignalTrace, RunLengthTrace
+from vcd import VcdWriter
 
 
 class Monitors:
     """Record and display output signals.
 
     This class contains functions for recording and displaying the signal state
-    of outputs specified by their device and port IDs.
+    of outputs specified by their device and port IDs. The signal levels of
+    each monitor are recorded in a traces.SignalTrace(), or if
+    run_length_traces is set, in a traces.RunLengthTrace(), which is much
+    smaller for signals that rarely change.
+
+    The position of each monitored output in the store of the devices is
+    found once, and again only after a monitor is made or removed or the
+    devices change, so that the signals of all the monitors are read in one
+    gather when they are recorded.
+
+    The signals can also be streamed to a Value Change Dump file as they are
+    recorded, by start_dump(). Only the last cycles of the traces are then
+    kept in memory, so that it does not grow with the length of the run, and
+    no monitor can be made until stop_dump(), as the file declares every
+    signal before the first cycle.
 
     Parameters
     ----------
@@ -39,12 +56,22 @@ class Monitors:
         Removes a monitor from the specified output.
     get_monitor_signal(self, device_id, output_id):
         Returns the signal level of the specified monitor.
-    record_signals(self):
+    record_signals(self, cycles=1):
         Records the current signal level of all monitors.
+    repeat_signals(self, period, repeats):
+        Repeats the last period of the signal levels of all monitors.
     get_signal_names(self):
         Returns two lists of signal names: monitored and not monitored.
     reset_monitors(self):
         Clears the memory of all monitors.
+    get_memory_sizes(self):
+        Returns the number of bytes used by the trace of each monitor.
+    get_held_cycles(self):
+        Returns the number of last cycles held in every trace.
+    start_dump(self, path, tail_cycles=1000):
+        Starts writing the monitored signals to a VCD file.
+    stop_dump(self):
+        Stops writing the monitored signals and closes the VCD file.
     get_margin(self):
         Returns the length of the longest monitor's name.
     display_signals(self):
@@ -58,14 +85,26 @@ class Monitors:
         self.devices = devices
 
         # monitors_dictionary stores
-        # {(device_id, output_id): [signal_list]}
+        # {(device_id, output_id): SignalTrace of the signal levels}
         self.monitors_dictionary = collections.OrderedDict()
+        # Incremented whenever a monitor is made or removed
+        self.monitor_version = 0
+        # (versions, gather function) of the monitored outputs, or None
+        self._signal_gather = None
+        # Set to True to record new traces as runs of equal signal levels
+        self.run_length_traces = False
+        # VcdWriter of the current dump, or None, the monitors it declares,
+        # and the number of cycles kept in the traces while dumping
+        self.vcd_writer = None
+        self._dump_monitors = []
+        self._tail_cycles = None
 
         [
             self.NO_ERROR,
             self.NOT_OUTPUT,
             self.MONITOR_PRESENT,
-        ] = self.names.unique_error_codes(3)
+            self.DUMP_STARTED,
+        ] = self.names.unique_error_codes(4)
 
     def make_monitor(
         self,
@@ -84,16 +123,30 @@ class Monitors:
             return self.NOT_OUTPUT
         elif (device_id, output_id) in self.monitors_dictionary:
             return self.MONITOR_PRESENT
+        elif self.vcd_writer is not None:
+            # The dump has already declared its signals
+            return self.DUMP_STARTED
         else:
             # If n simulation cycles have been completed before making this
-            # monitor, then initialise the signal trace with an n-length list
-            # of BLANK signals. Otherwise, initialise the trace with an empty
-            # list.
-            self.monitors_dictionary[(device_id, output_id)] = [
-                self.devices.BLANK
-            ] * cycles_completed
+            # monitor, then initialise the signal trace with n BLANK signals.
+            # Otherwise, initialise the trace empty.
+            if self.monitors_dictionary:
+                # Only pad the new trace to the cycles kept in the others
+                cycles_completed = min(
+                    cycles_completed, self.get_held_cycles()
+                )
+            signal_trace = self._make_trace()
+            signal_trace.append(self.devices.BLANK, cycles_completed)
+            self.monitors_dictionary[(device_id, output_id)] = signal_trace
+            self.monitor_version += 1
             return self.NO_ERROR
 
+    def _make_trace(self):
+        """Return an empty trace of the type set by run_length_traces."""
+        if self.run_length_traces:
+            return RunLengthTrace()
+        return SignalTrace()
+
     def remove_monitor(self, device_id, output_id):
         """Remove the specified signal from the monitors dictionary.
 
@@ -103,6 +156,7 @@ class Monitors:
             return False
         else:
             del self.monitors_dictionary[(device_id, output_id)]
+            self.monitor_version += 1
             return True
 
     def get_monitor_signal(self, device_id, output_id):
@@ -115,16 +169,179 @@ class Monitors:
         else:
             return None
 
-    def record_signals(self):
+    def _get_signal_gather(self):
+        """Return a function that gives the signals of all the monitors.
+
+        The function takes the output_signals array of the store, and
+        returns the signal level of each monitor in order, or None for a
+        monitor whose output no longer exists. It is only made again after
+        the monitors or the devices change.
+        """
+        version = (self.devices.structure_version, self.monitor_version)
+        if self._signal_gather is None or self._signal_gather[0] != version:
+            store = self.devices.store
+            positions = []
+            for device_id, output_id in self.monitors_dictionary:
+                index = self.devices.get_store_index(device_id)
+                if index is None:
+                    positions.append(None)
+                else:
+                    positions.append(
+                        store.get_output_position(index, output_id)
+                    )
+
+            if None in positions:
+
+                def gather(output_signals):
+                    return [
+                        None if position is None else output_signals[position]
+                        for position in positions
+                    ]
+
+            elif len(positions) == 1:
+                [position] = positions
+
+                def gather(output_signals):
+                    return (output_signals[position],)
+
+            elif positions:
+                gather = operator.itemgetter(*positions)
+            else:
+
+                def gather(output_signals):
+                    return ()
+
+            self._signal_gather = (version, gather)
+        return self._signal_gather[1]
+
+    def record_signals(self, cycles=1):
         """Record the current signal level for every monitor.
 
-        This function is called at every simulation cycle.
+        This function is called at every simulation cycle, or once for a
+        number of cycles in which the signals do not change.
         """
-        for device_id, output_id in self.monitors_dictionary:
-            signal_level = self.get_monitor_signal(device_id, output_id)
-            self.monitors_dictionary[(device_id, output_id)].append(
-                signal_level
+        signal_levels = self._get_signal_gather()(
+            self.devices.store.output_signals
+        )
+        for signal_trace, signal_level in zip(
+            self.monitors_dictionary.values(), signal_levels
+        ):
+            signal_trace.append(signal_level, cycles)
+        if self.vcd_writer is not None:
+            monitor_levels = dict(zip(self.monitors_dictionary, signal_levels))
+            self.vcd_writer.write_signals(
+                [
+                    monitor_levels.get(monitor)
+                    for monitor in self._dump_monitors
+                ],
+                cycles,
             )
+            self._trim_traces()
+
+    def repeat_signals(self, period, repeats):
+        """Repeat the last period of the signal levels of all monitors.
+
+        The signal levels recorded in the last period cycles are appended
+        repeats times, for a network that has returned to an earlier state.
+        Return True if successful, or False if the traces kept while dumping
+        do not hold the whole period.
+        """
+        if any(
+            len(signal_trace) < period
+            for signal_trace in self.monitors_dictionary.values()
+        ):
+            return False
+        if self.vcd_writer is not None:
+            segments = self._get_dump_segments(period)
+            if len(segments) == 1:
+                [(signals, cycles)] = segments
+                self.vcd_writer.write_signals(signals, cycles * repeats)
+            else:
+                for _ in range(repeats):
+                    for signals, cycles in segments:
+                        self.vcd_writer.write_signals(signals, cycles)
+        for signal_trace in self.monitors_dictionary.values():
+            signal_trace.repeat(period, repeats)
+        if self.vcd_writer is not None:
+            self._trim_traces()
+        return True
+
+    def _get_dump_segments(self, period):
+        """Return the signals of the dump in the last period cycles.
+
+        Return a list of (signals, cycles) pairs, one for each stretch of
+        cycles in which no dumped signal changes.
+        """
+        # Remaining runs of each dumped monitor, with the first run last
+        monitor_runs = []
+        for monitor in self._dump_monitors:
+            if monitor in self.monitors_dictionary:
+                signal_trace = self.monitors_dictionary[monitor]
+                runs = signal_trace[len(signal_trace) - period :].get_runs()
+            else:
+                runs = [(None, period)]
+            monitor_runs.append([list(run) for run in reversed(runs)])
+
+        segments = []
+        while monitor_runs and monitor_runs[0]:
+            cycles = min(runs[-1][1] for runs in monitor_runs)
+            signals = []
+            for runs in monitor_runs:
+                signals.append(runs[-1][0])
+                runs[-1][1] -= cycles
+                if runs[-1][1] == 0:
+                    runs.pop()
+            segments.append((signals, cycles))
+        if not segments:
+            segments.append(([], period))
+        return segments
+
+    def _trim_traces(self):
+        """Keep only the last cycles of the traces while dumping.
+
+        Each trace is trimmed once it holds twice the cycles to keep, so
+        that trimming takes amortised constant time for every cycle.
+        """
+        tail_cycles = self._tail_cycles
+        if tail_cycles is None:
+            return
+        for monitor, signal_trace in self.monitors_dictionary.items():
+            if len(signal_trace) > 2 * tail_cycles:
+                self.monitors_dictionary[monitor] = signal_trace[
+                    len(signal_trace) - tail_cycles :
+                ]
+
+    def start_dump(self, path, tail_cycles=1000):
+        """Start writing the monitored signals to a VCD file at path.
+
+        Every signal monitored now is declared in the file, and the signal
+        levels of each cycle recorded from now on are written to it. Only
+        the last tail_cycles cycles, and at most as many again, are kept in
+        the traces. If tail_cycles is None, the whole traces are kept.
+
+        Return True if successful, or False if the file cannot be opened.
+        """
+        self.stop_dump()
+        self._dump_monitors = list(self.monitors_dictionary)
+        signal_names = [
+            self.devices.get_signal_name(device_id, output_id)
+            for device_id, output_id in self._dump_monitors
+        ]
+        try:
+            self.vcd_writer = VcdWriter(self.devices, path, signal_names)
+        except OSError:
+            return False
+        self._tail_cycles = tail_cycles
+        self._trim_traces()
+        return True
+
+    def stop_dump(self):
+        """Stop writing the monitored signals and close the VCD file."""
+        if self.vcd_writer is not None:
+            self.vcd_writer.close()
+        self.vcd_writer = None
+        self._dump_monitors = []
+        self._tail_cycles = None
 
     def get_signal_names(self):
         """Return two signal name lists: monitored and not monitored."""
@@ -148,10 +365,30 @@ class Monitors:
     def reset_monitors(self):
         """Clear the memory of all the monitors.
 
-        The list of stored signal levels for each monitor is deleted.
+        The stored signal levels of each monitor are deleted.
         """
         for device_id, output_id in self.monitors_dictionary:
-            self.monitors_dictionary[(device_id, output_id)] = []
+            self.monitors_dictionary[
+                (device_id, output_id)
+            ] = self._make_trace()
+
+    def get_memory_sizes(self):
+        """Return {(device_id, output_id): bytes used by its trace}."""
+        return {
+            monitor: signal_trace.get_memory_size()
+            for monitor, signal_trace in self.monitors_dictionary.items()
+        }
+
+    def get_held_cycles(self):
+        """Return the number of last cycles held in every trace.
+
+        This is fewer than the cycles completed once the traces have been
+        trimmed while dumping.
+        """
+        return min(
+            (len(trace) for trace in self.monitors_dictionary.values()),
+            default=0,
+        )
 
     def get_margin(self):
         """Return the length of the longest monitor's name.
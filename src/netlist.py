@@ -0,0 +1,464 @@
+"""Compile the network into flat integer arrays and execute it.
+
+Used in the Logic Simulator project as an alternative to walking the Device
+objects of the network on every simulation cycle.
+
+SPHINX-IGNORE
+Classes
+-------
+CompiledNetwork - flat array representation of a built network.
+SPHINX-IGNORE
+"""
+from array import array
+
+
+class CompiledNetwork:
+    """Flat array representation of a built network.
+
+    Every device output is given one signal slot, and every device is given
+    a kind code and a list of fan-in slots, which are the slots of the
+    outputs connected to its inputs. Devices are numbered in the order in
+    which Network.execute_network() executes them: switches, D-types, clocks,
+    NOT, AND, OR, NAND, NOR and XOR gates, so that executing the arrays gives
+    the same results as executing the Device objects.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    network:
+        instance of the network.Network() class.
+
+    Attributes
+    ----------
+    slots: list
+        (device_id, output_id) of each signal slot.
+    slot_index: dict
+        Maps (device_id, output_id) to its signal slot.
+    signals: array
+        Signal level of each slot.
+    device_ids: list
+        Device ID of each device, in execution order.
+    store_indices: array
+        Index of each device in the device store.
+    kinds: array
+        Kind code of each device.
+    output_slots: array
+        First output slot of each device. The QBAR slot of a D-type follows
+        its Q slot.
+    slot_devices: array
+        Number of the device that owns each signal slot.
+    store_positions: array
+        Position of each signal slot in the output signals of the device
+        store.
+    fanin_start: array
+        Start of the fan-in slots of each device in fanin, followed by the
+        total number of fan-in slots.
+    fanin: array
+        Fan-in slots of all devices, -1 for an unconnected input. D-type
+        inputs are ordered CLK, SET, CLEAR, DATA.
+    kind_ranges: list
+        (first, last + 1) device numbers of each kind code.
+    complete: bool
+        True if all inputs are connected.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    load_state(self):
+        Copies signals, switch states, clock counters and D-type memories
+        from the Device objects.
+    store_state(self):
+        Copies signals, clock counters and D-type memories back to the
+        Device objects.
+    update_clocks(self):
+        If it is time to do so, sets clock signals to RISING or FALLING.
+    settle(self):
+        Executes all devices until the signals settle.
+    get_oscillating_devices(self):
+        Returns the devices that were still changing when the last cycle
+        failed to settle.
+    execute_network(self):
+        Executes all the devices in the network for one simulation cycle.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self, devices, network):
+        """Compile the devices and connections into flat arrays."""
+        self.devices = devices
+        self.network = network
+
+        self.kind_codes = [
+            self.SWITCH,
+            self.D_TYPE,
+            self.CLOCK,
+            self.NOT,
+            self.AND,
+            self.OR,
+            self.NAND,
+            self.NOR,
+            self.XOR,
+        ] = range(9)
+        device_kinds = [
+            devices.SWITCH,
+            devices.D_TYPE,
+            devices.CLOCK,
+            devices.NOT,
+            devices.AND,
+            devices.OR,
+            devices.NAND,
+            devices.NOR,
+            devices.XOR,
+        ]
+
+        # Signal level reached when updating each signal towards LOW or HIGH,
+        # None if the signal cannot be updated
+        self.towards_low = [None] * len(devices.signal_types)
+        self.towards_high = [None] * len(devices.signal_types)
+        for signal in [devices.LOW, devices.FALLING]:
+            self.towards_low[signal] = devices.LOW
+            self.towards_high[signal] = devices.RISING
+        for signal in [devices.HIGH, devices.RISING]:
+            self.towards_low[signal] = devices.FALLING
+            self.towards_high[signal] = devices.HIGH
+
+        self.device_list = []  # Device objects in execution order
+        self.device_ids = []
+        self.store_indices = array("l")
+        self.kinds = array("b")
+        self.kind_ranges = []
+        for kind_code, device_kind in zip(self.kind_codes, device_kinds):
+            first = len(self.device_list)
+            for device_id in devices.find_devices(device_kind):
+                self.device_list.append(devices.get_device(device_id))
+                self.device_ids.append(device_id)
+                self.store_indices.append(devices.get_store_index(device_id))
+                self.kinds.append(kind_code)
+            self.kind_ranges.append((first, len(self.device_list)))
+
+        # Give every output a signal slot
+        self.slots = []
+        self.slot_index = {}
+        self.output_slots = array("l")
+        self.slot_devices = array("l")
+        # Position of each slot in the output signals of the device store
+        self.store_positions = array("l")
+        for number, device in enumerate(self.device_list):
+            self.output_slots.append(len(self.slots))
+            for output_id in self._output_ids(device):
+                self.slot_devices.append(number)
+                self.slot_index[(device.device_id, output_id)] = len(
+                    self.slots
+                )
+                self.slots.append((device.device_id, output_id))
+                self.store_positions.append(
+                    devices.store.get_output_position(
+                        self.store_indices[number], output_id
+                    )
+                )
+
+        # Resolve every input to the slot of the output connected to it
+        self.complete = True
+        self.fanin_start = array("l")
+        self.fanin = array("l")
+        for device in self.device_list:
+            self.fanin_start.append(len(self.fanin))
+            for input_id in self._input_ids(device):
+                slot = self.slot_index.get(device.inputs[input_id], -1)
+                if slot == -1:
+                    self.complete = False
+                self.fanin.append(slot)
+        self.fanin_start.append(len(self.fanin))
+
+        self.signals = array("b", [devices.LOW] * len(self.slots))
+        self.switch_states = []
+        self.dtype_memories = []
+        self.clock_counters = []
+        self.clock_half_periods = []
+        self.steady_state = True
+        self.changing_slots = set()  # slots changing in tracked iterations
+
+    def _output_ids(self, device):
+        """Return the output IDs of the device in slot order."""
+        if device.device_kind == self.devices.D_TYPE:
+            return self.devices.dtype_output_ids
+        return list(device.outputs)
+
+    def _input_ids(self, device):
+        """Return the input IDs of the device in fan-in order."""
+        if device.device_kind == self.devices.D_TYPE:
+            return self.devices.dtype_input_ids
+        return list(device.inputs)
+
+    def _store_indices_of_kind(self, kind_code):
+        """Return the store indices of the devices of the given kind code."""
+        first, last = self.kind_ranges[kind_code]
+        return self.store_indices[first:last]
+
+    def load_state(self):
+        """Copy the signals and device states from the device store."""
+        store = self.devices.store
+        output_signals = store.output_signals
+        self.signals = array(
+            "b",
+            [output_signals[position] for position in self.store_positions],
+        )
+        self.switch_states = [
+            store.switch_states[index]
+            for index in self._store_indices_of_kind(self.SWITCH)
+        ]
+        self.dtype_memories = [
+            store.dtype_memories[index]
+            for index in self._store_indices_of_kind(self.D_TYPE)
+        ]
+        clocks = self._store_indices_of_kind(self.CLOCK)
+        self.clock_counters = [store.clock_counters[index] for index in clocks]
+        self.clock_half_periods = [
+            store.clock_half_periods[index] for index in clocks
+        ]
+
+    def store_state(self):
+        """Copy the signals and device states back to the device store."""
+        store = self.devices.store
+        output_signals = store.output_signals
+        for position, signal in zip(self.store_positions, self.signals):
+            output_signals[position] = signal
+        for index, memory in zip(
+            self._store_indices_of_kind(self.D_TYPE), self.dtype_memories
+        ):
+            store.dtype_memories[index] = memory
+        for index, counter in zip(
+            self._store_indices_of_kind(self.CLOCK), self.clock_counters
+        ):
+            store.clock_counters[index] = counter
+
+    def _update_slot(self, slot, towards):
+        """Update the signal in the slot using the towards table.
+
+        Return False if the signal cannot be updated, and set steady_state to
+        False if the signal changes.
+        """
+        signal = self.signals[slot]
+        new_signal = towards[signal]
+        if new_signal is None:
+            return False
+        if new_signal != signal:
+            self.signals[slot] = new_signal
+            self.steady_state = False
+        return True
+
+    def _execute_switches(self):
+        """Update the switch outputs towards the switch states."""
+        first, last = self.kind_ranges[self.SWITCH]
+        for number, switch_state in zip(
+            range(first, last), self.switch_states
+        ):
+            if switch_state == self.devices.LOW:
+                towards = self.towards_low
+            else:
+                towards = self.towards_high
+            if not self._update_slot(self.output_slots[number], towards):
+                return False
+        return True
+
+    def _execute_d_types(self):
+        """Simulate the D-types and update their output signals."""
+        devices = self.devices
+        signals = self.signals
+        fanin = self.fanin
+        first, last = self.kind_ranges[self.D_TYPE]
+        for index, number in enumerate(range(first, last)):
+            start = self.fanin_start[number]
+            clock_signal = signals[fanin[start]]
+            set_signal = signals[fanin[start + 1]]
+            clear_signal = signals[fanin[start + 2]]
+            data_signal = signals[fanin[start + 3]]
+
+            memory = self.dtype_memories[index]
+            if clock_signal == devices.RISING:
+                if data_signal in [devices.HIGH, devices.FALLING]:
+                    memory = devices.HIGH
+                elif data_signal in [devices.LOW, devices.RISING]:
+                    memory = devices.LOW
+            if set_signal == devices.HIGH:
+                memory = devices.HIGH
+            if clear_signal == devices.HIGH:
+                memory = devices.LOW
+            self.dtype_memories[index] = memory
+
+            # Update Q towards the memory and QBAR towards its inverse
+            q_slot = self.output_slots[number]
+            if memory == devices.LOW:
+                q_towards = self.towards_low
+            else:
+                q_towards = self.towards_high
+            if memory == devices.HIGH:
+                qbar_towards = self.towards_low
+            else:
+                qbar_towards = self.towards_high
+            if not self._update_slot(q_slot, q_towards):
+                return False
+            if not self._update_slot(q_slot + 1, qbar_towards):
+                return False
+        return True
+
+    def _execute_clocks(self):
+        """Complete the RISING and FALLING transitions of the clocks."""
+        devices = self.devices
+        first, last = self.kind_ranges[self.CLOCK]
+        for number in range(first, last):
+            slot = self.output_slots[number]
+            signal = self.signals[slot]
+            if signal == devices.RISING:
+                self._update_slot(slot, self.towards_high)
+            elif signal == devices.FALLING:
+                self._update_slot(slot, self.towards_low)
+            elif signal not in [devices.HIGH, devices.LOW]:
+                return False
+        return True
+
+    def _execute_nots(self):
+        """Simulate the NOT gates and update their output signals."""
+        signals = self.signals
+        first, last = self.kind_ranges[self.NOT]
+        for number in range(first, last):
+            # The inverse of a signal other than HIGH or LOW is None, which
+            # updates the output towards HIGH
+            if signals[self.fanin[self.fanin_start[number]]] == (
+                self.devices.HIGH
+            ):
+                towards = self.towards_low
+            else:
+                towards = self.towards_high
+            if not self._update_slot(self.output_slots[number], towards):
+                return False
+        return True
+
+    def _execute_gates(self, kind_code, x, y):
+        """Simulate the gates of the given kind code.
+
+        If all the inputs of a gate are x, then its output is y, else its
+        output is the inverse of y.
+        """
+        signals = self.signals
+        fanin = self.fanin
+        fanin_start = self.fanin_start
+        if y == self.devices.LOW:
+            all_x_towards, other_towards = self.towards_low, self.towards_high
+        else:
+            all_x_towards, other_towards = self.towards_high, self.towards_low
+        first, last = self.kind_ranges[kind_code]
+        for number in range(first, last):
+            towards = all_x_towards
+            for slot in fanin[fanin_start[number] : fanin_start[number + 1]]:
+                if signals[slot] != x:
+                    towards = other_towards
+                    break
+            if not self._update_slot(self.output_slots[number], towards):
+                return False
+        return True
+
+    def _execute_xors(self):
+        """Simulate the XOR gates and update their output signals."""
+        signals = self.signals
+        fanin = self.fanin
+        first, last = self.kind_ranges[self.XOR]
+        for number in range(first, last):
+            start = self.fanin_start[number]
+            # Output is high only if both inputs are different
+            if signals[fanin[start]] == signals[fanin[start + 1]]:
+                towards = self.towards_low
+            else:
+                towards = self.towards_high
+            if not self._update_slot(self.output_slots[number], towards):
+                return False
+        return True
+
+    def update_clocks(self):
+        """If it is time to do so, set clock signals to RISING or FALLING."""
+        devices = self.devices
+        first, last = self.kind_ranges[self.CLOCK]
+        for index, number in enumerate(range(first, last)):
+            if self.clock_counters[index] == self.clock_half_periods[index]:
+                self.clock_counters[index] = 0
+                slot = self.output_slots[number]
+                if self.signals[slot] == devices.HIGH:
+                    self.signals[slot] = devices.FALLING
+                elif self.signals[slot] == devices.LOW:
+                    self.signals[slot] = devices.RISING
+            self.clock_counters[index] += 1
+
+    def settle(self):
+        """Execute all devices until the signals settle.
+
+        Return True if successful and the signals settle within the
+        iteration limit of the network.
+        """
+        if not self.complete:
+            return False
+        devices = self.devices
+        network = self.network
+        self.changing_slots = set()
+        iterations = 0
+        iteration_limit = network.iteration_limit
+        while iterations < iteration_limit:
+            iterations += 1
+            self.steady_state = True
+            tracking = (
+                iterations > iteration_limit - network.tracked_iterations
+            )
+            if tracking:
+                old_signals = array("b", self.signals)
+            if not (
+                self._execute_switches()
+                # Execute D-type devices before clocks to catch the rising
+                # edge of the clock
+                and self._execute_d_types()
+                and self._execute_clocks()
+                and self._execute_nots()
+                and self._execute_gates(self.AND, devices.HIGH, devices.HIGH)
+                and self._execute_gates(self.OR, devices.LOW, devices.LOW)
+                and self._execute_gates(self.NAND, devices.HIGH, devices.LOW)
+                and self._execute_gates(self.NOR, devices.LOW, devices.HIGH)
+                and self._execute_xors()
+            ):
+                return False
+            if self.steady_state:
+                break
+            if tracking:
+                self.changing_slots.update(
+                    slot
+                    for slot, signal in enumerate(self.signals)
+                    if signal != old_signals[slot]
+                )
+            if iterations == network.iteration_limit:
+                iteration_limit = network.get_iteration_limit()
+                if iteration_limit > iterations:
+                    self.changing_slots = set()
+        return self.steady_state
+
+    def get_oscillating_devices(self):
+        """Return the devices that were still changing in the last cycle.
+
+        Return the device IDs whose outputs changed in the tracked
+        iterations of the last cycle, if it failed to settle.
+        """
+        if self.steady_state:
+            return []
+        numbers = sorted(
+            set(self.slot_devices[slot] for slot in self.changing_slots)
+        )
+        return [self.device_ids[number] for number in numbers]
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        The state of the Device objects is loaded before the cycle and stored
+        after it. Return True if successful and the network does not
+        oscillate.
+        """
+        self.load_state()
+        self.update_clocks()
+        result = self.settle()
+        self.store_state()
+        return result
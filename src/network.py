@@ -4,8 +4,353 @@ Used in the Logic Simulator project to add and connect devices together.
 
 Classes
 --------
+ExecutionPlan - order in which the devices of a network are executed.
 Network - builds and executes the network.
 """
+import heapq
+from array import array
+
+from codegen import CodegenNetwork
+from levelized import LevelizedNetwork
+from netlist import CompiledNetwork
+from patterns import PatternNetwork
+from vectorised import VectorisedNetwork
+
+
+class ExecutionPlan:
+    """Order in which the devices of a network are executed.
+
+    The plan is built from the devices and connections of the network, so
+    that executing a simulation cycle does not look up devices by kind.
+    Network.get_execution_plan() keeps it until the network changes.
+
+    Parameters
+    ----------
+    network:
+        instance of the network.Network() class.
+    device_ids:
+        set of the IDs of the only devices to execute, or None for all. It
+        must hold the devices connected to the inputs of each device in it.
+    merge_gates:
+        True to execute only one of each set of duplicate gates.
+
+    Attributes
+    ----------
+    device_groups: dict
+        Maps each device kind to the IDs of the devices of that kind that
+        are executed, in order.
+    order: list
+        (device_id, execute function, arguments) of every device in the
+        order in which the devices are executed in each iteration.
+    ranks: dict
+        Maps each device ID to its position in order.
+    output_positions: list
+        (output_id, position in the device store) of the outputs of each
+        device in order.
+    component_numbers: dict
+        Maps each device ID to the number of its connected component. Two
+        devices are in the same component if there is a path of connections
+        between them.
+    component_groups: list
+        The device_groups of the devices of each component.
+    d_type_groups: list
+        (clock position, set position, clear position, device IDs) of the
+        D-types driven by the same CLK, SET and CLEAR outputs, where the
+        positions are those of the driving outputs in the device store. A
+        D-type with an unconnected input is in a group of its own, with
+        positions of None.
+    component_d_type_groups: list
+        The numbers of the d_type_groups in each component.
+    constant_devices: set
+        IDs of the switches, and of the gates whose inputs are all connected
+        to other constant devices. Their outputs only depend on the switch
+        states.
+    folded_groups: dict
+        The device_groups without the constant devices.
+    component_folded_groups: list
+        The folded_groups of the devices of each component.
+    duplicate_gates: dict
+        Maps each duplicate gate to an earlier gate, whose output it copies
+        in its place in the order instead of being executed. The gates are
+        of the same kind, and have inputs connected to the same outputs once
+        the duplicates among those outputs are replaced in turn. Empty
+        unless merge_gates is True.
+    alias_positions: dict
+        Maps each duplicate gate to (position of the output of the gate it
+        copies, position of its own output) in the device store.
+
+    Methods
+    -------
+    No public methods.
+    """
+
+    def __init__(self, network, device_ids=None, merge_gates=False):
+        """Build the execution order of the devices."""
+        devices = network.devices
+        store = devices.store
+        executed_devices = device_ids
+        executors = [
+            (devices.SWITCH, network.execute_switch, ()),
+            # Execute D-type devices before clocks to catch the rising edge
+            # of the clock
+            (devices.D_TYPE, network.execute_d_type, ()),
+            (devices.CLOCK, network.execute_clock, ()),
+            (devices.NOT, network.execute_not, ()),
+            (devices.AND, network.execute_gate, (devices.HIGH, devices.HIGH)),
+            (devices.OR, network.execute_gate, (devices.LOW, devices.LOW)),
+            (devices.NAND, network.execute_gate, (devices.HIGH, devices.LOW)),
+            (devices.NOR, network.execute_gate, (devices.LOW, devices.HIGH)),
+            (devices.XOR, network.execute_gate, (None, None)),
+        ]
+        self.device_groups = {}
+        self.order = []
+        self.ranks = {}
+        self.output_positions = []
+        for device_kind, execute, arguments in executors:
+            device_ids = devices.find_devices(device_kind)
+            if executed_devices is not None:
+                device_ids = [
+                    device_id
+                    for device_id in device_ids
+                    if device_id in executed_devices
+                ]
+            self.device_groups[device_kind] = device_ids
+            for device_id in device_ids:
+                self.ranks[device_id] = len(self.order)
+                self.order.append((device_id, execute, arguments))
+                index = devices.get_store_index(device_id)
+                self.output_positions.append(
+                    [
+                        (
+                            output_id,
+                            store.get_output_position(index, output_id),
+                        )
+                        for output_id in store.get_output_ids(index)
+                    ]
+                )
+        self.duplicate_gates = {}
+        self.alias_positions = {}
+        if merge_gates:
+            self._merge_duplicate_gates(devices)
+        self._find_components(devices)
+        self._group_d_types(devices)
+        self._fold_constants(devices)
+
+    def _merge_duplicate_gates(self, devices):
+        """Find the duplicate gates.
+
+        Each pass merges the gates of the same kind whose inputs are
+        connected to the same outputs, after replacing each duplicate among
+        the outputs by the first gate it copies. Passes are made until
+        nothing is merged.
+
+        A gate copies the output of an earlier gate in its place in the
+        order, so it gives the same signal as executing it only if each of
+        its inputs reads the same signal as the matching input of the
+        earlier gate. This holds when either both outputs read have already
+        been executed or copied in the iteration, or neither has, and only
+        such gates are merged.
+        """
+        store = devices.store
+        gate_ids = [
+            device_id
+            for device_kind, device_ids in self.device_groups.items()
+            if device_kind in devices.gate_types
+            for device_id in device_ids
+        ]
+
+        def find_first(device_id):
+            """Return the first gate that the device copies, or itself."""
+            while device_id in self.duplicate_gates:
+                device_id = self.duplicate_gates[device_id]
+            return device_id
+
+        merged = True
+        while merged:
+            merged = False
+            gates = {}  # {(kind, connected outputs): (gate ID, sources)}
+            for device_id in gate_ids:
+                if device_id in self.duplicate_gates:
+                    continue
+                index = devices.get_store_index(device_id)
+                sources = []  # (first gate, output ID, rank) of each input
+                for input_id in store.get_input_ids(index):
+                    connected_output = store.get_connected_output(
+                        index, input_id
+                    )
+                    if (
+                        connected_output is None
+                        or connected_output[0] not in self.ranks
+                    ):
+                        break  # executed, to report the unconnected input
+                    source_id, output_id = connected_output
+                    sources.append(
+                        (
+                            find_first(source_id),
+                            output_id,
+                            self.ranks[source_id],
+                        )
+                    )
+                else:
+                    # All the gates give the same output for any order of
+                    # their inputs
+                    sources.sort()
+                    key = (
+                        store.kinds[index],
+                        tuple(source[:2] for source in sources),
+                    )
+                    if key not in gates:
+                        gates[key] = (device_id, sources)
+                        continue
+                    gate_id, gate_sources = gates[key]
+                    rank = self.ranks[gate_id]
+                    duplicate_rank = self.ranks[device_id]
+                    if all(
+                        (gate_source[2] < rank) == (source[2] < duplicate_rank)
+                        for source, gate_source in zip(sources, gate_sources)
+                    ):
+                        self.duplicate_gates[device_id] = gate_id
+                        merged = True
+
+    def _find_components(self, devices):
+        """Find the connected components of the devices.
+
+        Uses union-find over the connections, with path halving.
+        """
+        store = devices.store
+        parents = {device_id: device_id for device_id in self.ranks}
+
+        def find_root(device_id):
+            """Return the root of the set containing the device."""
+            while parents[device_id] != device_id:
+                parents[device_id] = parents[parents[device_id]]
+                device_id = parents[device_id]
+            return device_id
+
+        for device_id in self.ranks:
+            index = devices.get_store_index(device_id)
+            for input_id in store.get_input_ids(index):
+                connected_output = store.get_connected_output(index, input_id)
+                if connected_output is None:
+                    continue
+                if connected_output[0] not in parents:  # device removed
+                    continue
+                root = find_root(device_id)
+                connected_root = find_root(connected_output[0])
+                if root != connected_root:
+                    parents[connected_root] = root
+
+        roots = {}  # {root: component number}
+        self.component_numbers = {}
+        self.component_groups = []
+        for device_kind, device_ids in self.device_groups.items():
+            for device_id in device_ids:
+                root = find_root(device_id)
+                if root not in roots:
+                    roots[root] = len(self.component_groups)
+                    self.component_groups.append(
+                        {kind: [] for kind in self.device_groups}
+                    )
+                number = roots[root]
+                self.component_numbers[device_id] = number
+                self.component_groups[number][device_kind].append(device_id)
+
+        for device_id, gate_id in self.duplicate_gates.items():
+            self.alias_positions[device_id] = (
+                self.output_positions[self.ranks[gate_id]][0][1],
+                self.output_positions[self.ranks[device_id]][0][1],
+            )
+
+    def _group_d_types(self, devices):
+        """Group the D-types by the outputs driving their CLK, SET and CLEAR.
+
+        The groups are in the order of their first D-type.
+        """
+        store = devices.store
+        group_numbers = {}  # {key: group number}
+        self.d_type_groups = []
+        self.component_d_type_groups = [[] for _ in self.component_groups]
+        for device_id in self.device_groups[devices.D_TYPE]:
+            index = devices.get_store_index(device_id)
+            sources = {}  # {input ID: position of the driving output}
+            for input_id in store.get_input_ids(index):
+                connected_output = store.get_connected_output(index, input_id)
+                if connected_output is not None:
+                    source_id, output_id = connected_output
+                    source_index = devices.get_store_index(source_id)
+                    if source_index is not None:
+                        sources[input_id] = store.get_output_position(
+                            source_index, output_id
+                        )
+            if len(sources) == len(store.get_input_ids(index)):
+                key = triggers = (
+                    sources[devices.CLK_ID],
+                    sources[devices.SET_ID],
+                    sources[devices.CLEAR_ID],
+                )
+            else:
+                # Executed in every iteration, to report the unconnected input
+                key = device_id
+                triggers = (None, None, None)
+            if key not in group_numbers:
+                group_numbers[key] = len(self.d_type_groups)
+                self.d_type_groups.append(triggers + ([],))
+                self.component_d_type_groups[
+                    self.component_numbers[device_id]
+                ].append(group_numbers[key])
+            self.d_type_groups[group_numbers[key]][3].append(device_id)
+
+    def _fold_constants(self, devices):
+        """Find the constant devices and the device groups without them.
+
+        A gate is constant once all of its inputs are connected to constant
+        devices, starting from the switches. Gates in a feedback loop or
+        with an unconnected input are never constant.
+        """
+        store = devices.store
+        unresolved = {}  # {gate ID: number of non-constant inputs}
+        fanouts = {}  # {device ID: IDs of the gates fed, once per input}
+        for device_kind, device_ids in self.device_groups.items():
+            if device_kind not in devices.gate_types:
+                continue
+            for device_id in device_ids:
+                index = devices.get_store_index(device_id)
+                input_ids = store.get_input_ids(index)
+                unresolved[device_id] = len(input_ids)
+                for input_id in input_ids:
+                    connected_output = store.get_connected_output(
+                        index, input_id
+                    )
+                    if connected_output is not None:
+                        fanouts.setdefault(connected_output[0], []).append(
+                            device_id
+                        )
+
+        self.constant_devices = set(self.device_groups[devices.SWITCH])
+        resolved = list(self.constant_devices)
+        while resolved:
+            device_id = resolved.pop()
+            for gate_id in fanouts.get(device_id, ()):
+                unresolved[gate_id] -= 1
+                if unresolved[gate_id] == 0:
+                    self.constant_devices.add(gate_id)
+                    resolved.append(gate_id)
+
+        def fold(device_groups):
+            """Return the device groups without the constant devices."""
+            return {
+                device_kind: [
+                    device_id
+                    for device_id in device_ids
+                    if device_id not in self.constant_devices
+                ]
+                for device_kind, device_ids in device_groups.items()
+            }
+
+        self.folded_groups = fold(self.device_groups)
+        self.component_folded_groups = [
+            fold(groups) for groups in self.component_groups
+        ]
 
 
 class Network:
@@ -31,8 +376,16 @@ class Network:
     make_connection(self, first_device_id, first_port_id, second_device_id,
         second_port_id):
         Connects the first device to the second device.
+    make_connections(self, connections):
+        Makes each connection in the list and returns their errors.
+    break_connection(self, device_id, input_id):
+        Disconnects the given input from its output.
     check_network(self):
         Checks if all inputs in the network are connected.
+    get_floating_inputs(self):
+        Returns the device and input IDs of every unconnected input.
+    get_feedback_loops(self):
+        Returns the device IDs of the gates of each feedback loop.
     update_signal(self, signal, target):
         Updates the signal in the direction of the target.
     invert_signal(self, signal):
@@ -47,12 +400,37 @@ class Network:
         Simulates a clock and updates its output signal value.
     update_clocks(self):
         If it is time to do so, sets clock signals to RISING or FALLING.
+    get_execution_plan(self):
+        Returns the order in which devices are executed.
+    get_fan_in_cone(self, outputs):
+        Returns the devices whose outputs can affect the given outputs.
+    compile_network(self):
+        Returns a new flat array representation of the network.
+    get_compiled_network(self):
+        Returns the flat array representation of the current network.
+    get_vectorised_network(self):
+        Returns the NumPy representation of the current network.
+    get_levelized_network(self):
+        Returns the current network with its gates sorted into levels.
+    get_iteration_limit(self):
+        Returns the number of iterations to wait for the signals of the
+        current network to settle.
+    get_pattern_network(self):
+        Returns the bit-parallel representation of the current network.
+    get_codegen_network(self):
+        Returns the current network compiled into a Python function.
+    execute_events(self):
+        Executes only the devices whose inputs have changed for one
+        simulation cycle.
     execute_network(self):
         Executes all the devices in the network for one simulation cycle.
+    get_oscillating_devices(self):
+        Returns the devices that were still changing when the last cycle
+        failed to settle.
     """
 
     def __init__(self, names, devices):
-        """Initialise network errors and the steady_state variable."""
+        """Initialise network errors, engines and the steady_state variable."""
         self.names = names
         self.devices = devices
 
@@ -64,20 +442,99 @@ class Network:
             self.FIRST_PORT_ABSENT,
             self.SECOND_PORT_ABSENT,
             self.DEVICE_ABSENT,
-        ] = self.names.unique_error_codes(7)
+            self.INPUT_UNCONNECTED,
+        ] = self.names.unique_error_codes(8)
         self.steady_state = True  # for checking if signals have settled
 
+        # The engine used by execute_network: either walk the Device objects,
+        # execute a compiled flat array representation of the network,
+        # evaluate the devices of each kind together using NumPy, walk only
+        # the Device objects whose inputs have changed, execute the gates in
+        # topological order, or run a generated Python function
+        self.engine_types = [
+            self.DICT_ENGINE,
+            self.COMPILED_ENGINE,
+            self.VECTORISED_ENGINE,
+            self.EVENT_ENGINE,
+            self.LEVELIZED_ENGINE,
+            self.CODEGEN_ENGINE,
+        ] = range(6)
+        # Directory of the sources generated for CODEGEN_ENGINE, None if
+        # they are not cached on disk
+        self.codegen_cache_directory = None
+        self.engine = self.DICT_ENGINE
+
+        # Number of iterations to wait for the signals to settle before
+        # declaring the network unstable. Every engine that reaches it raises
+        # it to get_iteration_limit(), so that logic deeper than the limit
+        # still settles.
+        self.iteration_limit = 20
+        # Number of last iterations in which changing outputs are tracked,
+        # to report the devices of an oscillating network. A network that
+        # settles earlier is not tracked at all.
+        self.tracked_iterations = 2
+        self._oscillating_devices = []
+
+        # If True, the default engine only executes the connected components
+        # in which a switch has been set or a clock has changed since every
+        # component last settled. The others still hold their settled
+        # signals, unless a device was changed outside of the network.
+        self.skip_quiescent_components = False
+        # If True, the default engine does not execute the switches and the
+        # gates driven only by them, once every device has settled and until
+        # a switch is set. Their outputs are constant until then, unless a
+        # device was changed outside of the network.
+        self.fold_constants = False
+        # If True, the default engine only executes the D-types whose CLK is
+        # RISING or whose SET or CLEAR is HIGH, once every device has
+        # settled. The others hold their memories, unless a device was
+        # changed outside of the network.
+        self.skip_idle_d_types = False
+        # Versions when every device last settled, or None
+        self._settled_version = None
+        # Numbers of the D-type groups of the execution plan whose outputs
+        # may not hold their memories
+        self._settling_d_types = set()
+        # Numbers of the only connected components executed by the default
+        # engine, or None to execute them all. Used by the worker processes
+        # of a parallel run.
+        self.executed_components = None
+        # If True, the default engine executes only one of each set of
+        # duplicate gates, and the others copy its output in their places in
+        # the order, which gives the same signals as executing them
+        self.merge_duplicate_gates = False
+        # Frozen set of the IDs of the only devices executed by the default
+        # engine, or None to execute them all. It must hold the devices
+        # connected to the inputs of each device in it, such as a set given
+        # by get_fan_in_cone(). The other devices keep their signals.
+        self.executed_devices = None
+
+        # loop_iteration_limits stores {device_id: limit} to give the
+        # feedback loop containing the device its own limit when executed by
+        # LEVELIZED_ENGINE. The other engines iterate the whole network, and
+        # raise their iteration limit to the largest limit of a loop.
+        self.loop_iteration_limits = {}
+
+        # structure_version is incremented by every new connection
+        self.structure_version = 0
+        # _compiled_forms stores {name: compiled form} of the network for the
+        # structure versions in _compiled_version
+        self._compiled_forms = {}
+        self._compiled_version = None
+
+        # Versions at the end of the last settled event-driven cycle, None if
+        # every device must be executed in the next one
+        self._event_version = None
+
     def get_connected_output(self, device_id, input_id):
         """Return the output connected to the given input.
 
         Return None if either of the specified IDs is invalid or the input is
         unconnected. The output is of the form (device ID, port ID).
         """
-        device = self.devices.get_device(device_id)
-        if device is not None:
-            if input_id in device.inputs:
-                connected_output = device.inputs[input_id]
-                return connected_output
+        index = self.devices.get_store_index(device_id)
+        if index is not None:
+            return self.devices.store.get_connected_output(index, input_id)
         return None
 
     def get_input_signal(self, device_id, input_id):
@@ -86,22 +543,19 @@ class Network:
         Return None if the input is unconnected or the specified IDs are
         invalid.
         """
-        connected_output = self.get_connected_output(device_id, input_id)
-        if connected_output is None:  # invalid IDs or unconnected input
+        index = self.devices.get_store_index(device_id)
+        if index is None:  # invalid device ID
             return None
-        else:
-            (output_device_id, output_port_id) = connected_output
-            return self.get_output_signal(output_device_id, output_port_id)
+        return self.devices.store.get_input_signal(index, input_id)
 
     def get_output_signal(self, device_id, output_id):
         """Return the signal level at the given output.
 
         Return None if either of the specified IDs is invalid.
         """
-        device = self.devices.get_device(device_id)
-        if device is not None:
-            if output_id in device.outputs:
-                return device.outputs[output_id]
+        index = self.devices.get_store_index(device_id)
+        if index is not None:
+            return self.devices.store.get_output_signal(index, output_id)
         return None
 
     def make_connection(
@@ -111,42 +565,56 @@ class Network:
 
         Return self.NO_ERROR if successful, or the corresponding error if not.
         """
-        first_device = self.devices.get_device(first_device_id)
-        second_device = self.devices.get_device(second_device_id)
+        devices = self.devices
+        store = devices.store
+        first_index = devices.get_store_index(first_device_id)
+        second_index = devices.get_store_index(second_device_id)
 
-        if first_device is None or second_device is None:
+        if first_index is None or second_index is None:
             error_type = self.DEVICE_ABSENT
 
-        elif first_port_id in first_device.inputs:
-            if first_device.inputs[first_port_id] is not None:
+        elif store.has_input(first_index, first_port_id):
+            if (
+                store.get_connected_output(first_index, first_port_id)
+                is not None
+            ):
                 # Input is already in a connection
                 error_type = self.INPUT_CONNECTED
-            elif second_port_id in second_device.inputs:
+            elif store.has_input(second_index, second_port_id):
                 # Both ports are inputs
                 error_type = self.INPUT_TO_INPUT
-            elif second_port_id in second_device.outputs:
+            elif store.has_output(second_index, second_port_id):
                 # Make connection
-                first_device.inputs[first_port_id] = (
+                store.connect_input(
+                    first_index,
+                    first_port_id,
                     second_device_id,
                     second_port_id,
                 )
+                self.structure_version += 1
                 error_type = self.NO_ERROR
             else:  # second_port_id is not a valid input or output port
                 error_type = self.SECOND_PORT_ABSENT
 
-        elif first_port_id in first_device.outputs:
-            if second_port_id in second_device.outputs:
+        elif store.has_output(first_index, first_port_id):
+            if store.has_output(second_index, second_port_id):
                 # Both ports are outputs
                 error_type = self.OUTPUT_TO_OUTPUT
-            elif second_port_id in second_device.inputs:
-                if second_device.inputs[second_port_id] is not None:
+            elif store.has_input(second_index, second_port_id):
+                if (
+                    store.get_connected_output(second_index, second_port_id)
+                    is not None
+                ):
                     # Input is already in a connection
                     error_type = self.INPUT_CONNECTED
                 else:
-                    second_device.inputs[second_port_id] = (
+                    store.connect_input(
+                        second_index,
+                        second_port_id,
                         first_device_id,
                         first_port_id,
                     )
+                    self.structure_version += 1
                     error_type = self.NO_ERROR
             else:
                 error_type = self.SECOND_PORT_ABSENT
@@ -156,14 +624,60 @@ class Network:
 
         return error_type
 
+    def make_connections(self, connections):
+        """Make each connection in the list.
+
+        connections is a list of (first_device_id, first_port_id,
+        second_device_id, second_port_id) tuples. Return a list of the error
+        of each connection, which is self.NO_ERROR if it was made.
+        """
+        return [
+            self.make_connection(*connection) for connection in connections
+        ]
+
+    def break_connection(self, device_id, input_id):
+        """Disconnect the given input from the output connected to it.
+
+        Return self.NO_ERROR if successful, or the corresponding error if not.
+        """
+        devices = self.devices
+        index = devices.get_store_index(device_id)
+        if index is None:
+            return self.DEVICE_ABSENT
+        if not devices.store.has_input(index, input_id):
+            return self.FIRST_PORT_ABSENT
+        connected_output = devices.store.get_connected_output(index, input_id)
+        if connected_output is None:
+            return self.INPUT_UNCONNECTED
+
+        devices.store.disconnect_input(index, input_id)
+        self.structure_version += 1
+        return self.NO_ERROR
+
     def check_network(self):
-        """Return True if all inputs in the network are connected."""
-        for device_id in self.devices.find_devices():
-            device = self.devices.get_device(device_id)
-            for input_id in device.inputs:
-                if self.get_connected_output(device_id, input_id) is None:
-                    return False
-        return True
+        """Return True if all inputs in the network are connected.
+
+        The unconnected inputs are kept by the device store, so this takes
+        constant time. The feedback loops are only found when an engine or
+        an oscillation report needs them.
+        """
+        return not self.devices.store.floating_inputs
+
+    def get_floating_inputs(self):
+        """Return the sorted (device_id, input_id) of every unconnected input.
+
+        The unconnected inputs are kept by the device store as devices are
+        made and connected, so they are not searched for.
+        """
+        return sorted(self.devices.store.floating_inputs)
+
+    def get_feedback_loops(self):
+        """Return the device IDs of the gates of each feedback loop.
+
+        A feedback loop is a strongly connected component of the graph of
+        logic gates. They are only found again after the network changes.
+        """
+        return self.get_levelized_network().get_loop_device_ids()
 
     def update_signal(self, signal, target):
         """Update the signal in the direction of the target.
@@ -205,15 +719,17 @@ class Network:
         The output signal is updated to the switch_state target. Return True
         if successful.
         """
-        device = self.devices.get_device(device_id)
-        target = device.switch_state
-        signal = self.get_output_signal(device_id, output_id=None)
+        store = self.devices.store
+        index = self.devices.get_store_index(device_id)
+        target = store.switch_states[index]
+        position = store.get_output_position(index, None)
+        signal = store.output_signals[position]
         # Update and store the updated signal
         updated_signal = self.update_signal(signal, target)
         if updated_signal is None:  # signal update is unsuccessful
             return False
         else:
-            device.outputs[None] = updated_signal
+            store.output_signals[position] = updated_signal
             return True
 
     def execute_gate(self, device_id, x=None, y=None):
@@ -225,21 +741,23 @@ class Network:
         LOW), (LOW, HIGH), (HIGH, LOW), (None, None).
         Return True if successful.
         """
-        device = self.devices.get_device(device_id)
+        store = self.devices.store
+        index = self.devices.get_store_index(device_id)
+        is_xor = store.kinds[index] == self.devices.XOR
         input_signal_list = []
-        for input_id in device.inputs:
-            input_signal = self.get_input_signal(device_id, input_id)
+        for input_id in store.get_input_ids(index):
+            input_signal = store.get_input_signal(index, input_id)
             if input_signal is None:  # this input is unconnected
                 return False
             input_signal_list.append(input_signal)
 
-            if device.device_kind != self.devices.XOR:
+            if not is_xor:
                 if input_signal != x:
                     output_signal = self.invert_signal(y)
                     break
                 output_signal = y
 
-        if device.device_kind == self.devices.XOR:
+        if is_xor:
             # Output is high only if both inputs are different
             if input_signal_list[0] == input_signal_list[1]:  # assume 2 inputs
                 output_signal = self.devices.LOW
@@ -247,12 +765,13 @@ class Network:
                 output_signal = self.devices.HIGH
 
         # Update and store the new signal
-        signal = self.get_output_signal(device_id, None)
+        position = store.get_output_position(index, None)
+        signal = store.output_signals[position]
         target = output_signal
         updated_signal = self.update_signal(signal, target)
         if updated_signal is None:  # if the update is unsuccessful
             return False
-        device.outputs[None] = updated_signal
+        store.output_signals[position] = updated_signal
         return True
 
     def execute_not(self, device_id):
@@ -260,10 +779,11 @@ class Network:
 
         Return True if successful.
         """
-        device = self.devices.get_device(device_id)
+        store = self.devices.store
+        index = self.devices.get_store_index(device_id)
         input_signal_list = []
-        for input_id in device.inputs:
-            input_signal = self.get_input_signal(device_id, input_id)
+        for input_id in store.get_input_ids(index):
+            input_signal = store.get_input_signal(index, input_id)
             if input_signal is None:  # this input is unconnected
                 return False
             input_signal_list.append(input_signal)
@@ -272,12 +792,13 @@ class Network:
         output_signal = self.invert_signal(input_signal)
 
         # Update and store the new signal
-        signal = self.get_output_signal(device_id, None)
+        position = store.get_output_position(index, None)
+        signal = store.output_signals[position]
         target = output_signal
         updated_signal = self.update_signal(signal, target)
         if updated_signal is None:  # if the update is unsuccessful
             return False
-        device.outputs[None] = updated_signal
+        store.output_signals[position] = updated_signal
         return True
 
     def execute_d_type(self, device_id):
@@ -285,10 +806,12 @@ class Network:
 
         Return True if successful.
         """
-        device = self.devices.get_device(device_id)
+        devices = self.devices
+        store = devices.store
+        index = devices.get_store_index(device_id)
 
-        for input_id in device.inputs:
-            input_signal = self.get_input_signal(device_id, input_id)
+        for input_id in store.get_input_ids(index):
+            input_signal = store.get_input_signal(index, input_id)
             if input_signal is None:  # if the input is unconnected
                 return False
             if input_id == self.devices.CLK_ID:
@@ -301,31 +824,34 @@ class Network:
                 set_signal = input_signal
 
         # Set D-type memory depending on the input signal
-        if clock_signal == self.devices.RISING:
-            if data_signal in [self.devices.HIGH, self.devices.FALLING]:
-                device.dtype_memory = self.devices.HIGH
-            elif data_signal in [self.devices.LOW, self.devices.RISING]:
-                device.dtype_memory = self.devices.LOW
-        if set_signal == self.devices.HIGH:
-            device.dtype_memory = self.devices.HIGH
-        if clear_signal == self.devices.HIGH:
-            device.dtype_memory = self.devices.LOW
-
-        if self.devices.Q_ID not in device.outputs:
-            if self.devices.QBAR_ID not in device.outputs:
-                return False
-        Q_signal = device.outputs[self.devices.Q_ID]
-        QBAR_signal = device.outputs[self.devices.QBAR_ID]
+        dtype_memory = store.dtype_memories[index]
+        if clock_signal == devices.RISING:
+            if data_signal in [devices.HIGH, devices.FALLING]:
+                dtype_memory = devices.HIGH
+            elif data_signal in [devices.LOW, devices.RISING]:
+                dtype_memory = devices.LOW
+        if set_signal == devices.HIGH:
+            dtype_memory = devices.HIGH
+        if clear_signal == devices.HIGH:
+            dtype_memory = devices.LOW
+        store.dtype_memories[index] = dtype_memory
+
+        Q_position = store.get_output_position(index, devices.Q_ID)
+        QBAR_position = store.get_output_position(index, devices.QBAR_ID)
+        if Q_position is None or QBAR_position is None:
+            return False
+        Q_signal = store.output_signals[Q_position]
+        QBAR_signal = store.output_signals[QBAR_position]
 
         # Update the output towards its memory
-        new_Q = self.update_signal(Q_signal, device.dtype_memory)
+        new_Q = self.update_signal(Q_signal, dtype_memory)
         new_QBAR = self.update_signal(
-            QBAR_signal, self.invert_signal(device.dtype_memory)
+            QBAR_signal, self.invert_signal(dtype_memory)
         )
         if new_Q is None or new_QBAR is None:  # if the update is unsuccessful
             return False
-        device.outputs[self.devices.Q_ID] = new_Q
-        device.outputs[self.devices.QBAR_ID] = new_QBAR
+        store.output_signals[Q_position] = new_Q
+        store.output_signals[QBAR_position] = new_QBAR
 
         return True
 
@@ -334,21 +860,23 @@ class Network:
 
         Return True if successful.
         """
-        device = self.devices.get_device(device_id)
-        output_signal = device.outputs[None]  # output ID is None
+        store = self.devices.store
+        index = self.devices.get_store_index(device_id)
+        position = store.get_output_position(index, None)  # output ID is None
+        output_signal = store.output_signals[position]
 
         if output_signal == self.devices.RISING:
             new_signal = self.update_signal(output_signal, self.devices.HIGH)
             if new_signal is None:  # update is unsuccessful
                 return False
-            device.outputs[None] = new_signal
+            store.output_signals[position] = new_signal
             return True
 
         elif output_signal == self.devices.FALLING:
             new_signal = self.update_signal(output_signal, self.devices.LOW)
             if new_signal is None:  # update is unsuccessful
                 return False
-            device.outputs[None] = new_signal
+            store.output_signals[position] = new_signal
             return True
 
         elif output_signal in [self.devices.HIGH, self.devices.LOW]:
@@ -358,85 +886,502 @@ class Network:
             return False
 
     def update_clocks(self):
-        """If it is time to do so, set clock signals to RISING or FALLING."""
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
+        """If it is time to do so, set clock signals to RISING or FALLING.
+
+        Return the list of clocks whose signals have been changed.
+        """
+        changed_clocks = []
+        store = self.devices.store
+        clock_devices = self.get_execution_plan().device_groups[
+            self.devices.CLOCK
+        ]
         for device_id in clock_devices:
-            device = self.devices.get_device(device_id)
-            if device.clock_counter == device.clock_half_period:
-                device.clock_counter = 0
-                output_signal = self.get_output_signal(
-                    device_id, output_id=None
-                )
+            index = self.devices.get_store_index(device_id)
+            if store.clock_counters[index] == store.clock_half_periods[index]:
+                store.clock_counters[index] = 0
+                position = store.get_output_position(index, None)
+                output_signal = store.output_signals[position]
                 if output_signal == self.devices.HIGH:
-                    device.outputs[None] = self.devices.FALLING
+                    store.output_signals[position] = self.devices.FALLING
                 elif output_signal == self.devices.LOW:
-                    device.outputs[None] = self.devices.RISING
-            device.clock_counter += 1
+                    store.output_signals[position] = self.devices.RISING
+                changed_clocks.append(device_id)
+            store.clock_counters[index] += 1
+        return changed_clocks
+
+    def compile_network(self):
+        """Return a new flat array representation of the network."""
+        return CompiledNetwork(self.devices, self)
+
+    def get_compiled_network(self):
+        """Return the flat array representation of the current network.
+
+        The network is only recompiled if devices or connections have been
+        added since it was last compiled.
+        """
+        return self._get_compiled_form("compiled", self.compile_network)
+
+    def get_vectorised_network(self):
+        """Return the NumPy representation of the current network.
+
+        Raise ImportError if numpy is not installed.
+        """
+        return self._get_compiled_form(
+            "vectorised", lambda: VectorisedNetwork(self.devices, self)
+        )
+
+    def get_levelized_network(self):
+        """Return the current network with its gates sorted into levels.
+
+        Acyclic logic settles in a fixed number of iterations whatever its
+        depth, but gates read RISING inputs as HIGH and FALLING inputs as LOW.
+        """
+        return self._get_compiled_form(
+            "levelized", lambda: LevelizedNetwork(self.devices, self)
+        )
+
+    def get_iteration_limit(self):
+        """Return the number of iterations to wait for the signals to settle.
+
+        The kind order may need up to two iterations for each level of logic,
+        so this is iteration_limit raised to twice the depth of the levelized
+        network, and to the iteration limit of each feedback loop, if either
+        is more. Engines only call it once they reach iteration_limit, so the
+        levels are only found for networks that need them, and are cached
+        until the network changes.
+        """
+        levelized = self.get_levelized_network()
+        limits = [self.iteration_limit, 2 * len(levelized.levels) + 2]
+        limits += [levelized.get_loop_limit(loop) for loop in levelized.loops]
+        return max(limits)
+
+    def get_pattern_network(self):
+        """Return the bit-parallel representation of the current network.
+
+        It evaluates the logic for many switch patterns in one pass.
+        """
+        return self._get_compiled_form(
+            "patterns", lambda: PatternNetwork(self.devices, self)
+        )
+
+    def get_codegen_network(self):
+        """Return the current network compiled into a Python function.
+
+        The generated source is cached in codegen_cache_directory, if set.
+        """
+        return self._get_compiled_form(
+            "codegen",
+            lambda: CodegenNetwork(
+                self.devices, self, self.codegen_cache_directory
+            ),
+        )
+
+    def _get_compiled_form(self, name, build):
+        """Return the named compiled form of the network.
+
+        All compiled forms are discarded when devices or connections are
+        added, and each is rebuilt with build() when it is next needed.
+        """
+        version = (self.devices.structure_version, self.structure_version)
+        if self._compiled_version != version:
+            self._compiled_forms = {}
+            self._compiled_version = version
+        if name not in self._compiled_forms:
+            self._compiled_forms[name] = build()
+        return self._compiled_forms[name]
+
+    def get_execution_plan(self):
+        """Return the execution plan of the network.
+
+        The ExecutionPlan is built when it is first needed, and kept until
+        devices or connections are added or removed. Only the devices in
+        executed_devices are in the plan, unless it is None.
+        """
+        return self._get_execution_plan(self.merge_duplicate_gates)
+
+    def _get_execution_plan(self, merge_gates):
+        """Return the execution plan, with or without duplicate gates."""
+        executed_devices = self.executed_devices
+        return self._get_compiled_form(
+            ("plan", executed_devices, merge_gates),
+            lambda: ExecutionPlan(self, executed_devices, merge_gates),
+        )
+
+    def get_fan_in_cone(self, outputs):
+        """Return the IDs of the devices whose outputs can affect the outputs.
+
+        outputs is a list of (device_id, output_id). The result is a frozen
+        set of the devices of the outputs and of every device connected to
+        their inputs, followed back through all devices including D-types
+        and clocks.
+        """
+        devices = self.devices
+        store = devices.store
+        cone = set()
+        unvisited = [device_id for device_id, output_id in outputs]
+        while unvisited:
+            device_id = unvisited.pop()
+            index = devices.get_store_index(device_id)
+            if device_id in cone or index is None:
+                continue
+            cone.add(device_id)
+            for input_id in store.get_input_ids(index):
+                connected_output = store.get_connected_output(index, input_id)
+                if connected_output is not None:
+                    unvisited.append(connected_output[0])
+        return frozenset(cone)
+
+    def execute_events(self):
+        """Execute only the devices whose inputs have changed.
+
+        Each iteration of execute_network() is replaced by a delta step that
+        executes, in the same order, only the devices queued for it. When the
+        output of a device changes, the devices connected to it are queued
+        for the current step if they come later in the order, or for the next
+        step if they do not, and the device itself is queued for the next
+        step to complete its RISING or FALLING transition. This gives the
+        same results as execute_network(), with work that scales with the
+        number of changing signals.
+
+        Every device is executed after the network or the state of its
+        devices has changed outside of a simulation cycle, or after a cycle
+        that did not settle. Return True if successful and the network does
+        not oscillate.
+        """
+        plan = self.get_execution_plan()
+        order = plan.order
+        ranks = plan.ranks
+        store = self.devices.store
+        output_signals = store.output_signals
+        store.update_fanouts()
+        fanout_starts = store.fanout_starts
+        fanout_devices = store.fanout_devices
+        version = (self._compiled_version, self.devices.startup_count)
+        changed_clocks = self.update_clocks()
+
+        current = []
+        if self._event_version != version:
+            current = list(range(len(order)))
+        else:
+            for device_id in self._get_set_switches(plan):
+                current.append(ranks[device_id])
+            for device_id in changed_clocks:
+                current.append(ranks[device_id])
+                # D-types execute before clocks and must see the new edge
+                for connected_device_id, input_id in store.get_fanouts(
+                    self.devices.get_store_index(device_id), None
+                ):
+                    if connected_device_id in ranks:
+                        current.append(ranks[connected_device_id])
+        self._event_version = None
+
+        self._oscillating_devices = []
+        changing_devices = set()
+        iterations = 0
+        iteration_limit = self.iteration_limit
+        self.steady_state = True
+        while current and iterations < iteration_limit:
+            iterations += 1
+            self.steady_state = True
+            tracking = iterations > iteration_limit - self.tracked_iterations
+            queued = set(current)
+            current = list(queued)
+            heapq.heapify(current)
+            following = set()  # devices queued for the next step
+
+            while current:
+                rank = heapq.heappop(current)
+                device_id, execute, arguments = order[rank]
+                old_outputs = [
+                    (output_id, position, output_signals[position])
+                    for output_id, position in plan.output_positions[rank]
+                ]
+                if not execute(device_id, *arguments):
+                    return False
+                for output_id, position, old_signal in old_outputs:
+                    if output_signals[position] == old_signal:
+                        continue
+                    if tracking:
+                        changing_devices.add(device_id)
+                    following.add(rank)
+                    for number in range(
+                        fanout_starts[position], fanout_starts[position + 1]
+                    ):
+                        connected_rank = ranks.get(fanout_devices[number])
+                        if connected_rank is None:  # device removed
+                            continue
+                        if connected_rank <= rank:
+                            following.add(connected_rank)
+                        elif connected_rank not in queued:
+                            queued.add(connected_rank)
+                            heapq.heappush(current, connected_rank)
+            current = list(following)
+            if current and iterations == self.iteration_limit:
+                iteration_limit = self.get_iteration_limit()
+                if iteration_limit > iterations:
+                    changing_devices = set()
+
+        if self.steady_state:
+            self._event_version = version
+        else:
+            self._oscillating_devices = [
+                device_id
+                for device_id, execute, arguments in order
+                if device_id in changing_devices
+            ]
+        return self.steady_state
 
     def execute_network(self):
         """Execute all the devices in the network for one simulation cycle.
 
         Return True if successful and the network does not oscillate.
         """
-        clock_devices = self.devices.find_devices(self.devices.CLOCK)
-        switch_devices = self.devices.find_devices(self.devices.SWITCH)
-        d_type_devices = self.devices.find_devices(self.devices.D_TYPE)
-        and_devices = self.devices.find_devices(self.devices.AND)
-        or_devices = self.devices.find_devices(self.devices.OR)
-        nand_devices = self.devices.find_devices(self.devices.NAND)
-        nor_devices = self.devices.find_devices(self.devices.NOR)
-        xor_devices = self.devices.find_devices(self.devices.XOR)
-        not_devices = self.devices.find_devices(self.devices.NOT)
+        if self.engine == self.EVENT_ENGINE:
+            return self.execute_events()
+        # Other engines may leave the devices in any state
+        self._event_version = None
+        if self.engine == self.COMPILED_ENGINE:
+            return self.get_compiled_network().execute_network()
+        if self.engine == self.VECTORISED_ENGINE:
+            return self.get_vectorised_network().execute_network()
+        if self.engine == self.LEVELIZED_ENGINE:
+            return self.get_levelized_network().execute_network()
+        if self.engine == self.CODEGEN_ENGINE:
+            return self.get_codegen_network().execute_network()
 
+        plan = self.get_execution_plan()
+        output_signals = self.devices.store.output_signals
+        for position, alias_position in plan.alias_positions.values():
+            if output_signals[position] != output_signals[alias_position]:
+                # A duplicate only gives the signals of executing it once it
+                # holds the output of its gate, as after every settled cycle
+                plan = self._get_execution_plan(False)
+                break
+        # The plan changes with the executed devices, whose signals may not
+        # have settled before
+        version = (
+            self.devices.structure_version,
+            self.structure_version,
+            self.devices.startup_count,
+            plan,
+        )
         # This sets clock signals to RISING or FALLING, where necessary
-        self.update_clocks()
+        changed_clocks = self.update_clocks()
 
-        # Number of iterations to wait for the signals to settle before
-        # declaring the network unstable
-        iteration_limit = 20
+        self._oscillating_devices = []
+        settled = self._settled_version == version
+        set_switches = None
+        if settled and (self.skip_quiescent_components or self.fold_constants):
+            set_switches = self._get_set_switches(plan)
+        folded = self.fold_constants and settled and not set_switches
+        numbers = None  # numbers of the components to execute, None for all
+        if self.skip_quiescent_components and settled:
+            numbers = self._get_active_components(
+                plan, set_switches, changed_clocks
+            )
+        if self.executed_components is not None:
+            if numbers is None:
+                numbers = range(len(plan.component_groups))
+            numbers = [
+                number
+                for number in numbers
+                if number in self.executed_components
+            ]
+        if folded:
+            all_groups = plan.folded_groups
+            component_groups = plan.component_folded_groups
+        else:
+            all_groups = plan.device_groups
+            component_groups = plan.component_groups
+        if numbers is None:
+            device_groups = [(all_groups, range(len(plan.d_type_groups)))]
+        else:
+            device_groups = [
+                (component_groups[n], plan.component_d_type_groups[n])
+                for n in numbers
+            ]
+        # Once every device has settled, every D-type output holds its
+        # memory. Otherwise each D-type is executed until it does.
+        if settled and self.skip_idle_d_types:
+            self._settling_d_types = set()
+        else:
+            self._settling_d_types = set(range(len(plan.d_type_groups)))
+
+        self._settled_version = None
+        self.steady_state = True
+        for groups, d_type_groups in device_groups:
+            if not self._settle_devices(plan, groups, d_type_groups):
+                return False
+        self._settled_version = version
+        return True
+
+    def _execute_d_type_groups(self, plan, d_type_groups):
+        """Execute the D-type groups that are triggered or still settling.
+
+        The memory of a D-type only changes on a RISING CLK or a HIGH SET or
+        CLEAR, and its outputs otherwise only change until they hold the
+        memory. The other groups are not executed. Return True if
+        successful.
+        """
+        devices = self.devices
+        output_signals = devices.store.output_signals
+        settling_d_types = self._settling_d_types
+        for number in d_type_groups:
+            (
+                clock_position,
+                set_position,
+                clear_position,
+                device_ids,
+            ) = plan.d_type_groups[number]
+            if (
+                number not in settling_d_types
+                and clock_position is not None
+                and output_signals[clock_position] != devices.RISING
+                and output_signals[set_position] != devices.HIGH
+                and output_signals[clear_position] != devices.HIGH
+            ):
+                continue  # the outputs hold the memories
+            steady_state = self.steady_state
+            self.steady_state = True
+            for device_id in device_ids:  # execute DTYPE devices
+                if not self.execute_d_type(device_id):
+                    return False
+            if self.steady_state:
+                settling_d_types.discard(number)
+            else:
+                settling_d_types.add(number)
+            self.steady_state = self.steady_state and steady_state
+        return True
+
+    def _get_set_switches(self, plan):
+        """Return the switches whose outputs differ from their states."""
+        store = self.devices.store
+        set_switches = []
+        for device_id in plan.device_groups[self.devices.SWITCH]:
+            index = self.devices.get_store_index(device_id)
+            if (
+                store.get_output_signal(index, None)
+                != store.switch_states[index]
+            ):
+                set_switches.append(device_id)
+        return set_switches
+
+    def _get_active_components(self, plan, set_switches, changed_clocks):
+        """Return the components with a switch set or a clock changed.
+
+        The components are returned in order of their numbers.
+        """
+        active = set()
+        for device_id in set_switches + changed_clocks:
+            active.add(plan.component_numbers[device_id])
+        return sorted(active)
+
+    def _settle_devices(self, plan, device_groups, d_type_groups):
+        """Execute the given devices until their signals settle.
+
+        device_groups maps each device kind to the IDs of the devices to
+        execute, and d_type_groups are the numbers of the plan's D-type
+        groups to execute. The duplicate gates of the plan copy the output
+        of their gates instead. Return True if successful and the signals
+        settle within the iteration limit.
+        """
+        devices = self.devices
+        clock_devices = device_groups[devices.CLOCK]
+        switch_devices = device_groups[devices.SWITCH]
+        # (device IDs, execute function, arguments) of each kind of gate
+        gate_groups = [
+            (device_groups[devices.NOT], self.execute_not, ()),
+            (
+                device_groups[devices.AND],
+                self.execute_gate,
+                (devices.HIGH, devices.HIGH),
+            ),
+            (
+                device_groups[devices.OR],
+                self.execute_gate,
+                (devices.LOW, devices.LOW),
+            ),
+            (
+                device_groups[devices.NAND],
+                self.execute_gate,
+                (devices.HIGH, devices.LOW),
+            ),
+            (
+                device_groups[devices.NOR],
+                self.execute_gate,
+                (devices.LOW, devices.HIGH),
+            ),
+            (device_groups[devices.XOR], self.execute_gate, (None, None)),
+        ]
+        alias_positions = plan.alias_positions
+        output_signals = devices.store.output_signals
 
+        changing_devices = set()
         iterations = 0
+        iteration_limit = self.iteration_limit
         while iterations < iteration_limit:
             iterations += 1
             self.steady_state = True
+            tracking = iterations > iteration_limit - self.tracked_iterations
+            if tracking:
+                old_signals = array("b", output_signals)
 
             for device_id in switch_devices:  # execute switch devices
                 if not self.execute_switch(device_id):
                     return False
             # Execute D-type devices before clocks to catch the rising edge of
             # the clock
-            for device_id in d_type_devices:  # execute DTYPE devices
-                if not self.execute_d_type(device_id):
-                    return False
+            if not self._execute_d_type_groups(plan, d_type_groups):
+                return False
             for device_id in clock_devices:  # complete clock executions
                 if not self.execute_clock(device_id):
                     return False
-            for device_id in not_devices:  # execute NOT gate devices
-                if not self.execute_not(device_id):
-                    return False
-            for device_id in and_devices:  # execute AND gate devices
-                if not self.execute_gate(
-                    device_id, self.devices.HIGH, self.devices.HIGH
-                ):
-                    return False
-            for device_id in or_devices:  # execute OR gate devices
-                if not self.execute_gate(
-                    device_id, self.devices.LOW, self.devices.LOW
-                ):
-                    return False
-            for device_id in nand_devices:  # execute NAND gate devices
-                if not self.execute_gate(
-                    device_id, self.devices.HIGH, self.devices.LOW
-                ):
-                    return False
-            for device_id in nor_devices:  # execute NOR gate devices
-                if not self.execute_gate(
-                    device_id, self.devices.LOW, self.devices.HIGH
-                ):
-                    return False
-            for device_id in xor_devices:  # execute XOR devices
-                if not self.execute_gate(device_id, None, None):
-                    return False
+            # Execute NOT, AND, OR, NAND, NOR and XOR gates in turn
+            for gate_devices, execute, arguments in gate_groups:
+                for device_id in gate_devices:
+                    if device_id in alias_positions:
+                        # Copy the output of the gate it duplicates
+                        position, alias_position = alias_positions[device_id]
+                        signal = output_signals[position]
+                        if output_signals[alias_position] != signal:
+                            output_signals[alias_position] = signal
+                            self.steady_state = False
+                    elif not execute(device_id, *arguments):
+                        return False
             if self.steady_state:
                 break
+            if tracking:
+                for (device_id, execute, arguments), positions in zip(
+                    plan.order, plan.output_positions
+                ):
+                    for output_id, position in positions:
+                        if output_signals[position] != old_signals[position]:
+                            changing_devices.add(device_id)
+            if iterations == self.iteration_limit:
+                iteration_limit = self.get_iteration_limit()
+                if iteration_limit > iterations:
+                    changing_devices = set()
+        if not self.steady_state:
+            self._oscillating_devices = [
+                device_id
+                for device_id in self.devices.find_devices()
+                if device_id in changing_devices
+            ]
         return self.steady_state
+
+    def get_oscillating_devices(self):
+        """Return the devices that were still changing in the last cycle.
+
+        Return the device IDs whose outputs changed in the last
+        tracked_iterations iterations of the last cycle, if it failed to
+        settle. The levelized engine returns the loop that did not settle.
+        The vectorised and code-generation engines do not track changes, and
+        return an empty list.
+        """
+        if self.engine in [self.DICT_ENGINE, self.EVENT_ENGINE]:
+            return list(self._oscillating_devices)
+        if self.engine == self.COMPILED_ENGINE:
+            return self.get_compiled_network().get_oscillating_devices()
+        if self.engine == self.LEVELIZED_ENGINE:
+            return list(self.get_levelized_network().oscillating_loop or [])
+        return []
@@ -70,13 +70,28 @@ class Parser:
 
         # build the network while this is True, then just parse for errors
         self.syntax_valid = True
+        # ((first_device_id, first_port_id, second_device_id, second_port_id),
+        # pin1, pin2, symbol) of each connection to make once the CONNECTIONS
+        # block has been parsed, with the symbol to report its error at
+        self._connections = []
 
     def _throw_error(
-        self, error_type, description=None, prev_word=False, show_cursor=True
+        self,
+        error_type,
+        description=None,
+        prev_word=False,
+        show_cursor=True,
+        symbol=None,
     ):
-        """Add error with optional description to the list."""
+        """Add error with optional description to the list.
+
+        The error is shown at the given symbol, if any.
+        """
         error = error_type(description)
-        if prev_word:
+        if symbol is not None:
+            error.symbol = symbol
+            end_of_word = False
+        elif prev_word:
             error.symbol = self.previous_symbol
             end_of_word = True
         else:
@@ -688,11 +703,16 @@ class Parser:
                 parameter = self.devices.LOW
             elif parameter == 1:
                 parameter = self.devices.HIGH
-        for device_name in device_names:
-            device_id = self.names.query(device_name)
-            if self.devices is None:
-                return
-            error = self.devices.make_device(device_id, device_type, parameter)
+        if self.devices is None:
+            return
+        device_ids = [
+            self.names.query(device_name) for device_name in device_names
+        ]
+        # The D-types and clocks are started up once the network is built
+        errors = self.devices.make_devices(
+            device_ids, device_type, parameter, cold_start=False
+        )
+        for error in errors:
             if error == self.devices.NO_ERROR:
                 continue
 
@@ -739,7 +759,10 @@ class Parser:
                 pass
 
     def _add_connection(self, pin1, pin2):
-        """Add connection between pin1 and pin2 if valid, throw errors if not.
+        """Queue the connection between pin1 and pin2.
+
+        The connections are made together by _make_connections, which throws
+        the errors of those that are not valid.
 
         Parameters
         ----------
@@ -762,49 +785,55 @@ class Parser:
         else:
             pin2_id = None
 
+        self._connections.append(
+            (
+                (device1_id, pin1_id, device2_id, pin2_id),
+                out1,
+                out2,
+                self.current_symbol,
+            )
+        )
+
+    def _make_connections(self):
+        """Make the queued connections together, throw errors if not valid.
+
+        Each error is shown at the end of the statement of its connection.
+        """
+        connections = self._connections
+        self._connections = []
         if self.network is None:
             return
 
-        error = self.network.make_connection(
-            device1_id, pin1_id, device2_id, pin2_id
+        errors = self.network.make_connections(
+            [connection for connection, out1, out2, symbol in connections]
         )
-        if error == self.network.NO_ERROR:
-            return
+        for error, (connection, out1, out2, symbol) in zip(
+            errors, connections
+        ):
+            if error == self.network.NO_ERROR:
+                continue
 
-        self.syntax_valid = False
+            self.syntax_valid = False
 
-        if error == self.network.INPUT_TO_INPUT:
-            self._throw_error(SemanticErrors.ConnectInToIn, show_cursor=False)
-        elif error == self.network.OUTPUT_TO_OUTPUT:
-            self._throw_error(
-                SemanticErrors.ConnectOutToOut, show_cursor=False
-            )
-        elif error == self.network.INPUT_CONNECTED:
-            self._throw_error(
-                SemanticErrors.MultipleConnections, show_cursor=False
-            )
-        elif error == self.network.DEVICE_ABSENT:
-            self._throw_error(
-                SemanticErrors.UndefinedDevice, show_cursor=False
-            )
-        elif error == self.network.FIRST_PORT_ABSENT:
-            if out1 == "out":
-                self._throw_error(
-                    SemanticErrors.UndefinedOutPin, show_cursor=False
-                )
-            else:
-                self._throw_error(
-                    SemanticErrors.UndefinedInPin, show_cursor=False
-                )
-        else:
-            if out2 == "out":
-                self._throw_error(
-                    SemanticErrors.UndefinedOutPin, show_cursor=False
-                )
+            if error == self.network.INPUT_TO_INPUT:
+                error_type = SemanticErrors.ConnectInToIn
+            elif error == self.network.OUTPUT_TO_OUTPUT:
+                error_type = SemanticErrors.ConnectOutToOut
+            elif error == self.network.INPUT_CONNECTED:
+                error_type = SemanticErrors.MultipleConnections
+            elif error == self.network.DEVICE_ABSENT:
+                error_type = SemanticErrors.UndefinedDevice
+            elif error == self.network.FIRST_PORT_ABSENT:
+                if out1 == "out":
+                    error_type = SemanticErrors.UndefinedOutPin
+                else:
+                    error_type = SemanticErrors.UndefinedInPin
             else:
-                self._throw_error(
-                    SemanticErrors.UndefinedInPin, show_cursor=False
-                )
+                if out2 == "out":
+                    error_type = SemanticErrors.UndefinedOutPin
+                else:
+                    error_type = SemanticErrors.UndefinedInPin
+            self._throw_error(error_type, show_cursor=False, symbol=symbol)
 
     def _add_monitors(self, pins):
         """Add monitors pins, throw errors if not possible.
@@ -872,6 +901,10 @@ class Parser:
                 return False
 
         success = self._parse_connection_block()
+        self._make_connections()
+        if self.devices is not None:
+            # Start up every D-type and clock once the network is built
+            self.devices.cold_startup()
         if success is None:
             # there was unexpected end of file
             self.syntax_valid = False
@@ -885,9 +918,17 @@ class Parser:
         # check if all inputs are connected
         if self.syntax_valid:
             if self.network is not None and not self.network.check_network():
+                floating_inputs = [
+                    self.devices.get_signal_name(device_id, input_id)
+                    for device_id, input_id in (
+                        self.network.get_floating_inputs()
+                    )
+                ]
                 self._throw_error(
                     SemanticErrors.FloatingInput,
-                    _("Some pins are not connected"),
+                    _("Some pins are not connected")
+                    + ": "
+                    + ", ".join(floating_inputs),
                 )
                 self.syntax_valid = False
 
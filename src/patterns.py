@@ -0,0 +1,152 @@
+"""Simulate many switch patterns at once with bitwise operations.
+
+Used in the Logic Simulator project to sweep combinations of switch states,
+where simulating each combination with Network.execute_network() in turn is
+too slow.
+
+SPHINX-IGNORE
+Classes
+-------
+PatternNetwork - evaluates the logic for many switch patterns in one pass.
+SPHINX-IGNORE
+"""
+
+
+class PatternNetwork:
+    """Evaluate the logic of the network for many switch patterns in one pass.
+
+    Every signal is stored as a Python int used as a bit-vector, with one bit
+    for each pattern, called a lane. A set bit means the signal is HIGH in
+    that lane. The gates are evaluated once each in the level order of
+    network.get_levelized_network() using bitwise operators, which gives the
+    settled value of every signal in every lane.
+
+    Only the switches differ between lanes. D-type and clock outputs keep
+    their current values, read as HIGH or LOW, in every lane.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    network:
+        instance of the network.Network() class.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    pack_patterns(self, patterns):
+        Returns the switch bit-vectors and the number of lanes for a list of
+        switch patterns.
+    simulate(self, switch_vectors, lanes):
+        Returns the bit-vector of every output.
+    get_lane(self, output_vectors, lane):
+        Returns the signal of every output in the given lane.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self, devices, network):
+        """Build the list of gate evaluations in level order."""
+        self.devices = devices
+        self.network = network
+        self.levelized = levelized = network.get_levelized_network()
+
+        # Logic cannot be evaluated in one pass if there is a feedback loop
+        self.acyclic = levelized.complete and not levelized.loops
+
+        # (kind code, output slot, input slots) of every gate in level order
+        self.gates = []
+        for number in levelized.gate_order:
+            start = levelized.fanin_start[number]
+            end = levelized.fanin_start[number + 1]
+            self.gates.append(
+                (
+                    levelized.kinds[number],
+                    levelized.output_slots[number],
+                    list(levelized.fanin[start:end]),
+                )
+            )
+
+        first, last = levelized.kind_ranges[levelized.SWITCH]
+        self.switch_slots = {
+            levelized.device_ids[number]: levelized.output_slots[number]
+            for number in range(first, last)
+        }
+
+    def pack_patterns(self, patterns):
+        """Return the switch bit-vectors and the number of lanes.
+
+        patterns is a list of {switch_id: switch state} dictionaries, one for
+        each lane. The result can be passed to simulate().
+        """
+        switch_vectors = {}
+        for lane, pattern in enumerate(patterns):
+            for switch_id, state in pattern.items():
+                if state == self.devices.HIGH:
+                    switch_vectors[switch_id] = switch_vectors.get(
+                        switch_id, 0
+                    ) | (1 << lane)
+                else:
+                    switch_vectors.setdefault(switch_id, 0)
+        return switch_vectors, len(patterns)
+
+    def simulate(self, switch_vectors, lanes):
+        """Return the bit-vector of every output.
+
+        switch_vectors maps switch IDs to bit-vectors of their states in each
+        of the lanes. Switches that are not given keep their current state in
+        every lane. The result maps (device_id, output_id) to a bit-vector.
+        Return None if an input is unconnected or the logic has a feedback
+        loop.
+        """
+        if not self.acyclic:
+            return None
+        devices = self.devices
+        levelized = self.levelized
+        levelized.load_state()
+        mask = (1 << lanes) - 1
+
+        # D-type and clock outputs take their current value in every lane
+        values = [
+            mask if levelized.resolved[signal] == devices.HIGH else 0
+            for signal in levelized.signals
+        ]
+        for switch_id, slot in self.switch_slots.items():
+            if switch_id in switch_vectors:
+                values[slot] = switch_vectors[switch_id] & mask
+            elif devices.get_device(switch_id).switch_state == devices.HIGH:
+                values[slot] = mask
+            else:
+                values[slot] = 0
+
+        for kind_code, output_slot, input_slots in self.gates:
+            if kind_code == levelized.NOT:
+                value = ~values[input_slots[0]] & mask
+            elif kind_code == levelized.XOR:
+                value = values[input_slots[0]] ^ values[input_slots[1]]
+            elif kind_code in [levelized.AND, levelized.NAND]:
+                value = mask
+                for slot in input_slots:
+                    value &= values[slot]
+                if kind_code == levelized.NAND:
+                    value ^= mask
+            else:
+                value = 0
+                for slot in input_slots:
+                    value |= values[slot]
+                if kind_code == levelized.NOR:
+                    value ^= mask
+            values[output_slot] = value
+
+        return dict(zip(levelized.slots, values))
+
+    def get_lane(self, output_vectors, lane):
+        """Return the signal of every output in the given lane.
+
+        The result maps (device_id, output_id) to HIGH or LOW.
+        """
+        return {
+            output: self.devices.HIGH
+            if value >> lane & 1
+            else self.devices.LOW
+            for output, value in output_vectors.items()
+        }
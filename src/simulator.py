@@ -0,0 +1,407 @@
+"""Run the network for many simulation cycles and record the monitors.
+
+Used in the Logic Simulator project by the user interfaces to run and
+continue simulations.
+
+SPHINX-IGNORE
+Classes
+-------
+Simulator - runs the network and records the monitored signals.
+SPHINX-IGNORE
+"""
+import hashlib
+import multiprocessing
+
+# Simulator whose run is shared with the worker processes of a parallel run,
+# which inherit it when they are forked
+_parallel_simulator = None
+
+
+def _run_components(numbers, cycles):
+    """Run the given components in a worker process of a parallel run.
+
+    Return (success, traces, state), where traces maps each monitor of the
+    components to the signals recorded in this run, and state is the
+    (output_signals, dtype_memories, clock_counters) arrays of the store.
+    """
+    simulator = _parallel_simulator
+    simulator.processes = 1
+    simulator.network.executed_components = set(numbers)
+    monitors_dictionary = simulator.monitors.monitors_dictionary
+    plan = simulator.network.get_execution_plan()
+    starts = {
+        monitor: len(signal_list)
+        for monitor, signal_list in monitors_dictionary.items()
+        if plan.component_numbers[monitor[0]] in numbers
+    }
+    success = simulator.run(cycles)
+    traces = {
+        monitor: monitors_dictionary[monitor][start:]
+        for monitor, start in starts.items()
+    }
+    store = simulator.devices.store
+    state = (store.output_signals, store.dtype_memories, store.clock_counters)
+    return success, traces, state
+
+
+class Simulator:
+    """Run the network and record the monitored signals.
+
+    After a cycle in which the signals settle, the next cycles give the same
+    signals until a clock changes state or a switch is set, as only the
+    clock counters change. The simulator finds the next clock edge from the
+    clock_half_period and clock_counter of every clock, and skips the cycles
+    before it by advancing the clock counters and appending the unchanged
+    signals to the monitors.
+
+    The state of the network, which is every output, D-type memory and clock
+    counter, is also hashed before every cycle that is executed or skipped.
+    When a state recurs within a run, the network has entered a periodic
+    orbit, and the monitored signals of the last period are repeated for as
+    many whole periods as the run has left, without executing the network.
+
+    If the network oscillates, the cycle number, the devices that were still
+    changing and the feedback loops they belong to are kept, and are given
+    by get_oscillation_report().
+
+    The network is set to skip its quiescent connected components, so that
+    only the blocks of the circuit whose switches or clocks changed are
+    executed in each cycle, to fold the logic driven only by switches
+    into constants until a switch is set, and to execute only one of each
+    set of duplicate gates.
+
+    If skip_idle_d_types is set, the D-types are only executed when they are
+    clocked, set or cleared, once every device has settled. This relies on
+    the D-type memories only being written by the network, so it is not set
+    by default.
+
+    If processes is more than 1, the connected components are shared out
+    between that many forked worker processes, which each run all the cycles
+    of their components. The monitored signals and the state of the devices
+    are then merged back. If a component oscillates, the run is repeated in
+    this process to find the cycle and devices of the oscillation. Networks
+    of one component, monitors that are being dumped to a file, and
+    platforms that cannot fork, are run in this process.
+
+    If prune_to_monitors is set, only the devices that can affect a
+    monitored output are executed, which are found again whenever a monitor
+    is made or removed. The other devices keep their signals, so a monitor
+    made later on them does not give the signals of a full simulation.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    network:
+        instance of the network.Network() class.
+    monitors:
+        instance of the monitors.Monitors() class.
+    processes:
+        number of worker processes to run the components with.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    get_idle_cycles(self, cycles):
+        Returns the number of the next cycles that would not change any
+        signal, up to the given number.
+    run(self, cycles):
+        Runs the network for the given number of cycles and records the
+        monitored signals.
+    get_oscillation_report(self):
+        Returns the cycle, devices and feedback loops of the last
+        oscillation.
+    get_oscillation_messages(self):
+        Returns lines of text describing the last oscillation.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self, devices, network, monitors, processes=1):
+        """Initialise the simulator state."""
+        self.devices = devices
+        self.network = network
+        self.monitors = monitors
+        self.processes = processes
+
+        # Versions of the network when the signals last settled, None if they
+        # have not settled since
+        self._settled_version = None
+        # Set to False to stop looking for periodic states
+        self.detect_periods = True
+        # Set to True to only execute the fan-in cone of the monitors
+        self.prune_to_monitors = False
+        # Set to True to only execute the D-types that are triggered
+        self.skip_idle_d_types = False
+        # (versions, fan-in cone) of the monitored outputs, or None
+        self._monitor_cone = None
+
+        # Cycles completed since the last cold start
+        self.cycles_completed = 0
+        self._startup_count = devices.startup_count
+        # (cycle, device IDs, loops) of the last oscillation, or None
+        self._oscillation = None
+
+        # The simulator only changes the devices through the network, so
+        # components that have settled and constant logic need not be
+        # executed again
+        network.skip_quiescent_components = True
+        network.fold_constants = True
+        network.merge_duplicate_gates = True
+
+    def _get_version(self):
+        """Return the versions of the structure and start-up state."""
+        return (
+            self.devices.structure_version,
+            self.network.structure_version,
+            self.devices.startup_count,
+            self.network.executed_devices,
+        )
+
+    def _get_monitor_cone(self):
+        """Return the fan-in cone of the monitored outputs.
+
+        The cone is only found again after the monitors or the network
+        change.
+        """
+        version = (
+            self.devices.structure_version,
+            self.network.structure_version,
+            self.monitors.monitor_version,
+        )
+        if self._monitor_cone is None or self._monitor_cone[0] != version:
+            cone = self.network.get_fan_in_cone(
+                list(self.monitors.monitors_dictionary)
+            )
+            self._monitor_cone = (version, cone)
+        return self._monitor_cone[1]
+
+    def get_idle_cycles(self, cycles):
+        """Return how many of the next cycles would not change any signal.
+
+        The result is at most cycles. It is 0 unless the signals settled in
+        the last cycle and no switch has been set since. Only the switches
+        and clocks that the network executes are considered.
+        """
+        if self._settled_version != self._get_version():
+            return 0
+        plan = self.network.get_execution_plan()
+        for device_id in plan.device_groups[self.devices.SWITCH]:
+            device = self.devices.get_device(device_id)
+            if device.outputs[None] != device.switch_state:
+                return 0
+
+        idle_cycles = cycles
+        for device_id in plan.device_groups[self.devices.CLOCK]:
+            device = self.devices.get_device(device_id)
+            # update_clocks() changes the clock when the counter reaches the
+            # half period, and a counter above it never does
+            if device.clock_counter <= device.clock_half_period:
+                idle_cycles = min(
+                    idle_cycles,
+                    device.clock_half_period - device.clock_counter,
+                )
+        return idle_cycles
+
+    def _get_state_hash(self):
+        """Return the hash of all outputs, D-type memories and counters."""
+        store = self.devices.store
+        digest = hashlib.blake2b(digest_size=16)
+        # Elements left unused in the store never change, so hashing them
+        # does not change which states are equal
+        for values in [
+            store.output_signals,
+            store.dtype_memories,
+            store.clock_counters,
+        ]:
+            digest.update(values.tobytes())
+        return digest.digest()
+
+    def _skip_cycles(self, cycles):
+        """Advance the clocks and record the monitors for idle cycles.
+
+        As in Network.update_clocks(), only the executed clocks advance.
+        """
+        plan = self.network.get_execution_plan()
+        for device_id in plan.device_groups[self.devices.CLOCK]:
+            self.devices.get_device(device_id).clock_counter += cycles
+        self.monitors.record_signals(cycles)
+
+    def run(self, cycles):
+        """Run the network for the given number of cycles.
+
+        The monitored signals are recorded after every cycle. Return True if
+        successful, or False if the network oscillates.
+        """
+        if self._startup_count != self.devices.startup_count:
+            self._startup_count = self.devices.startup_count
+            self.cycles_completed = 0
+        self._oscillation = None
+        self.network.skip_idle_d_types = self.skip_idle_d_types
+        if self.prune_to_monitors:
+            self.network.executed_devices = self._get_monitor_cone()
+        else:
+            self.network.executed_devices = None
+        if self.processes > 1 and self._run_parallel(cycles):
+            self.cycles_completed += cycles
+            return True
+        completed = 0
+        detect_periods = self.detect_periods
+        # Brent's cycle detection keeps a single checkpoint state, moved to
+        # the current state whenever the cycles since it reach the next power
+        # of two, so that any period is found once the checkpoint is in it
+        checkpoint_hash = None
+        checkpoint_completed = 0
+        checkpoint_interval = 1
+        while completed < cycles:
+            if detect_periods:
+                state_hash = self._get_state_hash()
+                if state_hash == checkpoint_hash:
+                    period = completed - checkpoint_completed
+                    repeats = (cycles - completed) // period
+                    # Fewer cycles than a period are left to simulate, or
+                    # the monitors no longer hold the period to repeat
+                    detect_periods = False
+                    if self.monitors.repeat_signals(period, repeats):
+                        completed += period * repeats
+                        continue
+                elif (
+                    checkpoint_hash is None
+                    or completed - checkpoint_completed >= checkpoint_interval
+                ):
+                    if checkpoint_hash is not None:
+                        checkpoint_interval *= 2
+                    checkpoint_hash = state_hash
+                    checkpoint_completed = completed
+
+            idle_cycles = self.get_idle_cycles(cycles - completed)
+            if idle_cycles:
+                self._skip_cycles(idle_cycles)
+                completed += idle_cycles
+                continue
+            if not self.network.execute_network():
+                self._settled_version = None
+                self._record_oscillation(self.cycles_completed + completed + 1)
+                self.cycles_completed += completed
+                return False
+            self.monitors.record_signals()
+            self._settled_version = self._get_version()
+            completed += 1
+        self.cycles_completed += completed
+        return True
+
+    def _share_components(self):
+        """Return the component numbers to run in each worker process.
+
+        The largest components are given out first, each to the worker with
+        the fewest devices so far.
+        """
+        plan = self.network.get_execution_plan()
+        sizes = [
+            sum(len(device_ids) for device_ids in groups.values())
+            for groups in plan.component_groups
+        ]
+        shares = [
+            [] for _ in range(min(self.processes, len(plan.component_groups)))
+        ]
+        share_sizes = [0] * len(shares)
+        for number in sorted(range(len(sizes)), key=lambda n: -sizes[n]):
+            smallest = share_sizes.index(min(share_sizes))
+            shares[smallest].append(number)
+            share_sizes[smallest] += sizes[number]
+        return shares
+
+    def _run_parallel(self, cycles):
+        """Run the components in worker processes for the given cycles.
+
+        Return True if every component settled in every cycle and the
+        results have been merged, or False if nothing has been changed and
+        the run must be done in this process.
+        """
+        global _parallel_simulator
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return False
+        if self.network.engine != self.network.DICT_ENGINE:
+            return False
+        # Only this process can write the signals to a dump
+        if self.monitors.vcd_writer is not None:
+            return False
+        shares = self._share_components()
+        if len(shares) < 2:
+            return False
+
+        _parallel_simulator = self
+        try:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(len(shares)) as pool:
+                results = pool.starmap(
+                    _run_components, [(share, cycles) for share in shares]
+                )
+        finally:
+            _parallel_simulator = None
+        if not all(success for success, traces, state in results):
+            return False
+
+        # Merge the traces back in the original monitor order
+        traces = {}
+        for success, share_traces, state in results:
+            traces.update(share_traces)
+        for monitor, signal_list in self.monitors.monitors_dictionary.items():
+            signal_list.extend(traces[monitor])
+
+        plan = self.network.get_execution_plan()
+        store = self.devices.store
+        for share, (success, share_traces, state) in zip(shares, results):
+            output_signals, dtype_memories, clock_counters = state
+            share = set(share)
+            # Every device of the components, including duplicate gates
+            for device_id, number in plan.component_numbers.items():
+                if number not in share:
+                    continue
+                index = self.devices.get_store_index(device_id)
+                for output_id in store.get_output_ids(index):
+                    position = store.get_output_position(index, output_id)
+                    store.output_signals[position] = output_signals[position]
+                store.dtype_memories[index] = dtype_memories[index]
+                store.clock_counters[index] = clock_counters[index]
+        self._settled_version = self._get_version()
+        return True
+
+    def _record_oscillation(self, cycle):
+        """Keep the devices and loops of an oscillation in the given cycle."""
+        device_ids = self.network.get_oscillating_devices()
+        loops = []
+        if device_ids:
+            # Loops are only found once the network has oscillated
+            for loop in self.network.get_feedback_loops():
+                if any(device_id in loop for device_id in device_ids):
+                    loops.append(loop)
+        self._oscillation = (cycle, device_ids, loops)
+
+    def get_oscillation_report(self):
+        """Return the cycle, devices and feedback loops of the oscillation.
+
+        Return (cycle, device_ids, loops) if the last run failed, where cycle
+        counts from 1 at the last cold start, device_ids are the devices that
+        were still changing, and loops are the feedback loops that contain
+        any of them. Return None if the last run succeeded.
+        """
+        return self._oscillation
+
+    def get_oscillation_messages(self):
+        """Return lines of text describing the devices of the oscillation."""
+        if self._oscillation is None:
+            return []
+        cycle, device_ids, loops = self._oscillation
+        names = self.devices.names
+        messages = []
+        if device_ids:
+            messages.append(
+                "Devices still changing: "
+                + ", ".join(names.get_name_string(i) for i in device_ids)
+            )
+        for loop in loops:
+            messages.append(
+                "Feedback loop: "
+                + ", ".join(names.get_name_string(i) for i in loop)
+            )
+        return messages
@@ -0,0 +1,562 @@
+"""Store the state of all devices in typed arrays.
+
+Used in the Logic Simulator project to keep the memory used by large networks
+small. Every device property and port is held in a typed array instead of in
+the attributes and dictionaries of a Python object per device.
+
+SPHINX-IGNORE
+Classes
+-------
+DeviceStore - stores the properties and ports of all devices in arrays.
+InputPorts - view of the inputs of a device as a dictionary.
+OutputSignals - view of the outputs of a device as a dictionary.
+SPHINX-IGNORE
+"""
+from array import array
+from collections.abc import MutableMapping
+
+# Stored in place of None, as name IDs and signals are never negative
+NONE = -1
+
+
+def to_stored(value):
+    """Return the value to store for value, which may be None."""
+    return NONE if value is None else value
+
+
+def from_stored(value):
+    """Return the value that was stored as value."""
+    return None if value == NONE else value
+
+
+def to_stored_connection(connection):
+    """Return the (device_id, port_id) to store for a connection or None."""
+    if connection is None:
+        return (NONE, NONE)
+    connected_device, connected_port = connection
+    return (connected_device, to_stored(connected_port))
+
+
+class DeviceStore:
+    """Store the properties and ports of all devices in typed arrays.
+
+    Each device is given an index, and its properties are held at that index
+    of one array per property. The input and output IDs of a device are
+    given by its layout, which is shared by all devices with the same IDs.
+    The inputs and output signals of a device are held in consecutive
+    elements of the port arrays, starting at input_starts[index] and
+    output_starts[index].
+
+    When a port is added to or removed from a device whose ports are not
+    at the end of the port arrays, its ports are moved to the end. The
+    elements they used are left unused, as are the elements of removed
+    devices, so that indices never change.
+
+    Attributes
+    ----------
+    device_indices: array
+        Index of each device ID, with NONE if there is no such device.
+    device_ids, kinds, clock_half_periods, clock_counters, switch_states,
+    dtype_memories: array
+        Device ID and properties of each device, with NONE for None.
+    layouts: array
+        Layout number of each device.
+    input_starts, output_starts: array
+        Position of the first input and output of each device.
+    input_devices, input_ports: array
+        Device and port IDs of the output connected to each input, with NONE
+        for an unconnected input or for the port ID None.
+    output_signals: array
+        Signal of each output.
+    layout_ports: list
+        (input_ids, output_ids, input_positions, output_positions) of each
+        layout, where the positions map port IDs to their position.
+    floating_inputs: set
+        (device_id, input_id) of every unconnected input, kept up to date as
+        ports are set and inputs are connected or disconnected.
+    fanout_starts: array
+        Position in the fanout arrays of the first input connected to each
+        output, followed by the number of connected inputs.
+    fanout_devices, fanout_inputs: array
+        Device and input IDs of the inputs connected to each output, in order
+        of the outputs. They are only up to date after update_fanouts().
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    add_device(self, device_id, device_kind):
+        Adds a device with no ports and returns its index.
+    remove_device(self, index):
+        Marks the device as removed.
+    set_ports(self, index, input_ids, output_ids, inputs, signals):
+        Sets the ports of the device and their values.
+    get_input_ids(self, index):
+        Returns the input IDs of the device.
+    get_output_ids(self, index):
+        Returns the output IDs of the device.
+    has_input(self, index, input_id):
+        Returns True if the device has the input.
+    has_output(self, index, output_id):
+        Returns True if the device has the output.
+    connect_input(self, index, input_id, device_id, port_id):
+        Connects the input of the device to the given output.
+    disconnect_input(self, index, input_id):
+        Disconnects the input of the device.
+    get_input_position(self, index, input_id):
+        Returns the position of the input in the input arrays, or None.
+    get_output_position(self, index, output_id):
+        Returns the position of the output in output_signals, or None.
+    get_output_signal(self, index, output_id):
+        Returns the signal of the output, or None.
+    get_connected_output(self, index, input_id):
+        Returns the output connected to the input, or None.
+    get_input_signal(self, index, input_id):
+        Returns the signal of the output connected to the input, or None.
+    update_fanouts(self):
+        Finds the inputs connected to each output, if they have changed.
+    get_fanouts(self, index, output_id):
+        Returns the device and input IDs of the inputs connected to the
+        output.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self):
+        """Initialise the empty arrays."""
+        # device_indices stores the index of each device ID, or NONE if there
+        # is no such device
+        self.device_indices = array("i")
+        self.device_ids = array("i")
+        self.kinds = array("i")
+        self.clock_half_periods = array("q")
+        self.clock_counters = array("q")
+        self.switch_states = array("b")
+        self.dtype_memories = array("b")
+        self.layouts = array("i")
+        self.input_starts = array("i")
+        self.output_starts = array("i")
+
+        self.input_devices = array("i")
+        self.input_ports = array("i")
+        self.output_signals = array("b")
+
+        self.layout_ports = []
+        # _layout_numbers stores {(input_ids, output_ids): layout number}
+        self._layout_numbers = {}
+        self._get_layout((), ())
+
+        self.floating_inputs = set()
+
+        # The inputs connected to the output at position p are held from
+        # fanout_starts[p] to fanout_starts[p + 1] of the fanout arrays. They
+        # are found from the input arrays when first needed after a change.
+        self.fanout_starts = array("i", [0])
+        self.fanout_devices = array("i")
+        self.fanout_inputs = array("i")
+        self._fanouts_changed = False
+
+    def _get_layout(self, input_ids, output_ids):
+        """Return the number of the layout with the given port IDs."""
+        key = (input_ids, output_ids)
+        if key not in self._layout_numbers:
+            self._layout_numbers[key] = len(self.layout_ports)
+            self.layout_ports.append(
+                (
+                    input_ids,
+                    output_ids,
+                    {port_id: i for i, port_id in enumerate(input_ids)},
+                    {port_id: i for i, port_id in enumerate(output_ids)},
+                )
+            )
+        return self._layout_numbers[key]
+
+    def add_device(self, device_id, device_kind):
+        """Add a device with no ports and return its index."""
+        index = len(self.device_ids)
+        if device_id >= len(self.device_indices):
+            self.device_indices.extend(
+                [NONE] * (device_id + 1 - len(self.device_indices))
+            )
+        self.device_indices[device_id] = index
+        self.device_ids.append(device_id)
+        self.kinds.append(to_stored(device_kind))
+        self.clock_half_periods.append(NONE)
+        self.clock_counters.append(NONE)
+        self.switch_states.append(NONE)
+        self.dtype_memories.append(NONE)
+        self.layouts.append(0)
+        self.input_starts.append(len(self.input_devices))
+        self.output_starts.append(len(self.output_signals))
+        return index
+
+    def remove_device(self, index):
+        """Mark the device as removed, leaving its elements unused.
+
+        The inputs connected to its outputs are disconnected, and so become
+        floating inputs.
+        """
+        device_id = self.device_ids[index]
+        for output_id in self.get_output_ids(index):
+            for connected_device, input_id in self.get_fanouts(
+                index, output_id
+            ):
+                self.disconnect_input(
+                    self.device_indices[connected_device], input_id
+                )
+        for input_id in self.get_input_ids(index):
+            self.floating_inputs.discard((device_id, input_id))
+        self.device_indices[device_id] = NONE
+        self.device_ids[index] = NONE
+        self._fanouts_changed = True
+
+    def get_input_ids(self, index):
+        """Return the tuple of input IDs of the device."""
+        return self.layout_ports[self.layouts[index]][0]
+
+    def get_output_ids(self, index):
+        """Return the tuple of output IDs of the device."""
+        return self.layout_ports[self.layouts[index]][1]
+
+    def has_input(self, index, input_id):
+        """Return True if the device has the input."""
+        return input_id in self.layout_ports[self.layouts[index]][2]
+
+    def has_output(self, index, output_id):
+        """Return True if the device has the output."""
+        return output_id in self.layout_ports[self.layouts[index]][3]
+
+    def connect_input(self, index, input_id, device_id, port_id):
+        """Connect the input of the device to the given output."""
+        position = self.get_input_position(index, input_id)
+        self.input_devices[position] = device_id
+        self.input_ports[position] = to_stored(port_id)
+        self.floating_inputs.discard((self.device_ids[index], input_id))
+        self._fanouts_changed = True
+
+    def disconnect_input(self, index, input_id):
+        """Disconnect the input of the device."""
+        position = self.get_input_position(index, input_id)
+        self.input_devices[position] = NONE
+        self.input_ports[position] = NONE
+        self.floating_inputs.add((self.device_ids[index], input_id))
+        self._fanouts_changed = True
+
+    def get_input_position(self, index, input_id):
+        """Return the position of the input in the input arrays, or None."""
+        position = self.layout_ports[self.layouts[index]][2].get(input_id)
+        if position is None:
+            return None
+        return self.input_starts[index] + position
+
+    def get_output_position(self, index, output_id):
+        """Return the position of the output in output_signals, or None."""
+        position = self.layout_ports[self.layouts[index]][3].get(output_id)
+        if position is None:
+            return None
+        return self.output_starts[index] + position
+
+    def get_output_signal(self, index, output_id):
+        """Return the signal of the output, or None if there is no output."""
+        position = self.layout_ports[self.layouts[index]][3].get(output_id)
+        if position is None:
+            return None
+        return self.output_signals[self.output_starts[index] + position]
+
+    def get_connected_output(self, index, input_id):
+        """Return the (device_id, port_id) connected to the input.
+
+        Return None if there is no such input or it is unconnected.
+        """
+        position = self.layout_ports[self.layouts[index]][2].get(input_id)
+        if position is None:
+            return None
+        position += self.input_starts[index]
+        connected_device = self.input_devices[position]
+        if connected_device == NONE:
+            return None
+        return (connected_device, from_stored(self.input_ports[position]))
+
+    def get_input_signal(self, index, input_id):
+        """Return the signal of the output connected to the input.
+
+        Return None if there is no such input or output, or the input is
+        unconnected.
+        """
+        position = self.layout_ports[self.layouts[index]][2].get(input_id)
+        if position is None:
+            return None
+        position += self.input_starts[index]
+        connected_device = self.input_devices[position]
+        if connected_device == NONE:
+            return None
+        connected_index = self.device_indices[connected_device]
+        if connected_index == NONE:
+            return None
+        output_id = self.input_ports[position]
+        position = self.layout_ports[self.layouts[connected_index]][3].get(
+            None if output_id == NONE else output_id
+        )
+        if position is None:
+            return None
+        return self.output_signals[
+            self.output_starts[connected_index] + position
+        ]
+
+    def set_ports(self, index, input_ids, output_ids, inputs, signals):
+        """Set the ports of the device and their values.
+
+        inputs holds the (device_id, port_id) stored for each input, with
+        NONE for None, and signals holds the signal of each output.
+        """
+        input_ids = tuple(input_ids)
+        output_ids = tuple(output_ids)
+        inputs = list(inputs)
+        old_inputs, old_outputs = self.layout_ports[self.layouts[index]][:2]
+        device_id = self.device_ids[index]
+        for input_id in old_inputs:
+            self.floating_inputs.discard((device_id, input_id))
+        for input_id, (connected_device, connected_port) in zip(
+            input_ids, inputs
+        ):
+            if connected_device == NONE:
+                self.floating_inputs.add((device_id, input_id))
+        start = self.input_starts[index]
+        if start + len(old_inputs) == len(self.input_devices):
+            # The inputs are at the end, so they can grow in place
+            del self.input_devices[start:]
+            del self.input_ports[start:]
+        else:
+            self.input_starts[index] = len(self.input_devices)
+        for connected_device, connected_port in inputs:
+            self.input_devices.append(connected_device)
+            self.input_ports.append(connected_port)
+
+        start = self.output_starts[index]
+        if start + len(old_outputs) == len(self.output_signals):
+            del self.output_signals[start:]
+        else:
+            self.output_starts[index] = len(self.output_signals)
+        self.output_signals.extend(signals)
+
+        self.layouts[index] = self._get_layout(input_ids, output_ids)
+        self._fanouts_changed = True
+
+    def update_fanouts(self):
+        """Find the inputs connected to each output, if they have changed.
+
+        The connected inputs of every device are counted for each output
+        position, and then placed in the fanout arrays in order of their
+        outputs, so that no object is kept for each connection.
+        """
+        if not self._fanouts_changed:
+            return
+        # Output position, device ID and input ID of each connection
+        sources = array("i")
+        connected_devices = array("i")
+        connected_inputs = array("i")
+        for index, device_id in enumerate(self.device_ids):
+            if device_id == NONE:  # removed device
+                continue
+            start = self.input_starts[index]
+            for offset, input_id in enumerate(self.get_input_ids(index)):
+                source_device = self.input_devices[start + offset]
+                if source_device == NONE:
+                    continue
+                source_index = self.device_indices[source_device]
+                if source_index == NONE:
+                    continue
+                position = self.get_output_position(
+                    source_index, from_stored(self.input_ports[start + offset])
+                )
+                if position is None:
+                    continue
+                sources.append(position)
+                connected_devices.append(device_id)
+                connected_inputs.append(to_stored(input_id))
+
+        self.fanout_starts = array("i", [0]) * (len(self.output_signals) + 1)
+        for position in sources:
+            self.fanout_starts[position + 1] += 1
+        for position in range(len(self.output_signals)):
+            self.fanout_starts[position + 1] += self.fanout_starts[position]
+        next_free = self.fanout_starts[:-1]
+        self.fanout_devices = array("i", [NONE]) * len(sources)
+        self.fanout_inputs = array("i", [NONE]) * len(sources)
+        for number, position in enumerate(sources):
+            self.fanout_devices[next_free[position]] = connected_devices[
+                number
+            ]
+            self.fanout_inputs[next_free[position]] = connected_inputs[number]
+            next_free[position] += 1
+        self._fanouts_changed = False
+
+    def get_fanouts(self, index, output_id):
+        """Return the (device_id, input_id) of each input the output drives.
+
+        Return an empty list if there is no such output.
+        """
+        position = self.get_output_position(index, output_id)
+        if position is None:
+            return []
+        self.update_fanouts()
+        return [
+            (
+                self.fanout_devices[number],
+                from_stored(self.fanout_inputs[number]),
+            )
+            for number in range(
+                self.fanout_starts[position], self.fanout_starts[position + 1]
+            )
+        ]
+
+
+class InputPorts(MutableMapping):
+    """View of the inputs of a device as a dictionary.
+
+    Maps each input ID to the (device_id, port_id) of the output connected
+    to it, or None if it is unconnected. Adding or deleting an input changes
+    the layout of the device.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        """Set the store and index of the device."""
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, input_id):
+        """Return the output connected to the input, or None."""
+        if input_id not in self:
+            raise KeyError(input_id)
+        return self._store.get_connected_output(self._index, input_id)
+
+    def __setitem__(self, input_id, connection):
+        """Connect the input to an output, or disconnect it with None."""
+        store = self._store
+        if not store.has_input(self._index, input_id):
+            input_ids = store.get_input_ids(self._index) + (input_id,)
+            inputs = [to_stored_connection(self[i]) for i in input_ids[:-1]]
+            inputs.append(to_stored_connection(connection))
+            self._set_inputs(input_ids, inputs)
+        elif connection is None:
+            store.disconnect_input(self._index, input_id)
+        else:
+            store.connect_input(self._index, input_id, *connection)
+
+    def __delitem__(self, input_id):
+        """Remove the input from the device."""
+        if input_id not in self:
+            raise KeyError(input_id)
+        input_ids = tuple(
+            i for i in self._store.get_input_ids(self._index) if i != input_id
+        )
+        self._set_inputs(
+            input_ids, [to_stored_connection(self[i]) for i in input_ids]
+        )
+
+    def _set_inputs(self, input_ids, inputs):
+        """Replace the inputs of the device."""
+        store = self._store
+        output_ids = store.get_output_ids(self._index)
+        start = store.output_starts[self._index]
+        store.set_ports(
+            self._index,
+            input_ids,
+            output_ids,
+            inputs,
+            store.output_signals[start : start + len(output_ids)],
+        )
+
+    def __contains__(self, input_id):
+        """Return True if the device has the input."""
+        store = self._store
+        return input_id in store.layout_ports[store.layouts[self._index]][2]
+
+    def __iter__(self):
+        """Iterate over the input IDs."""
+        return iter(self._store.get_input_ids(self._index))
+
+    def __len__(self):
+        """Return the number of inputs."""
+        return len(self._store.get_input_ids(self._index))
+
+    def __repr__(self):
+        """Return the dictionary representation of the inputs."""
+        return repr(dict(self))
+
+
+class OutputSignals(MutableMapping):
+    """View of the outputs of a device as a dictionary.
+
+    Maps each output ID to its signal. Adding or deleting an output changes
+    the layout of the device.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        """Set the store and index of the device."""
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, output_id):
+        """Return the signal of the output."""
+        position = self._store.get_output_position(self._index, output_id)
+        if position is None:
+            raise KeyError(output_id)
+        return self._store.output_signals[position]
+
+    def __setitem__(self, output_id, signal):
+        """Set the signal of the output, adding the output if needed."""
+        store = self._store
+        position = store.get_output_position(self._index, output_id)
+        if position is not None:
+            store.output_signals[position] = signal
+            return
+        output_ids = store.get_output_ids(self._index) + (output_id,)
+        signals = [self[i] for i in output_ids[:-1]]
+        signals.append(signal)
+        self._set_outputs(output_ids, signals)
+
+    def __delitem__(self, output_id):
+        """Remove the output from the device."""
+        if output_id not in self:
+            raise KeyError(output_id)
+        output_ids = tuple(
+            i
+            for i in self._store.get_output_ids(self._index)
+            if i != output_id
+        )
+        self._set_outputs(output_ids, [self[i] for i in output_ids])
+
+    def _set_outputs(self, output_ids, signals):
+        """Replace the outputs of the device."""
+        store = self._store
+        input_ids = store.get_input_ids(self._index)
+        start = store.input_starts[self._index]
+        end = start + len(input_ids)
+        store.set_ports(
+            self._index,
+            input_ids,
+            output_ids,
+            zip(store.input_devices[start:end], store.input_ports[start:end]),
+            signals,
+        )
+
+    def __contains__(self, output_id):
+        """Return True if the device has the output."""
+        return (
+            self._store.get_output_position(self._index, output_id) is not None
+        )
+
+    def __iter__(self):
+        """Iterate over the output IDs."""
+        return iter(self._store.get_output_ids(self._index))
+
+    def __len__(self):
+        """Return the number of outputs."""
+        return len(self._store.get_output_ids(self._index))
+
+    def __repr__(self):
+        """Return the dictionary representation of the outputs."""
+        return repr(dict(self))
@@ -0,0 +1,348 @@
+"""Store the signal traces recorded by the monitors.
+
+Used in the Logic Simulator project to keep long traces small. Each signal
+level is held in one byte of a typed array, instead of in an element of a
+Python list, or as a run of equal levels for signals that rarely change.
+
+SPHINX-IGNORE
+Classes
+-------
+SignalTrace - growable sequence of signal levels.
+RunLengthTrace - growable sequence of signal levels stored as runs.
+SPHINX-IGNORE
+"""
+import sys
+import itertools
+from array import array
+from bisect import bisect_right
+
+# Signal level stored for None, which is BLANK in devices.Devices()
+BLANK = 4
+
+
+class SignalTrace:
+    """Growable sequence of the signal levels of a monitor, one per cycle.
+
+    The levels are held in an array of signed bytes, which grows with
+    amortised constant time appends. A trace compares equal to any sequence
+    of the same levels, such as a list.
+
+    The buffer of the array is given by get_buffer() without copying it, so
+    that it can be read in place, for example by numpy.frombuffer() with a
+    dtype of int8.
+
+    Parameters
+    ----------
+    signals:
+        iterable of the first signal levels.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    append(self, signal, count=1):
+        Appends the signal level count times.
+    extend(self, signals):
+        Appends every signal level in signals.
+    repeat(self, period, repeats):
+        Appends the last period signal levels repeats times.
+    get_buffer(self):
+        Returns a memoryview of the signal levels.
+    get_runs(self):
+        Returns (signal level, run length) pairs for the runs of equal
+        levels.
+    get_memory_size(self):
+        Returns the number of bytes used by the trace.
+    copy(self):
+        Returns a copy of the trace.
+    tolist(self):
+        Returns the signal levels as a list.
+    SPHINX-IGNORE
+    """
+
+    __slots__ = ("_signals",)
+
+    def __init__(self, signals=()):
+        """Store the first signal levels."""
+        self._signals = array("b")
+        self.extend(signals)
+
+    def append(self, signal, count=1):
+        """Append the signal level count times.
+
+        None is stored as BLANK.
+        """
+        if signal is None:
+            signal = BLANK
+        if count == 1:
+            self._signals.append(signal)
+        elif count > 1:
+            self._signals.extend(array("b", [signal]) * count)
+
+    def extend(self, signals):
+        """Append every signal level in signals."""
+        if isinstance(signals, SignalTrace):
+            self._signals.extend(signals._signals)
+        elif isinstance(signals, array):
+            self._signals.extend(signals)
+        else:
+            self._signals.extend(
+                BLANK if signal is None else signal for signal in signals
+            )
+
+    def repeat(self, period, repeats):
+        """Append the last period signal levels repeats times."""
+        if period > 0 and repeats > 0:
+            self._signals.extend(self._signals[-period:] * repeats)
+
+    def get_buffer(self):
+        """Return a read-only memoryview of the signal levels."""
+        return memoryview(self._signals).toreadonly()
+
+    def get_runs(self):
+        """Return (signal level, run length) pairs for the runs of levels."""
+        return [
+            (signal, len(list(run)))
+            for signal, run in itertools.groupby(self._signals)
+        ]
+
+    def get_memory_size(self):
+        """Return the number of bytes used by the trace and its array."""
+        return sys.getsizeof(self) + sys.getsizeof(self._signals)
+
+    def copy(self):
+        """Return a copy of the trace."""
+        return SignalTrace(self._signals)
+
+    def tolist(self):
+        """Return the signal levels as a list."""
+        return self._signals.tolist()
+
+    def __len__(self):
+        """Return the number of signal levels."""
+        return len(self._signals)
+
+    def __getitem__(self, key):
+        """Return a signal level, or a new trace for a slice."""
+        if isinstance(key, slice):
+            return SignalTrace(self._signals[key])
+        return self._signals[key]
+
+    def __iter__(self):
+        """Iterate over the signal levels."""
+        return iter(self._signals)
+
+    def __eq__(self, other):
+        """Return True if other holds the same signal levels in order."""
+        if isinstance(other, SignalTrace):
+            return self._signals == other._signals
+        try:
+            return len(self._signals) == len(other) and all(
+                signal == other_signal
+                for signal, other_signal in zip(self._signals, other)
+            )
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the signal levels as a list would show them."""
+        return repr(self._signals.tolist())
+
+    def __getstate__(self):
+        """Return the signal levels to pickle."""
+        return self._signals
+
+    def __setstate__(self, signals):
+        """Restore the pickled signal levels."""
+        self._signals = signals
+
+
+class RunLengthTrace:
+    """Growable sequence of signal levels stored as runs of equal levels.
+
+    Each run is kept as its signal level and the cycle it starts in, so a
+    signal that changes rarely, such as one behind a slow clock, takes a few
+    bytes for every change rather than one for every cycle. Appending any
+    number of equal levels takes constant time, and the level in a given
+    cycle is found by a binary search of the run starts.
+
+    The trace has the same methods as a SignalTrace, and compares equal to
+    any sequence of the same levels.
+
+    Parameters
+    ----------
+    signals:
+        iterable of the first signal levels.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    append(self, signal, count=1):
+        Appends the signal level count times.
+    extend(self, signals):
+        Appends every signal level in signals.
+    repeat(self, period, repeats):
+        Appends the last period signal levels repeats times.
+    get_buffer(self):
+        Returns a memoryview of the signal levels.
+    get_runs(self):
+        Returns (signal level, run length) pairs for the runs of equal
+        levels.
+    get_memory_size(self):
+        Returns the number of bytes used by the trace.
+    copy(self):
+        Returns a copy of the trace.
+    tolist(self):
+        Returns the signal levels as a list.
+    SPHINX-IGNORE
+    """
+
+    __slots__ = ("_levels", "_starts", "_length")
+
+    def __init__(self, signals=()):
+        """Store the first signal levels."""
+        # Signal level and first cycle of every run, and the number of cycles
+        self._levels = array("b")
+        self._starts = array("q")
+        self._length = 0
+        self.extend(signals)
+
+    def append(self, signal, count=1):
+        """Append the signal level count times.
+
+        None is stored as BLANK.
+        """
+        if count < 1:
+            return
+        if signal is None:
+            signal = BLANK
+        if not self._levels or self._levels[-1] != signal:
+            self._levels.append(signal)
+            self._starts.append(self._length)
+        self._length += count
+
+    def extend(self, signals):
+        """Append every signal level in signals."""
+        if isinstance(signals, (RunLengthTrace, SignalTrace)):
+            for signal, count in signals.get_runs():
+                self.append(signal, count)
+        else:
+            for signal in signals:
+                self.append(signal)
+
+    def repeat(self, period, repeats):
+        """Append the last period signal levels repeats times."""
+        if period < 1 or repeats < 1:
+            return
+        runs = self._get_runs(max(self._length - period, 0), self._length)
+        if len(runs) == 1:
+            [(signal, count)] = runs
+            self.append(signal, count * repeats)
+        else:
+            for _ in range(repeats):
+                for signal, count in runs:
+                    self.append(signal, count)
+
+    def get_buffer(self):
+        """Return a read-only memoryview of the signal levels.
+
+        The runs are expanded into a new array of one byte for every cycle.
+        """
+        signals = array("b")
+        for signal, count in self.get_runs():
+            signals.extend(array("b", [signal]) * count)
+        return memoryview(signals).toreadonly()
+
+    def get_runs(self):
+        """Return (signal level, run length) pairs for the runs of levels."""
+        return self._get_runs(0, self._length)
+
+    def _get_runs(self, start, stop):
+        """Return the runs of the levels from start up to stop."""
+        if start >= stop:
+            return []
+        runs = []
+        number = self._find_run(start)
+        while number < len(self._levels) and self._starts[number] < stop:
+            if number + 1 < len(self._starts):
+                end = min(self._starts[number + 1], stop)
+            else:
+                end = stop
+            runs.append((self._levels[number], end - start))
+            start = end
+            number += 1
+        return runs
+
+    def _find_run(self, index):
+        """Return the number of the run that the cycle index is in."""
+        return bisect_right(self._starts, index) - 1
+
+    def get_memory_size(self):
+        """Return the number of bytes used by the trace and its arrays."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self._levels)
+            + sys.getsizeof(self._starts)
+        )
+
+    def copy(self):
+        """Return a copy of the trace."""
+        return RunLengthTrace(self)
+
+    def tolist(self):
+        """Return the signal levels as a list."""
+        return list(self)
+
+    def __len__(self):
+        """Return the number of signal levels."""
+        return self._length
+
+    def __getitem__(self, key):
+        """Return a signal level, or a new trace for a slice."""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return RunLengthTrace(
+                    self[index] for index in range(start, stop, step)
+                )
+            signal_trace = RunLengthTrace()
+            for signal, count in self._get_runs(start, stop):
+                signal_trace.append(signal, count)
+            return signal_trace
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("trace index out of range")
+        return self._levels[self._find_run(key)]
+
+    def __iter__(self):
+        """Iterate over the signal levels."""
+        for signal, count in self.get_runs():
+            yield from itertools.repeat(signal, count)
+
+    def __eq__(self, other):
+        """Return True if other holds the same signal levels in order."""
+        if isinstance(other, RunLengthTrace):
+            return (
+                self._length == other._length
+                and self._levels == other._levels
+                and self._starts == other._starts
+            )
+        try:
+            return self._length == len(other) and all(
+                signal == other_signal
+                for signal, other_signal in zip(self, other)
+            )
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return the signal levels as a list would show them."""
+        return repr(self.tolist())
+
+    def __getstate__(self):
+        """Return the runs to pickle."""
+        return self._levels, self._starts, self._length
+
+    def __setstate__(self, state):
+        """Restore the pickled runs."""
+        self._levels, self._starts, self._length = state
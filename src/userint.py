@@ -7,6 +7,7 @@ Classes:
 --------
 UserInterface - reads and parses user commands.
 """
+from simulator import Simulator
 
 
 class UserInterface:
@@ -14,8 +15,8 @@ class UserInterface:
 
     This class allows the user to enter certain commands.
     These commands enable the user to run or continue the simulation for a
-    number of cycles, set switches, add or zap monitors, show help, or quit
-    the program.
+    number of cycles, set switches, add or zap monitors, dump the monitored
+    signals to a file, show help, or quit the program.
 
     Parameters
     -----------
@@ -27,6 +28,8 @@ class UserInterface:
         instance of the network.Network() class.
     monitors:
         instance of the monitors.Monitors() class.
+    processes:
+        number of processes to run the network with.
 
     Methods
     -------
@@ -49,6 +52,8 @@ class UserInterface:
         Returns the device and port IDs of the current signal name.
     read_number(self, lower_bound, upper_bound):
         Returns the current number.
+    read_path(self):
+        Returns the rest of the user entry as a file path.
     help_command(self):
         Prints a list of valid commands.
     switch_command(self):
@@ -57,6 +62,8 @@ class UserInterface:
         Sets the specified monitor.
     zap_command(self):
         Removes the specified monitor.
+    dump_command(self):
+        Starts writing the monitored signals to the specified VCD file.
     run_network(self, cycles):
         Runs the network for the specified number of simulation cycles.
     run_command(self):
@@ -65,12 +72,13 @@ class UserInterface:
         Continues a previously run simulation.
     """
 
-    def __init__(self, names, devices, network, monitors):
+    def __init__(self, names, devices, network, monitors, processes=1):
         """Initialise variables."""
         self.names = names
         self.devices = devices
         self.monitors = monitors
         self.network = network
+        self.simulator = Simulator(devices, network, monitors, processes)
 
         self.cycles_completed = 0  # number of simulation cycles completed
 
@@ -99,10 +107,13 @@ class UserInterface:
                 self.run_command()
             elif command == "c":
                 self.continue_command()
+            elif command == "d":
+                self.dump_command()
             else:
                 print("Invalid command. Enter 'h' for help.")
             self.get_line()  # get the user entry
             command = self.read_command()  # read the first character
+        self.monitors.stop_dump()
 
     def get_line(self):
         """Print prompt for the user and update the user entry."""
@@ -200,6 +211,19 @@ class UserInterface:
 
         return number
 
+    def read_path(self):
+        """Return the rest of the user entry as a file path.
+
+        Return None if no path is provided.
+        """
+        self.skip_spaces()
+        if not self.character:
+            print("Error! Expected a file path.")
+            return None
+        path = self.line[self.cursor - 1 :].strip()
+        self.cursor = len(self.line)
+        return path
+
     def help_command(self):
         """Print a list of valid commands."""
         print("User commands:")
@@ -208,6 +232,7 @@ class UserInterface:
         print("s X N     - set switch X to N (0 or 1)")
         print("m X       - set a monitor on signal X")
         print("z X       - zap the monitor on signal X")
+        print("d F       - dump the monitored signals to VCD file F")
         print("h         - help (this command)")
         print("q         - quit the program")
 
@@ -232,6 +257,8 @@ class UserInterface:
             )
             if monitor_error == self.monitors.NO_ERROR:
                 print("Successfully made monitor.")
+            elif monitor_error == self.monitors.DUMP_STARTED:
+                print("Error! Cannot make a monitor while dumping.")
             else:
                 print("Error! Could not make monitor.")
 
@@ -245,17 +272,30 @@ class UserInterface:
             else:
                 print("Error! Could not zap monitor.")
 
+    def dump_command(self):
+        """Start writing the monitored signals to the specified VCD file."""
+        path = self.read_path()
+        if path is not None:
+            if self.monitors.start_dump(path):
+                print("Dumping monitored signals to " + path + ".")
+            else:
+                print("Error! Could not open file.")
+
     def run_network(self, cycles):
         """Run the network for the specified number of simulation cycles.
 
         Return True if successful.
         """
-        for _ in range(cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
-                print("Error! Network oscillating.")
-                return False
+        if not self.simulator.run(cycles):
+            cycle = self.simulator.get_oscillation_report()[0]
+            print(
+                "".join(
+                    ["Error! Network oscillating in cycle ", str(cycle), "."]
+                )
+            )
+            for message in self.simulator.get_oscillation_messages():
+                print(message)
+            return False
         self.monitors.display_signals()
         return True
 
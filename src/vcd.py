@@ -0,0 +1,115 @@
+"""Write the monitored signals to a Value Change Dump file.
+
+Used in the Logic Simulator project to stream the signals of long runs to a
+file that standard waveform viewers can open, instead of keeping them all
+in memory.
+
+SPHINX-IGNORE
+Classes
+-------
+VcdWriter - streams signal changes to a Value Change Dump file.
+SPHINX-IGNORE
+"""
+
+
+class VcdWriter:
+    """Stream the changes of a fixed list of signals to a VCD file.
+
+    The header declares every signal as a one-bit wire in a module named
+    logsim, with one time unit for every simulation cycle. After that, only
+    the signals that change are written, each under the time of the cycle
+    it changes in. HIGH and RISING are written as 1, LOW and FALLING as 0,
+    as they settle to those levels, and any other level, such as BLANK, as
+    x.
+
+    The file is written through a buffer of buffer_size bytes, so that it
+    is only flushed in large blocks.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    path:
+        path of the file to write.
+    signal_names:
+        list of the names of the signals to declare.
+    buffer_size:
+        size in bytes of the write buffer.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    write_signals(self, signals, cycles=1):
+        Writes the signals that changed, which then stay the same for the
+        given number of cycles.
+    close(self):
+        Writes the final time and closes the file.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self, devices, path, signal_names, buffer_size=1 << 20):
+        """Open the file and write the header."""
+        self.devices = devices
+        self.file = open(path, "w", buffering=buffer_size)
+
+        # Cycles written so far, and the last level written for each signal
+        self.time = 0
+        self.last_values = [None] * len(signal_names)
+        self.identifiers = [
+            self._get_identifier(number) for number in range(len(signal_names))
+        ]
+
+        lines = [
+            "$version Logic Simulator $end",
+            "$timescale 1 ns $end",
+            "$scope module logsim $end",
+        ]
+        for identifier, name in zip(self.identifiers, signal_names):
+            lines.append(" ".join(["$var wire 1", identifier, name, "$end"]))
+        lines += ["$upscope $end", "$enddefinitions $end", ""]
+        self.file.write("\n".join(lines))
+
+    @staticmethod
+    def _get_identifier(number):
+        """Return the short identifier code of the given signal number.
+
+        The code is the number written in base 94, using the printable
+        ASCII characters from ! to ~ as digits.
+        """
+        identifier = ""
+        while True:
+            number, digit = divmod(number, 94)
+            identifier += chr(33 + digit)
+            if number == 0:
+                return identifier
+            number -= 1
+
+    def _get_value(self, signal):
+        """Return the VCD value character of the signal level."""
+        if signal in (self.devices.HIGH, self.devices.RISING):
+            return "1"
+        elif signal in (self.devices.LOW, self.devices.FALLING):
+            return "0"
+        return "x"
+
+    def write_signals(self, signals, cycles=1):
+        """Write the signals that changed since the last write.
+
+        signals is a list with the level of each declared signal, which
+        stay the same for the given number of cycles.
+        """
+        changes = []
+        for number, signal in enumerate(signals):
+            value = self._get_value(signal)
+            if value != self.last_values[number]:
+                self.last_values[number] = value
+                changes.append(value + self.identifiers[number])
+        if changes:
+            self.file.write("#" + str(self.time) + "\n")
+            self.file.write("\n".join(changes) + "\n")
+        self.time += cycles
+
+    def close(self):
+        """Write the time at the end of the last cycle and close the file."""
+        self.file.write("#" + str(self.time) + "\n")
+        self.file.close()
@@ -0,0 +1,316 @@
+"""Execute the network with vectorised NumPy operations.
+
+Used in the Logic Simulator project to execute large networks, where
+evaluating the devices one at a time in Python is too slow. This module
+requires numpy.
+
+SPHINX-IGNORE
+Classes
+-------
+VectorisedNetwork - executes a compiled network one device kind at a time.
+SPHINX-IGNORE
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+class VectorisedNetwork:
+    """Execute a compiled network one device kind at a time.
+
+    All output signals are stored in one NumPy array, and the devices of each
+    kind are evaluated together with a single gather of their inputs from
+    the array and a reduction over each row. The fan-in of the gates of a
+    kind is stored in a matrix as wide as the widest gate of that kind (at
+    most max_gate_inputs), and narrower gates are padded with a constant
+    slot that holds the value that does not affect their output.
+
+    Within an iteration, Network.execute_network() lets a device see the new
+    outputs of the devices of the same kind executed before it. Devices of a
+    kind are therefore split into waves, where a device is placed in a later
+    wave than any earlier device of its kind that it reads from, so that
+    executing the waves in order gives the same results as executing the
+    Device objects.
+
+    Parameters
+    ----------
+    devices:
+        instance of the devices.Devices() class.
+    network:
+        instance of the network.Network() class.
+
+    SPHINX-IGNORE
+    Public Methods
+    --------------
+    update_clocks(self):
+        If it is time to do so, sets clock signals to RISING or FALLING.
+    settle(self):
+        Executes all devices until the signals settle.
+    execute_network(self):
+        Executes all the devices in the network for one simulation cycle.
+    SPHINX-IGNORE
+    """
+
+    def __init__(self, devices, network):
+        """Build the fan-in matrices of every wave of every kind."""
+        if np is None:
+            raise ImportError("The vectorised engine requires numpy.")
+        self.devices = devices
+        self.network = network
+        self.compiled = compiled = network.get_compiled_network()
+
+        # Constant slots used to pad the fan-in matrices
+        self.low_slot = len(compiled.slots)
+        self.high_slot = self.low_slot + 1
+        self.signals = np.full(
+            len(compiled.slots) + 2, devices.LOW, dtype=np.int8
+        )
+        self.signals[self.high_slot] = devices.HIGH
+
+        # -1 marks signals that cannot be updated
+        self.towards_low = np.array(
+            [-1 if s is None else s for s in compiled.towards_low], np.int8
+        )
+        self.towards_high = np.array(
+            [-1 if s is None else s for s in compiled.towards_high], np.int8
+        )
+
+        # (x, y) pairs of the gates: if all inputs are x, the output is y
+        self.gate_rules = {
+            compiled.AND: (devices.HIGH, devices.HIGH),
+            compiled.OR: (devices.LOW, devices.LOW),
+            compiled.NAND: (devices.HIGH, devices.LOW),
+            compiled.NOR: (devices.LOW, devices.HIGH),
+        }
+
+        self.waves = {}  # {kind_code: [(numbers, output_slots, fanin)]}
+        for kind_code in compiled.kind_codes:
+            self.waves[kind_code] = self._build_waves(kind_code)
+
+        self.switch_states = None
+        self.dtype_memories = None
+        self.clock_counters = None
+        self.clock_half_periods = None
+        self.steady_state = True
+
+    def _build_waves(self, kind_code):
+        """Return the waves of the devices of the given kind code.
+
+        Each wave is a tuple of the device numbers relative to the first
+        device of the kind, their output slots, and their fan-in matrix.
+        """
+        compiled = self.compiled
+        first, last = compiled.kind_ranges[kind_code]
+        if first == last:
+            return []
+        if kind_code in [compiled.AND, compiled.NAND]:
+            padding_slot = self.high_slot
+        else:
+            padding_slot = self.low_slot
+
+        waves = [0] * (last - first)
+        lower_bounds = [0] * (last - first)
+        fanins = []
+        for number in range(first, last):
+            fanin = compiled.fanin[
+                compiled.fanin_start[number] : compiled.fanin_start[number + 1]
+            ]
+            fanins.append(list(fanin))
+            wave = lower_bounds[number - first]
+            for slot in fanin:
+                source = compiled.slot_devices[slot] if slot >= 0 else -1
+                if first <= source < number:
+                    # Must see the new output of an earlier device
+                    wave = max(wave, waves[source - first] + 1)
+            waves[number - first] = wave
+            for slot in fanin:
+                source = compiled.slot_devices[slot] if slot >= 0 else -1
+                if number < source < last:
+                    # Must see the old output of a later device
+                    lower_bounds[source - first] = max(
+                        lower_bounds[source - first], wave
+                    )
+
+        width = max(len(fanin) for fanin in fanins)
+        result = []
+        for wave in range(max(waves) + 1):
+            numbers = [i for i, w in enumerate(waves) if w == wave]
+            if not numbers:
+                continue
+            matrix = np.full((len(numbers), max(width, 1)), padding_slot)
+            for row, i in enumerate(numbers):
+                matrix[row, : len(fanins[i])] = fanins[i]
+            output_slots = np.array(
+                [compiled.output_slots[first + i] for i in numbers]
+            )
+            result.append((np.array(numbers), output_slots, matrix))
+        return result
+
+    def _update_slots(self, output_slots, target_low):
+        """Update the signals in output_slots towards their targets.
+
+        target_low is True where the target of a signal is LOW, and False
+        where it is HIGH. Return False if a signal cannot be updated, and set
+        steady_state to False if any signal changes.
+        """
+        signals = self.signals[output_slots]
+        new_signals = np.where(
+            target_low, self.towards_low[signals], self.towards_high[signals]
+        )
+        if (new_signals < 0).any():
+            return False
+        changed = new_signals != signals
+        if changed.any():
+            self.steady_state = False
+            self.signals[output_slots[changed]] = new_signals[changed]
+        return True
+
+    def _execute_kind(self, kind_code):
+        """Execute all the waves of the devices of the given kind code."""
+        compiled = self.compiled
+        devices = self.devices
+        signals = self.signals
+        for numbers, output_slots, fanin in self.waves[kind_code]:
+            if kind_code == compiled.SWITCH:
+                target_low = self.switch_states[numbers] == devices.LOW
+            elif kind_code == compiled.D_TYPE:
+                if not self._execute_d_types(numbers, output_slots, fanin):
+                    return False
+                continue
+            elif kind_code == compiled.CLOCK:
+                # Complete RISING and FALLING transitions only
+                clock_signals = signals[output_slots]
+                target_low = (clock_signals == devices.LOW) | (
+                    clock_signals == devices.FALLING
+                )
+            elif kind_code == compiled.NOT:
+                # The inverse of a signal other than HIGH or LOW is None,
+                # which updates the output towards HIGH
+                target_low = signals[fanin[:, 0]] == devices.HIGH
+            elif kind_code == compiled.XOR:
+                # Output is high only if both inputs are different
+                target_low = signals[fanin[:, 0]] == signals[fanin[:, 1]]
+            else:
+                # If all the inputs are x, then the output is y, else the
+                # output is the inverse of y
+                x, y = self.gate_rules[kind_code]
+                all_x = (signals[fanin] == x).all(axis=1)
+                target_low = all_x if y == devices.LOW else ~all_x
+            if not self._update_slots(output_slots, target_low):
+                return False
+        return True
+
+    def _execute_d_types(self, numbers, output_slots, fanin):
+        """Simulate a wave of D-types and update their output signals."""
+        devices = self.devices
+        inputs = self.signals[fanin]
+        clock_signal, set_signal, clear_signal, data_signal = inputs.T
+
+        memory = self.dtype_memories[numbers]
+        rising = clock_signal == devices.RISING
+        memory = np.where(
+            rising
+            & (
+                (data_signal == devices.HIGH)
+                | (data_signal == devices.FALLING)
+            ),
+            devices.HIGH,
+            memory,
+        )
+        memory = np.where(
+            rising
+            & ((data_signal == devices.LOW) | (data_signal == devices.RISING)),
+            devices.LOW,
+            memory,
+        )
+        memory = np.where(set_signal == devices.HIGH, devices.HIGH, memory)
+        memory = np.where(clear_signal == devices.HIGH, devices.LOW, memory)
+        self.dtype_memories[numbers] = memory
+
+        # Update Q towards the memory and QBAR towards its inverse
+        return self._update_slots(
+            output_slots, memory == devices.LOW
+        ) and self._update_slots(output_slots + 1, memory == devices.HIGH)
+
+    def load_state(self):
+        """Copy the signals and device states from the Device objects."""
+        compiled = self.compiled
+        compiled.load_state()
+        self.signals[: self.low_slot] = np.frombuffer(
+            compiled.signals, dtype=np.int8
+        )
+        # A missing D-type memory is stored as -1, which is neither LOW nor
+        # HIGH, as in Network.execute_d_type()
+        self.dtype_memories = np.array(
+            [-1 if m is None else m for m in compiled.dtype_memories],
+            dtype=np.int8,
+        )
+        self.switch_states = np.array(compiled.switch_states, dtype=np.int8)
+        self.clock_counters = np.array(compiled.clock_counters, dtype=np.int64)
+        self.clock_half_periods = np.array(
+            compiled.clock_half_periods, dtype=np.int64
+        )
+
+    def store_state(self):
+        """Copy the signals and device states back to the Device objects."""
+        compiled = self.compiled
+        compiled.signals = array("b", self.signals[: self.low_slot].tobytes())
+        compiled.dtype_memories = [
+            None if m == -1 else m for m in self.dtype_memories.tolist()
+        ]
+        compiled.clock_counters = self.clock_counters.tolist()
+        compiled.store_state()
+
+    def update_clocks(self):
+        """If it is time to do so, set clock signals to RISING or FALLING."""
+        devices = self.devices
+        first, last = self.compiled.kind_ranges[self.compiled.CLOCK]
+        if first == last:
+            return
+        clock_slots = np.asarray(self.compiled.output_slots[first:last])
+        edges = self.clock_counters == self.clock_half_periods
+        self.clock_counters[edges] = 0
+        clock_signals = self.signals[clock_slots]
+        clock_signals[
+            edges & (clock_signals == devices.HIGH)
+        ] = devices.FALLING
+        clock_signals[edges & (clock_signals == devices.LOW)] = devices.RISING
+        self.signals[clock_slots] = clock_signals
+        self.clock_counters += 1
+
+    def settle(self):
+        """Execute all devices until the signals settle.
+
+        Return True if successful and the signals settle within the
+        iteration limit of the network.
+        """
+        if not self.compiled.complete:
+            return False
+        iterations = 0
+        iteration_limit = self.network.iteration_limit
+        while iterations < iteration_limit:
+            iterations += 1
+            self.steady_state = True
+            # Kind codes are numbered in execution order
+            for kind_code in self.compiled.kind_codes:
+                if not self._execute_kind(kind_code):
+                    return False
+            if self.steady_state:
+                break
+            if iterations == self.network.iteration_limit:
+                iteration_limit = self.network.get_iteration_limit()
+        return self.steady_state
+
+    def execute_network(self):
+        """Execute all the devices in the network for one simulation cycle.
+
+        Return True if successful and the network does not oscillate.
+        """
+        self.load_state()
+        self.update_clocks()
+        result = self.settle()
+        self.store_state()
+        return result
@@ -0,0 +1,56 @@
+"""Test the codegen module."""
+import os
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from codegen import CodegenNetwork
+from test_netlist import make_random_network, assert_same_simulation
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("feedback", [False, True])
+def test_codegen_engine_matches_dict_engine(seed, feedback):
+    """Test if the generated code gives the same results as the default."""
+    reference = make_random_network(seed, feedback=feedback)
+    network = make_random_network(seed, feedback=feedback)
+    network.engine = network.CODEGEN_ENGINE
+
+    assert_same_simulation(reference, network)
+
+
+def test_generated_source_is_cached(tmp_path, monkeypatch):
+    """Test if the source is read from the cache for the same netlist."""
+    network = make_random_network(0)
+    network.codegen_cache_directory = str(tmp_path)
+    codegen = network.get_codegen_network()
+    assert os.listdir(tmp_path) == ["logsim_" + codegen.netlist_hash + ".py"]
+
+    # A different netlist has a different hash
+    assert make_random_network(1).get_codegen_network().netlist_hash != (
+        codegen.netlist_hash
+    )
+
+    def fail(self):
+        raise AssertionError("source generated again")
+
+    monkeypatch.setattr(CodegenNetwork, "generate_source", fail)
+    cached_network = make_random_network(0)
+    cached_network.codegen_cache_directory = str(tmp_path)
+    cached = cached_network.get_codegen_network()
+    assert cached.source == codegen.source
+
+
+def test_unconnected_inputs():
+    """Test if the generated code is not built for unconnected inputs."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [AND1_ID] = names.lookup(["And1"])
+    devices.make_device(AND1_ID, devices.AND, 2)
+    network.engine = network.CODEGEN_ENGINE
+
+    assert not network.execute_network()
+    assert network.get_codegen_network().source is None
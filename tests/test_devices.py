@@ -164,3 +164,97 @@ def test_set_switch(new_devices):
     # Set switch Sw1 to LOW
     new_devices.set_switch(SW1_ID, new_devices.LOW)
     assert switch_object.switch_state == new_devices.LOW
+
+
+def test_remove_device(devices_with_items):
+    """Test if remove_device keeps the device lookups consistent."""
+    devices = devices_with_items
+    names = devices.names
+    [AND1_ID, NOR1_ID, SW1_ID, AND2_ID] = names.lookup(
+        ["And1", "Nor1", "Sw1", "And2"]
+    )
+
+    assert devices.remove_device(AND1_ID)
+    assert devices.get_device(AND1_ID) is None
+    assert devices.find_devices() == [NOR1_ID, SW1_ID]
+    assert devices.find_devices(devices.AND) == []
+
+    # Removing an absent device is unsuccessful
+    assert not devices.remove_device(AND1_ID)
+
+    devices.make_device(AND2_ID, devices.AND, 2)
+    assert devices.get_device(AND2_ID).device_kind == devices.AND
+    assert devices.find_devices(devices.AND) == [AND2_ID]
+    assert devices.find_devices() == [NOR1_ID, SW1_ID, AND2_ID]
+
+
+def test_find_devices_returns_copy(devices_with_items):
+    """Test if modifying the result of find_devices leaves the index intact."""
+    devices = devices_with_items
+    [AND1_ID] = devices.names.lookup(["And1"])
+
+    devices.find_devices(devices.AND).append(AND1_ID)
+    assert devices.find_devices(devices.AND) == [AND1_ID]
+
+
+def test_make_devices(new_devices):
+    """Test if make_devices makes each device and returns their errors."""
+    names = new_devices.names
+    [AND1_ID, AND2_ID, SW1_ID, I1_ID, I2_ID] = names.lookup(
+        ["And1", "And2", "Sw1", "I1", "I2"]
+    )
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 0)
+
+    assert new_devices.make_devices(
+        [AND1_ID, SW1_ID, AND2_ID, AND1_ID], new_devices.AND, 2
+    ) == [
+        new_devices.NO_ERROR,
+        new_devices.DEVICE_PRESENT,
+        new_devices.NO_ERROR,
+        new_devices.DEVICE_PRESENT,
+    ]
+    assert new_devices.find_devices(new_devices.AND) == [AND1_ID, AND2_ID]
+    assert new_devices.get_device(AND2_ID).inputs == {
+        I1_ID: None,
+        I2_ID: None,
+    }
+
+    [OR1_ID] = names.lookup(["Or1"])
+    assert new_devices.make_devices([OR1_ID], new_devices.OR, 17) == [
+        new_devices.INVALID_QUALIFIER
+    ]
+    assert new_devices.get_device(OR1_ID) is None
+
+
+def test_making_devices_keeps_cold_start_state(new_devices):
+    """Test if making a D-type or clock only starts up the new device."""
+    names = new_devices.names
+    [D1_ID, D2_ID, CL_ID] = names.lookup(["D1", "D2", "Clock1"])
+    new_devices.make_device(D1_ID, new_devices.D_TYPE)
+    d_type = new_devices.get_device(D1_ID)
+    # Neither LOW nor HIGH, so that a second start-up would change it
+    d_type.dtype_memory = None
+
+    new_devices.make_device(D2_ID, new_devices.D_TYPE)
+    new_devices.make_device(CL_ID, new_devices.CLOCK, 3)
+
+    assert d_type.dtype_memory is None
+    assert new_devices.get_device(D2_ID).dtype_memory in [
+        new_devices.LOW,
+        new_devices.HIGH,
+    ]
+    assert new_devices.get_device(CL_ID).clock_counter in range(3)
+
+
+def test_make_devices_without_cold_start(new_devices):
+    """Test if new D-types and clocks can wait for a single start-up."""
+    names = new_devices.names
+    [D1_ID, CL_ID] = names.lookup(["D1", "Clock1"])
+    new_devices.make_devices([D1_ID], new_devices.D_TYPE, cold_start=False)
+    new_devices.make_devices([CL_ID], new_devices.CLOCK, 3, cold_start=False)
+
+    assert new_devices.get_device(D1_ID).dtype_memory == new_devices.LOW
+    assert new_devices.get_device(CL_ID).clock_counter == 0
+    assert new_devices.get_device(CL_ID).outputs[None] == new_devices.LOW
+    new_devices.cold_startup()
+    assert new_devices.get_device(CL_ID).clock_counter in range(3)
@@ -6,7 +6,7 @@ from scanner import Scanner
 from network import Network
 from names import Names
 from monitors import Monitors
-from exceptions import Errors
+from exceptions import Errors, SemanticErrors
 
 
 @pytest.fixture()
@@ -82,3 +82,64 @@ def test_parse_definition_file(parser):
     (device_id, pin_id) = list(monitor_dict.keys())[0]
     assert device_id == parser.names.query("A")
     assert pin_id is None
+
+
+@pytest.mark.parametrize(
+    "file_content",
+    [
+        "DEVICES: \n"
+        "SW1 = SWITCH < 0 > ; \n"
+        "C1 = CLOCK < 3 > ; \n"
+        "D1, D2 = DTYPE ; \n"
+        "CONNECTIONS: \n"
+        "SW1 - D1.SET ; SW1 - D1.CLEAR ; SW1 - D1.DATA ; C1 - D1.CLK ; \n"
+        "SW1 - D2.SET ; SW1 - D2.CLEAR ; D1.Q - D2.DATA ; C1 - D2.CLK ; \n"
+        "MONITORS: \n"
+        "D2.Q ;"
+    ],
+)
+def test_parse_builds_network_in_one_batch(parser):
+    """Test if the connections are made together and started up once."""
+    calls = []
+    make_connections = parser.network.make_connections
+    cold_startup = parser.devices.cold_startup
+
+    def record_connections(connections):
+        calls.append(len(connections))
+        return make_connections(connections)
+
+    def record_startup():
+        calls.append("startup")
+        cold_startup()
+
+    parser.network.make_connections = record_connections
+    parser.devices.cold_startup = record_startup
+    assert parser.parse_network() is True
+    assert calls == [8, "startup"]
+    assert parser.network.check_network()
+
+
+@pytest.mark.parametrize(
+    "file_content",
+    [
+        "DEVICES: \n"
+        "SW1, SW2 = SWITCH < 0 > ; \n"
+        "A = AND < 2 > ; \n"
+        "CONNECTIONS: \n"
+        "SW1 - A.I1 ; \n"
+        "SW2 - A.I1 ; \n"
+        "SW1 - A.I3 ; \n"
+        "MONITORS:"
+        "A ;"
+    ],
+)
+def test_parse_reports_each_connection_error(parser):
+    """Test if every invalid connection is reported on its own line."""
+    assert parser.parse_network() is False
+    assert [
+        (error.message, error.symbol.lineno)
+        for error in parser.errors.error_list
+    ] == [
+        (SemanticErrors.MultipleConnections.message, 5),
+        (SemanticErrors.UndefinedInPin.message, 6),
+    ]
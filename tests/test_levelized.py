@@ -0,0 +1,279 @@
+"""Test the levelized module."""
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from test_netlist import get_state
+
+
+@pytest.fixture
+def new_network():
+    """Return a new instance of the Network class."""
+    new_names = Names()
+    new_devices = Devices(new_names)
+    return Network(new_names, new_devices)
+
+
+def make_random_logic(seed, number_of_gates=60):
+    """Return a random acyclic network of switches and logic gates."""
+    generator = random.Random(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+
+    sources = []
+    for i in range(4):
+        [switch_id] = names.lookup(["Sw" + str(i)])
+        devices.make_device(switch_id, devices.SWITCH, generator.randrange(2))
+        sources.append(switch_id)
+    gate_kinds = [
+        devices.AND,
+        devices.OR,
+        devices.NAND,
+        devices.NOR,
+        devices.XOR,
+        devices.NOT,
+    ]
+    for i in range(number_of_gates):
+        [device_id] = names.lookup(["G" + str(i)])
+        kind = generator.choice(gate_kinds)
+        if kind in [devices.NOT, devices.XOR]:
+            devices.make_device(device_id, kind)
+        else:
+            devices.make_device(device_id, kind, generator.randint(1, 4))
+        for input_id in devices.get_device(device_id).inputs:
+            network.make_connection(
+                device_id, input_id, generator.choice(sources), None
+            )
+        sources.append(device_id)
+    return network
+
+
+def test_levels(new_network):
+    """Test if the gates are sorted into levels and feedback loops."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [
+        SW1_ID,
+        NOT1_ID,
+        AND1_ID,
+        NOR1_ID,
+        NOR2_ID,
+        OR1_ID,
+        I1,
+        I2,
+    ] = names.lookup(
+        ["Sw1", "Not1", "And1", "Nor1", "Nor2", "Or1", "I1", "I2"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(NOT1_ID, devices.NOT)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(NOR1_ID, devices.NOR, 2)
+    devices.make_device(NOR2_ID, devices.NOR, 2)
+    devices.make_device(OR1_ID, devices.OR, 1)
+
+    network.make_connection(SW1_ID, None, NOT1_ID, I1)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(NOT1_ID, None, AND1_ID, I2)
+    # Nor1 and Nor2 form a latch, which Or1 follows
+    network.make_connection(AND1_ID, None, NOR1_ID, I1)
+    network.make_connection(NOR2_ID, None, NOR1_ID, I2)
+    network.make_connection(SW1_ID, None, NOR2_ID, I1)
+    network.make_connection(NOR1_ID, None, NOR2_ID, I2)
+    network.make_connection(NOR1_ID, None, OR1_ID, I1)
+
+    levelized = network.get_levelized_network()
+    device_ids = levelized.device_ids
+    # The latch is on level 2, and Or1 follows it
+    assert [[device_ids[n] for n in level] for level in levelized.levels] == [
+        [NOT1_ID],
+        [AND1_ID],
+        [],
+        [OR1_ID],
+    ]
+    assert network.get_feedback_loops() == [[NOR1_ID, NOR2_ID]]
+    assert [device_ids[n] for n in levelized.gate_order] == [
+        NOT1_ID,
+        AND1_ID,
+        NOR1_ID,
+        NOR2_ID,
+        OR1_ID,
+    ]
+
+    network.engine = network.LEVELIZED_ENGINE
+    assert network.execute_network()
+    assert network.get_output_signal(NOR1_ID, None) in [
+        devices.LOW,
+        devices.HIGH,
+    ]
+
+
+def test_deep_chain_settles(new_network):
+    """Test if a chain deeper than the iteration limit settles."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, I1, I2] = names.lookup(["Sw1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    previous_id = SW1_ID
+    expected = devices.HIGH
+    for i in range(50):
+        # Alternate NOT gates and two-input AND gates fed by the switch
+        [device_id] = names.lookup(["G" + str(i)])
+        if i % 2:
+            devices.make_device(device_id, devices.AND, 2)
+            network.make_connection(SW1_ID, None, device_id, I2)
+        else:
+            devices.make_device(device_id, devices.NOT)
+            expected = network.invert_signal(expected)
+        network.make_connection(previous_id, None, device_id, I1)
+        previous_id = device_id
+
+    # The default engine extends its limit by the depth of the levels
+    assert network.execute_network()
+    assert network.get_output_signal(previous_id, None) == expected
+
+    network.engine = network.LEVELIZED_ENGINE
+    assert len(network.get_levelized_network().levels) == 50
+    assert network.execute_network()
+    assert network.get_output_signal(previous_id, None) == expected
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_levelized_engine_matches_dict_engine(seed):
+    """Test if acyclic logic settles to the same signals as the default."""
+    reference = make_random_logic(seed)
+    network = make_random_logic(seed)
+    network.engine = network.LEVELIZED_ENGINE
+
+    generator = random.Random(seed)
+    switch_ids = reference.devices.find_devices(reference.devices.SWITCH)
+    for _ in range(10):
+        switch_id = generator.choice(switch_ids)
+        signal = generator.randrange(2)
+        for each_network in [reference, network]:
+            each_network.devices.set_switch(switch_id, signal)
+        assert network.execute_network()
+        if reference.execute_network():
+            assert get_state(network) == get_state(reference)
+
+
+def test_oscillating_network(new_network):
+    """Test if a genuine feedback loop is still reported as oscillating."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [NOR1, I1] = names.lookup(["Nor1", "I1"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    network.make_connection(NOR1, None, NOR1, I1)
+    network.engine = network.LEVELIZED_ENGINE
+
+    assert network.check_network()
+    assert network.get_feedback_loops() == [[NOR1]]
+    assert not network.execute_network()
+    # The loop that did not settle is reported
+    assert network.get_levelized_network().oscillating_loop == [NOR1]
+
+
+def test_loop_iteration_limits(new_network):
+    """Test if a loop is given its own iteration limit."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    # A ring of NOT gates, where an odd number of inversions never settles
+    ring_ids = names.lookup(["Not" + str(i) for i in range(3)])
+    [I1] = names.lookup(["I1"])
+    for device_id in ring_ids:
+        devices.make_device(device_id, devices.NOT)
+    for i, device_id in enumerate(ring_ids):
+        network.make_connection(ring_ids[i - 1], None, device_id, I1)
+    network.engine = network.LEVELIZED_ENGINE
+    levelized = network.get_levelized_network()
+
+    executed = []
+    execute_gate = levelized._execute_gate
+
+    def record_gate(number):
+        executed.append(number)
+        return execute_gate(number)
+
+    levelized._execute_gate = record_gate
+    network.loop_iteration_limits[ring_ids[1]] = 5
+    assert not network.execute_network()
+    # The loop does not settle in any pass of the cycle
+    assert len(executed) == network.iteration_limit * 5 * 3
+    assert levelized.oscillating_loop == ring_ids
+
+    # The other engines only raise their limit to the limit of a loop
+    assert network.get_iteration_limit() == network.iteration_limit
+    network.loop_iteration_limits[ring_ids[1]] = 50
+    assert network.get_iteration_limit() == 50
+
+
+def test_loop_settles_over_passes(new_network):
+    """Test if a loop that needs more than one pass is not reported."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, NOR1, NOR2, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Nor1", "Nor2", "I1", "I2"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(NOR1, devices.NOR, 2)
+    devices.make_device(NOR2, devices.NOR, 2)
+    # Nor1 and Nor2 form a latch, set by Sw1 and reset by Sw2
+    network.make_connection(SW2_ID, None, NOR1, I1)
+    network.make_connection(NOR2, None, NOR1, I2)
+    network.make_connection(SW1_ID, None, NOR2, I1)
+    network.make_connection(NOR1, None, NOR2, I2)
+    network.engine = network.LEVELIZED_ENGINE
+    # The latch cannot settle within a single iteration of each pass
+    network.loop_iteration_limits[NOR1] = 1
+
+    assert network.execute_network()
+    assert network.get_levelized_network().oscillating_loop is None
+    assert network.get_output_signal(NOR1, None) == devices.HIGH
+    assert network.get_output_signal(NOR2, None) == devices.LOW
+
+
+def test_d_type_divides_clock(new_network):
+    """Test if a D-type with QBAR fed back to DATA toggles on rising edges."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, CL_ID, D_ID] = names.lookup(["Sw1", "Clock1", "D1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    devices.make_device(D_ID, devices.D_TYPE)
+    network.make_connection(CL_ID, None, D_ID, devices.CLK_ID)
+    network.make_connection(SW1_ID, None, D_ID, devices.SET_ID)
+    network.make_connection(SW1_ID, None, D_ID, devices.CLEAR_ID)
+    network.make_connection(D_ID, devices.QBAR_ID, D_ID, devices.DATA_ID)
+    network.engine = network.LEVELIZED_ENGINE
+
+    q_signals = []
+    clock_signals = []
+    for _ in range(8):
+        assert network.execute_network()
+        q_signals.append(network.get_output_signal(D_ID, devices.Q_ID))
+        clock_signals.append(network.get_output_signal(CL_ID, None))
+
+    # Q changes once for every two changes of the clock
+    changes = [q_signals[i] != q_signals[i + 1] for i in range(7)]
+    clock_changes = [
+        clock_signals[i] != clock_signals[i + 1] for i in range(7)
+    ]
+    assert all(clock_changes)
+    assert changes.count(True) in [3, 4]
+    assert not any(changes[i] and changes[i + 1] for i in range(6))
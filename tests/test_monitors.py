@@ -212,3 +212,101 @@ def test_display_signals(capsys, new_monitors):
     )
 
     assert "" in traces  # additional empty line at the end
+
+
+def test_record_signals_for_many_cycles(new_monitors):
+    """Test if record_signals records the signals once for every cycle."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    new_monitors.record_signals(3)
+    assert (
+        new_monitors.monitors_dictionary[(SW1_ID, None)] == [devices.LOW] * 3
+    )
+
+
+def test_repeat_signals(new_monitors):
+    """Test if the last period of every monitor is repeated."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+    LOW, HIGH = devices.LOW, devices.HIGH
+
+    new_monitors.record_signals()
+    devices.get_device(SW1_ID).outputs[None] = HIGH
+    new_monitors.record_signals()
+    new_monitors.repeat_signals(2, 2)
+
+    assert new_monitors.monitors_dictionary == {
+        (SW1_ID, None): [LOW, HIGH] * 3,
+        (SW2_ID, None): [LOW] * 6,
+        (OR1_ID, None): [LOW] * 6,
+    }
+
+
+def test_get_memory_sizes(new_monitors):
+    """Test if each trace uses about one byte for every cycle."""
+    names = new_monitors.names
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+
+    new_monitors.record_signals(100000)
+    memory_sizes = new_monitors.get_memory_sizes()
+    assert set(memory_sizes) == {
+        (SW1_ID, None),
+        (SW2_ID, None),
+        (OR1_ID, None),
+    }
+    assert all(size < 110000 for size in memory_sizes.values())
+
+
+def test_run_length_traces(new_monitors):
+    """Test if monitors record run-length traces when they are set."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+    LOW, HIGH = devices.LOW, devices.HIGH
+
+    new_monitors.run_length_traces = True
+    new_monitors.reset_monitors()
+    new_monitors.remove_monitor(SW1_ID, None)
+    new_monitors.record_signals(1000)
+    new_monitors.make_monitor(SW1_ID, None, 1000)
+    devices.get_device(SW1_ID).outputs[None] = HIGH
+    new_monitors.record_signals(1000)
+
+    signal_trace = new_monitors.monitors_dictionary[(SW1_ID, None)]
+    assert signal_trace.get_runs() == [(devices.BLANK, 1000), (HIGH, 1000)]
+    assert new_monitors.monitors_dictionary[(OR1_ID, None)] == [LOW] * 2000
+    assert all(
+        size < 1000 for size in new_monitors.get_memory_sizes().values()
+    )
+
+
+def test_record_signals_follows_devices(new_monitors):
+    """Test if the monitored outputs are found again after changes."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    [SW1_ID, SW2_ID, OR1_ID, Q_ID] = names.lookup(["Sw1", "Sw2", "Or1", "Q"])
+    LOW, HIGH, BLANK = devices.LOW, devices.HIGH, devices.BLANK
+
+    def get_output_signal(device_id, output_id):
+        raise AssertionError("Signals should be read from the store")
+
+    new_monitors.network.get_output_signal = get_output_signal
+    new_monitors.record_signals()
+
+    # Adding an output moves the outputs of Sw2 in the store
+    devices.get_device(SW2_ID).outputs[None] = HIGH
+    assert devices.add_output(SW2_ID, Q_ID)
+    new_monitors.record_signals()
+    new_monitors.remove_monitor(SW1_ID, None)
+    new_monitors.make_monitor(SW2_ID, Q_ID, 2)
+    devices.remove_device(OR1_ID)
+    new_monitors.record_signals()
+
+    assert new_monitors.monitors_dictionary == {
+        (SW2_ID, None): [LOW, HIGH, HIGH],
+        (OR1_ID, None): [LOW, LOW, BLANK],
+        (SW2_ID, Q_ID): [BLANK, BLANK, LOW],
+    }
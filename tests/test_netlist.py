@@ -0,0 +1,166 @@
+"""Test the netlist module."""
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+
+
+def make_random_network(seed, number_of_gates=40, feedback=False):
+    """Return a randomly built network containing every kind of device.
+
+    The random module is seeded so that two networks built with the same
+    seed are identical, including the cold start-up state of their clocks
+    and D-types.
+    """
+    random.seed(seed)
+    generator = random.Random(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+
+    outputs = []
+    for i in range(3):
+        [switch_id] = names.lookup(["Sw" + str(i)])
+        devices.make_device(switch_id, devices.SWITCH, generator.randrange(2))
+        outputs.append((switch_id, None))
+    for i in range(2):
+        [clock_id] = names.lookup(["Clk" + str(i)])
+        devices.make_device(clock_id, devices.CLOCK, generator.randint(1, 3))
+        outputs.append((clock_id, None))
+
+    gate_kinds = [
+        devices.AND,
+        devices.OR,
+        devices.NAND,
+        devices.NOR,
+        devices.XOR,
+        devices.NOT,
+    ]
+    inputs = []
+    for i in range(number_of_gates):
+        [device_id] = names.lookup(["G" + str(i)])
+        if generator.random() < 0.15:
+            devices.make_device(device_id, devices.D_TYPE)
+            for input_id in devices.dtype_input_ids:
+                inputs.append((device_id, input_id, len(outputs)))
+            for output_id in devices.dtype_output_ids:
+                outputs.append((device_id, output_id))
+            continue
+        kind = generator.choice(gate_kinds)
+        if kind in [devices.NOT, devices.XOR]:
+            devices.make_device(device_id, kind)
+        else:
+            devices.make_device(device_id, kind, generator.randint(1, 4))
+        for input_id in devices.get_device(device_id).inputs:
+            inputs.append((device_id, input_id, len(outputs)))
+        outputs.append((device_id, None))
+
+    for device_id, input_id, available in inputs:
+        if feedback:
+            available = len(outputs)
+        (output_device_id, output_id) = outputs[generator.randrange(available)]
+        network.make_connection(
+            device_id, input_id, output_device_id, output_id
+        )
+    return network
+
+
+def get_state(network):
+    """Return all the outputs, clock counters and D-type memories."""
+    state = []
+    for device in network.devices.devices_list:
+        state.append(
+            (
+                sorted(device.outputs.items(), key=str),
+                device.clock_counter,
+                device.dtype_memory,
+            )
+        )
+    return state
+
+
+def assert_same_simulation(reference, network, cycles=30):
+    """Assert that both networks give the same results every cycle."""
+    devices = reference.devices
+    [switch_id] = devices.names.lookup(["Sw0"])
+    for cycle in range(cycles):
+        if cycle % 7 == 6:
+            for each_network in [reference, network]:
+                each_network.devices.set_switch(switch_id, (cycle // 7) % 2)
+        assert network.execute_network() == reference.execute_network()
+        assert get_state(network) == get_state(reference)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("feedback", [False, True])
+def test_compiled_engine_matches_dict_engine(seed, feedback):
+    """Test if the compiled engine gives the same results as the default."""
+    reference = make_random_network(seed, feedback=feedback)
+    network = make_random_network(seed, feedback=feedback)
+    network.engine = network.COMPILED_ENGINE
+
+    assert_same_simulation(reference, network)
+
+
+def test_compiled_network_arrays():
+    """Test if the compiled arrays describe the network."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, SW2_ID, D1_ID, AND1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "D1", "And1", "I1", "I2"]
+    )
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(D1_ID, devices.D_TYPE)
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 1)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(D1_ID, devices.QBAR_ID, AND1_ID, I2)
+
+    compiled = network.compile_network()
+
+    # Devices are ordered switches, D-types, then gates
+    assert compiled.device_ids == [SW1_ID, SW2_ID, D1_ID, AND1_ID]
+    assert list(compiled.kinds) == [
+        compiled.SWITCH,
+        compiled.SWITCH,
+        compiled.D_TYPE,
+        compiled.AND,
+    ]
+    assert compiled.slots == [
+        (SW1_ID, None),
+        (SW2_ID, None),
+        (D1_ID, devices.Q_ID),
+        (D1_ID, devices.QBAR_ID),
+        (AND1_ID, None),
+    ]
+    assert list(compiled.output_slots) == [0, 1, 2, 4]
+    assert list(compiled.fanin_start) == [0, 0, 0, 4, 6]
+    assert list(compiled.fanin) == [-1, -1, -1, -1, 0, 3]
+
+    # The D-type inputs are unconnected
+    assert not compiled.complete
+    assert not network.get_compiled_network().execute_network()
+
+
+def test_get_compiled_network_recompiles():
+    """Test if the compiled network is rebuilt after structural changes."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, NOT1_ID, I1] = names.lookup(["Sw1", "Not1", "I1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(NOT1_ID, devices.NOT)
+
+    compiled = network.get_compiled_network()
+    assert network.get_compiled_network() is compiled
+    assert not compiled.complete
+
+    network.make_connection(SW1_ID, None, NOT1_ID, I1)
+    network.engine = network.COMPILED_ENGINE
+    assert network.get_compiled_network() is not compiled
+    assert network.execute_network()
+    assert network.get_output_signal(NOT1_ID, None) == devices.LOW
@@ -1,9 +1,12 @@
 """Test the network module."""
+import random
+
 import pytest
 
 from names import Names
 from devices import Devices
 from network import Network
+from test_netlist import make_random_network, assert_same_simulation
 
 
 @pytest.fixture
@@ -118,6 +121,61 @@ def test_check_network(network_with_devices):
     assert network.check_network()
 
 
+def test_get_floating_inputs(network_with_devices):
+    """Test if the unconnected inputs are kept up to date."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, D1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Or1", "D1", "I1", "I2"]
+    )
+    assert network.get_floating_inputs() == [(OR1_ID, I1), (OR1_ID, I2)]
+
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    assert network.get_floating_inputs() == [(OR1_ID, I2)]
+    devices.make_device(D1_ID, devices.D_TYPE)
+    assert len(network.get_floating_inputs()) == 5
+
+    devices.remove_device(D1_ID)
+    network.break_connection(OR1_ID, I1)
+    assert network.get_floating_inputs() == [(OR1_ID, I1), (OR1_ID, I2)]
+
+    # Inputs added or connected through the device are also kept
+    or1 = devices.get_device(OR1_ID)
+    or1.inputs[I1] = (SW1_ID, None)
+    or1.inputs[I2] = (SW2_ID, None)
+    assert network.get_floating_inputs() == []
+    assert network.check_network()
+    del or1.inputs[I2]
+    or1.inputs[I2] = None
+    assert network.get_floating_inputs() == [(OR1_ID, I2)]
+
+
+def test_remove_driving_device(network_with_devices):
+    """Test if removing a device disconnects the inputs it drives."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Or1", "I1", "I2"]
+    )
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(SW2_ID, None, OR1_ID, I2)
+    assert network.check_network()
+    assert network.execute_network()
+
+    assert devices.remove_device(SW1_ID)
+    assert network.get_connected_output(OR1_ID, I1) is None
+    assert network.get_floating_inputs() == [(OR1_ID, I1)]
+    assert not network.check_network()
+
+    network.make_connection(SW2_ID, None, OR1_ID, I1)
+    assert network.check_network()
+    assert network.execute_network()
+
+
 def test_make_connection(network_with_devices):
     """Test if the make_connection function correctly connects devices."""
     network = network_with_devices
@@ -409,3 +467,558 @@ def test_oscillating_network(new_network):
     network.make_connection(NOR1, None, NOR1, I1)
 
     assert not network.execute_network()
+
+
+@pytest.mark.parametrize(
+    "engine",
+    ["DICT_ENGINE", "COMPILED_ENGINE", "EVENT_ENGINE", "LEVELIZED_ENGINE"],
+)
+def test_get_oscillating_devices(new_network, engine):
+    """Test if the devices still changing in an oscillation are found."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, NOR1, AND1, I1] = names.lookup(["Sw1", "Nor1", "And1", "I1"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(NOR1, devices.NOR, 1)
+    devices.make_device(AND1, devices.AND, 1)
+    network.make_connection(NOR1, None, NOR1, I1)
+    network.make_connection(SW1, None, AND1, I1)
+    network.engine = getattr(network, engine)
+
+    assert network.get_oscillating_devices() == []
+    assert not network.execute_network()
+    assert network.get_oscillating_devices() == [NOR1]
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [
+        "DICT_ENGINE",
+        "COMPILED_ENGINE",
+        "VECTORISED_ENGINE",
+        "EVENT_ENGINE",
+        "LEVELIZED_ENGINE",
+        "CODEGEN_ENGINE",
+    ],
+)
+def test_deep_chain_settles(new_network, engine):
+    """Test if every engine settles logic deeper than the iteration limit."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, I1] = names.lookup(["Sw1", "I1"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    not_ids = names.lookup(["Not" + str(i) for i in range(30)])
+    # Made in reverse order, so that each NOT executes before its input
+    for device_id in reversed(not_ids):
+        devices.make_device(device_id, devices.NOT)
+    previous_id = SW1
+    for device_id in not_ids:
+        network.make_connection(previous_id, None, device_id, I1)
+        previous_id = device_id
+    network.engine = getattr(network, engine)
+
+    assert network.get_iteration_limit() == 62
+    for signal in [devices.HIGH, devices.LOW, devices.HIGH]:
+        devices.set_switch(SW1, signal)
+        assert network.execute_network()
+        assert network.get_output_signal(previous_id, None) == signal
+
+
+def test_fanouts(network_with_devices):
+    """Test if the store finds the inputs connected to each output."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Or1", "I1", "I2"]
+    )
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(OR1_ID, I2, SW1_ID, None)
+    # Failed connections are not recorded
+    network.make_connection(SW2_ID, None, OR1_ID, I1)
+
+    store = devices.store
+    assert store.get_fanouts(devices.get_store_index(SW1_ID), None) == [
+        (OR1_ID, I1),
+        (OR1_ID, I2),
+    ]
+    assert store.get_fanouts(devices.get_store_index(SW2_ID), None) == []
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("feedback", [False, True])
+def test_event_engine_matches_dict_engine(seed, feedback):
+    """Test if the event-driven engine gives the same results as default."""
+    reference = make_random_network(seed, feedback=feedback)
+    network = make_random_network(seed, feedback=feedback)
+    network.engine = network.EVENT_ENGINE
+
+    assert_same_simulation(reference, network)
+
+    # Every device is executed again after a cold start-up
+    for each_network in [reference, network]:
+        random.seed(seed)
+        each_network.devices.cold_startup()
+    assert_same_simulation(reference, network, cycles=10)
+
+
+def test_execute_events_skips_unchanged_devices(new_network):
+    """Test if the event-driven engine only executes the affected devices."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, NOT1_ID, NOT2_ID, I1] = names.lookup(
+        ["Sw1", "Sw2", "Not1", "Not2", "I1"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(NOT1_ID, devices.NOT)
+    devices.make_device(NOT2_ID, devices.NOT)
+    network.make_connection(SW1_ID, None, NOT1_ID, I1)
+    network.make_connection(SW2_ID, None, NOT2_ID, I1)
+    network.engine = network.EVENT_ENGINE
+
+    executed = []
+    execute_not = network.execute_not
+
+    def record_not(device_id):
+        executed.append(device_id)
+        return execute_not(device_id)
+
+    network.execute_not = record_not
+    assert network.execute_network()  # every device is executed
+    assert executed[:2] == [NOT1_ID, NOT2_ID]
+
+    executed.clear()
+    assert network.execute_network()
+    assert executed == []
+
+    devices.set_switch(SW2_ID, devices.HIGH)
+    assert network.execute_network()
+    # Only Not2 is executed, until Sw2 and then Not2 have settled
+    assert executed == [NOT2_ID] * 4
+    assert network.get_output_signal(NOT1_ID, None) == devices.HIGH
+    assert network.get_output_signal(NOT2_ID, None) == devices.LOW
+
+
+def test_make_connections(network_with_devices):
+    """Test if make_connections makes each connection and returns errors."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Or1", "I1", "I2"]
+    )
+    assert network.make_connections(
+        [
+            (SW1_ID, None, OR1_ID, I1),
+            (SW2_ID, None, OR1_ID, I1),
+            (OR1_ID, I2, SW2_ID, None),
+        ]
+    ) == [network.NO_ERROR, network.INPUT_CONNECTED, network.NO_ERROR]
+    assert network.check_network()
+
+
+def test_break_connection(network_with_devices):
+    """Test if break_connection disconnects an input and returns errors."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, OR1_ID, I1, I2, X_ID] = names.lookup(
+        ["Sw1", "Or1", "I1", "I2", "X"]
+    )
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    version = network.structure_version
+
+    assert network.break_connection(X_ID, I1) == network.DEVICE_ABSENT
+    assert network.break_connection(OR1_ID, X_ID) == network.FIRST_PORT_ABSENT
+    assert network.break_connection(OR1_ID, I2) == network.INPUT_UNCONNECTED
+    assert network.structure_version == version
+
+    assert network.break_connection(OR1_ID, I1) == network.NO_ERROR
+    assert network.get_connected_output(OR1_ID, I1) is None
+    assert (
+        devices.store.get_fanouts(devices.get_store_index(SW1_ID), None) == []
+    )
+    assert network.structure_version > version
+    assert network.make_connection(SW1_ID, None, OR1_ID, I1) == (
+        network.NO_ERROR
+    )
+
+    # Checking the edited network does not search it for feedback loops
+    def get_levelized_network():
+        raise AssertionError("The network should not be levelized")
+
+    network.get_levelized_network = get_levelized_network
+    assert not network.check_network()
+    network.make_connection(SW1_ID, None, OR1_ID, I2)
+    assert network.check_network()
+
+
+def test_execution_plan_is_kept(network_with_devices, monkeypatch):
+    """Test if the devices are only looked up when the network changes."""
+    network = network_with_devices
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, OR1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Or1", "I1", "I2"]
+    )
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(SW2_ID, None, OR1_ID, I2)
+    assert network.execute_network()
+    plan = network.get_execution_plan()
+
+    lookups = []
+    find_devices = devices.find_devices
+
+    def record_find_devices(device_kind=None):
+        lookups.append(device_kind)
+        return find_devices(device_kind)
+
+    monkeypatch.setattr(devices, "find_devices", record_find_devices)
+    for _ in range(10):
+        assert network.execute_network()
+    assert lookups == []
+    assert network.get_execution_plan() is plan
+
+    # Breaking a connection discards the plan
+    network.break_connection(OR1_ID, I2)
+    assert network.get_execution_plan() is not plan
+    assert not network.execute_network()
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("feedback", [False, True])
+def test_skip_quiescent_components_matches_default(seed, feedback):
+    """Test if skipping quiescent components gives the same results."""
+    reference = make_random_network(seed, feedback=feedback)
+    network = make_random_network(seed, feedback=feedback)
+    network.skip_quiescent_components = True
+
+    assert_same_simulation(reference, network)
+
+
+def test_skip_quiescent_components(new_network):
+    """Test if only the components with a switch or clock change execute."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, CL_ID, NOT1_ID, NOT2_ID, NOT3_ID, I1] = names.lookup(
+        ["Sw1", "Sw2", "Clock1", "Not1", "Not2", "Not3", "I1"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 4)
+    for device_id in [NOT1_ID, NOT2_ID, NOT3_ID]:
+        devices.make_device(device_id, devices.NOT)
+    network.make_connection(SW1_ID, None, NOT1_ID, I1)
+    network.make_connection(SW2_ID, None, NOT2_ID, I1)
+    network.make_connection(CL_ID, None, NOT3_ID, I1)
+
+    plan = network.get_execution_plan()
+    numbers = plan.component_numbers
+    assert len(plan.component_groups) == 3
+    assert numbers[SW1_ID] == numbers[NOT1_ID]
+    assert numbers[CL_ID] == numbers[NOT3_ID]
+    assert len({numbers[SW1_ID], numbers[SW2_ID], numbers[CL_ID]}) == 3
+
+    executed = []
+    execute_not = network.execute_not
+
+    def record_not(device_id):
+        executed.append(device_id)
+        return execute_not(device_id)
+
+    network.execute_not = record_not
+    network.skip_quiescent_components = True
+    devices.cold_startup()
+    assert network.execute_network()  # every component is executed
+    assert set(executed) == {NOT1_ID, NOT2_ID, NOT3_ID}
+
+    # Wait for the clock to change, so that it does not in the next cycles
+    while network.devices.get_device(CL_ID).clock_counter != 1:
+        assert network.execute_network()
+    executed.clear()
+    assert network.execute_network()
+    assert executed == []
+
+    devices.set_switch(SW2_ID, devices.HIGH)
+    assert network.execute_network()
+    assert set(executed) == {NOT2_ID}
+    assert network.get_output_signal(NOT1_ID, None) == devices.HIGH
+    assert network.get_output_signal(NOT2_ID, None) == devices.LOW
+
+
+def test_d_types_execute_on_triggers(new_network):
+    """Test if the D-types are only executed when clocked, set or cleared."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, CL_ID] = names.lookup(["Sw1", "Sw2", "Clock1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 5)
+    d_type_ids = names.lookup(["D" + str(i) for i in range(4)])
+    for device_id in d_type_ids:
+        devices.make_device(device_id, devices.D_TYPE)
+        network.make_connection(CL_ID, None, device_id, devices.CLK_ID)
+        network.make_connection(SW1_ID, None, device_id, devices.DATA_ID)
+        network.make_connection(SW2_ID, None, device_id, devices.SET_ID)
+        network.make_connection(SW2_ID, None, device_id, devices.CLEAR_ID)
+    assert len(network.get_execution_plan().d_type_groups) == 1
+
+    executed = []
+    execute_d_type = network.execute_d_type
+
+    def record_d_type(device_id):
+        executed.append(device_id)
+        return execute_d_type(device_id)
+
+    network.execute_d_type = record_d_type
+    network.skip_idle_d_types = True
+    devices.cold_startup()
+    assert network.execute_network()  # every D-type is executed
+    cycles_executed = []
+    for cycle in range(20):
+        executed.clear()
+        devices.set_switch(SW1_ID, cycle // 10)
+        assert network.execute_network()
+        if executed:
+            cycles_executed.append(cycle)
+            assert executed[:4] == d_type_ids
+    # Only the cycles with a rising clock edge execute the D-types
+    assert len(cycles_executed) == 2
+
+    # CLEAR executes the D-types while it is HIGH
+    devices.set_switch(SW2_ID, devices.HIGH)
+    for _ in range(3):
+        executed.clear()
+        assert network.execute_network()
+        assert executed[:4] == d_type_ids
+    for device_id in d_type_ids:
+        assert network.get_output_signal(device_id, devices.Q_ID) == (
+            devices.LOW
+        )
+
+    # Otherwise the D-types are executed in every cycle, and a memory set
+    # outside of the network is followed
+    devices.set_switch(SW1_ID, devices.LOW)
+    devices.set_switch(SW2_ID, devices.LOW)
+    assert network.execute_network()
+    assert network.execute_network()
+    network.skip_idle_d_types = False
+    devices.get_device(d_type_ids[0]).dtype_memory = devices.HIGH
+    # The clock does not change in the next cycle
+    devices.get_device(CL_ID).clock_counter = 1
+    assert network.execute_network()
+    assert network.get_output_signal(d_type_ids[0], devices.Q_ID) == (
+        devices.HIGH
+    )
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("feedback", [False, True])
+def test_fold_constants_matches_default(seed, feedback):
+    """Test if folding the constant logic gives the same results."""
+    reference = make_random_network(seed, feedback=feedback)
+    network = make_random_network(seed, feedback=feedback)
+    network.fold_constants = True
+
+    assert_same_simulation(reference, network)
+
+
+def test_fold_constants(new_network):
+    """Test if the logic driven only by switches is folded until set."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, CL_ID, NOT1_ID, NOT2_ID, AND1_ID, I1, I2] = names.lookup(
+        ["Sw1", "Clock1", "Not1", "Not2", "And1", "I1", "I2"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    devices.make_device(NOT1_ID, devices.NOT)
+    devices.make_device(NOT2_ID, devices.NOT)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    network.make_connection(SW1_ID, None, NOT1_ID, I1)
+    network.make_connection(NOT1_ID, None, NOT2_ID, I1)
+    network.make_connection(NOT2_ID, None, AND1_ID, I1)
+    network.make_connection(CL_ID, None, AND1_ID, I2)
+    plan = network.get_execution_plan()
+    assert plan.constant_devices == {SW1_ID, NOT1_ID, NOT2_ID}
+
+    executed = []
+    execute_not = network.execute_not
+
+    def record_not(device_id):
+        executed.append(device_id)
+        return execute_not(device_id)
+
+    network.execute_not = record_not
+    network.fold_constants = True
+    assert network.execute_network()  # every device is executed
+    assert executed
+
+    executed.clear()
+    for _ in range(4):
+        assert network.execute_network()
+    assert executed == []
+
+    devices.set_switch(SW1_ID, devices.HIGH)
+    assert network.execute_network()
+    assert executed
+    executed.clear()
+    for _ in range(4):
+        assert network.execute_network()
+        assert network.get_output_signal(NOT2_ID, None) == devices.HIGH
+    assert executed == []
+
+
+def test_get_fan_in_cone(new_network):
+    """Test if the cone follows the inputs back through every device."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, CL_ID, D1_ID, NOT1_ID, NOT2_ID, I1] = names.lookup(
+        ["Sw1", "Sw2", "Clock1", "D1", "Not1", "Not2", "I1"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    devices.make_device(D1_ID, devices.D_TYPE)
+    devices.make_device(NOT1_ID, devices.NOT)
+    devices.make_device(NOT2_ID, devices.NOT)
+    network.make_connection(CL_ID, None, D1_ID, devices.CLK_ID)
+    network.make_connection(NOT1_ID, None, D1_ID, devices.DATA_ID)
+    network.make_connection(SW1_ID, None, D1_ID, devices.SET_ID)
+    network.make_connection(SW1_ID, None, D1_ID, devices.CLEAR_ID)
+    network.make_connection(D1_ID, devices.QBAR_ID, NOT1_ID, I1)
+    network.make_connection(SW2_ID, None, NOT2_ID, I1)
+
+    cone = network.get_fan_in_cone([(NOT1_ID, None)])
+    assert cone == {SW1_ID, CL_ID, D1_ID, NOT1_ID}
+    assert network.get_fan_in_cone([(NOT2_ID, None)]) == {SW2_ID, NOT2_ID}
+
+    network.executed_devices = cone
+    plan = network.get_execution_plan()
+    assert set(plan.ranks) == cone
+    assert network.execute_network()
+    # Switches outside the cone are not executed by either engine
+    signal = network.get_output_signal(NOT2_ID, None)
+    for engine in [network.DICT_ENGINE, network.EVENT_ENGINE]:
+        network.engine = engine
+        assert network.execute_network()
+        devices.set_switch(SW2_ID, devices.HIGH)
+        assert network.execute_network()
+        assert network.get_output_signal(NOT2_ID, None) == signal
+        devices.set_switch(SW2_ID, devices.LOW)
+    network.engine = network.DICT_ENGINE
+    network.executed_devices = None
+    assert network.get_execution_plan() is not plan
+
+
+@pytest.mark.parametrize("seed", list(range(16)) + [144, 216, 292, 397])
+@pytest.mark.parametrize("feedback", [False, True])
+def test_merge_duplicate_gates_matches_default(seed, feedback):
+    """Test if merging duplicate gates gives the same results."""
+    number_of_gates = 20 + seed % 60
+    reference = make_random_network(seed, number_of_gates, feedback)
+    network = make_random_network(seed, number_of_gates, feedback)
+    network.merge_duplicate_gates = True
+
+    assert_same_simulation(reference, network)
+
+
+def test_merge_duplicate_gates_in_deep_chain(new_network):
+    """Test if a chain of duplicate pairs settles as quickly as before."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, I1, I2] = names.lookup(["Sw1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    previous_id = SW1_ID
+    for i in range(25):
+        # Both gates of each pair are fed by the second gate of the last
+        pair_ids = names.lookup(["A" + str(i), "B" + str(i)])
+        for device_id in pair_ids:
+            devices.make_device(device_id, devices.NAND, 2)
+            network.make_connection(previous_id, None, device_id, I1)
+            network.make_connection(previous_id, None, device_id, I2)
+        previous_id = pair_ids[1]
+
+    network.merge_duplicate_gates = True
+    assert len(network.get_execution_plan().duplicate_gates) == 25
+    assert network.execute_network()
+    # An odd number of inversions
+    assert network.get_output_signal(previous_id, None) == devices.LOW
+
+
+def test_merge_duplicate_gates(new_network):
+    """Test if duplicate gates are merged transitively and still give out."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [
+        SW1_ID,
+        SW2_ID,
+        AND1_ID,
+        AND2_ID,
+        NOT1_ID,
+        NOT2_ID,
+        OR1_ID,
+    ] = names.lookup(["Sw1", "Sw2", "And1", "And2", "Not1", "Not2", "Or1"])
+    [I1, I2] = names.lookup(["I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(SW2_ID, devices.SWITCH, 1)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(AND2_ID, devices.AND, 2)
+    devices.make_device(NOT1_ID, devices.NOT)
+    devices.make_device(NOT2_ID, devices.NOT)
+    devices.make_device(OR1_ID, devices.OR, 2)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(SW2_ID, None, AND1_ID, I2)
+    # The inputs of And2 are in the other order
+    network.make_connection(SW2_ID, None, AND2_ID, I1)
+    network.make_connection(SW1_ID, None, AND2_ID, I2)
+    network.make_connection(AND1_ID, None, NOT1_ID, I1)
+    network.make_connection(AND2_ID, None, NOT2_ID, I1)
+    network.make_connection(NOT2_ID, None, OR1_ID, I1)
+    network.make_connection(SW1_ID, None, OR1_ID, I2)
+
+    network.merge_duplicate_gates = True
+    plan = network.get_execution_plan()
+    assert plan.duplicate_gates == {AND2_ID: AND1_ID, NOT2_ID: NOT1_ID}
+    assert set(plan.alias_positions) == {AND2_ID, NOT2_ID}
+
+    executed = []
+    execute_not = network.execute_not
+
+    def record_not(device_id):
+        executed.append(device_id)
+        return execute_not(device_id)
+
+    network.execute_not = record_not
+    for signal in [devices.LOW, devices.HIGH]:
+        devices.set_switch(SW2_ID, signal)
+        assert network.execute_network()
+        assert network.get_output_signal(AND2_ID, None) == signal
+        assert network.get_output_signal(NOT2_ID, None) == (
+            network.invert_signal(signal)
+        )
+    assert NOT1_ID in executed
+    assert NOT2_ID not in executed
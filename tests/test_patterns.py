@@ -0,0 +1,68 @@
+"""Test the patterns module."""
+import itertools
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from test_levelized import make_random_logic
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_patterns_match_serial_simulation(seed):
+    """Test if every lane matches a serial simulation of its pattern."""
+    network = make_random_logic(seed)
+    devices = network.devices
+    switch_ids = devices.find_devices(devices.SWITCH)
+    pattern_network = network.get_pattern_network()
+
+    # Every combination of the switch states
+    patterns = [
+        dict(zip(switch_ids, states))
+        for states in itertools.product(
+            [devices.LOW, devices.HIGH], repeat=len(switch_ids)
+        )
+    ]
+    switch_vectors, lanes = pattern_network.pack_patterns(patterns)
+    output_vectors = pattern_network.simulate(switch_vectors, lanes)
+
+    for lane, pattern in enumerate(patterns):
+        for switch_id, state in pattern.items():
+            devices.set_switch(switch_id, state)
+        assert network.execute_network()
+        assert pattern_network.get_lane(output_vectors, lane) == {
+            output: network.get_output_signal(*output)
+            for output in output_vectors
+        }
+
+
+def test_pack_patterns():
+    """Test if the switch states are packed one bit per lane."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, SW2_ID] = names.lookup(["Sw1", "Sw2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+
+    pattern_network = network.get_pattern_network()
+    assert pattern_network.pack_patterns(
+        [
+            {SW1_ID: devices.HIGH, SW2_ID: devices.LOW},
+            {SW1_ID: devices.LOW, SW2_ID: devices.LOW},
+            {SW1_ID: devices.HIGH, SW2_ID: devices.HIGH},
+        ]
+    ) == ({SW1_ID: 0b101, SW2_ID: 0b100}, 3)
+
+
+def test_simulate_gives_none_for_feedback():
+    """Test if simulate returns None for logic with a feedback loop."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [NOR1, I1] = names.lookup(["Nor1", "I1"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    network.make_connection(NOR1, None, NOR1, I1)
+
+    assert network.get_pattern_network().simulate({}, 64) is None
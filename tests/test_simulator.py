@@ -0,0 +1,441 @@
+"""Test the simulator module."""
+import multiprocessing
+import random
+
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from simulator import Simulator
+
+
+def make_clocked_network(seed, half_periods):
+    """Return the devices, network and monitors of a clocked circuit.
+
+    Each clock drives a D-type whose QBAR is fed back to its DATA, through
+    an XOR gate with a switch. Every output is monitored.
+    """
+    random.seed(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [SW1_ID, SW2_ID, I1, I2] = names.lookup(["Sw1", "Sw2", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 0)
+    for i, half_period in enumerate(half_periods):
+        [clock_id, d_id, xor_id] = names.lookup(
+            ["Clk" + str(i), "D" + str(i), "Xor" + str(i)]
+        )
+        devices.make_device(clock_id, devices.CLOCK, half_period)
+        devices.make_device(d_id, devices.D_TYPE)
+        devices.make_device(xor_id, devices.XOR)
+        network.make_connection(clock_id, None, d_id, devices.CLK_ID)
+        network.make_connection(SW2_ID, None, d_id, devices.SET_ID)
+        network.make_connection(SW2_ID, None, d_id, devices.CLEAR_ID)
+        network.make_connection(d_id, devices.QBAR_ID, xor_id, I1)
+        network.make_connection(SW1_ID, None, xor_id, I2)
+        network.make_connection(xor_id, None, d_id, devices.DATA_ID)
+
+    for device_id in devices.find_devices():
+        for output_id in devices.get_device(device_id).outputs:
+            monitors.make_monitor(device_id, output_id)
+    return devices, network, monitors
+
+
+@pytest.mark.parametrize("skip_idle_d_types", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_run_matches_cycle_by_cycle(seed, skip_idle_d_types):
+    """Test if skipping idle cycles gives the same traces and state."""
+    half_periods = [3, 7, 40]
+    devices, network, monitors = make_clocked_network(seed, half_periods)
+    reference = make_clocked_network(seed, half_periods)
+    ref_devices, ref_network, ref_monitors = reference
+    simulator = Simulator(devices, network, monitors)
+    assert not simulator.skip_idle_d_types
+    simulator.skip_idle_d_types = skip_idle_d_types
+
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    for cycles, switch_state in [(50, 0), (37, 1), (100, 0)]:
+        devices.set_switch(SW1_ID, switch_state)
+        ref_devices.set_switch(SW1_ID, switch_state)
+        assert simulator.run(cycles)
+        assert network.skip_idle_d_types == skip_idle_d_types
+        for _ in range(cycles):
+            assert ref_network.execute_network()
+            ref_monitors.record_signals()
+
+        assert monitors.monitors_dictionary == ref_monitors.monitors_dictionary
+        for device_id in devices.find_devices():
+            device = devices.get_device(device_id)
+            ref_device = ref_devices.get_device(device_id)
+            assert device.outputs == ref_device.outputs
+            assert device.clock_counter == ref_device.clock_counter
+            assert device.dtype_memory == ref_device.dtype_memory
+
+
+def test_run_skips_idle_cycles():
+    """Test if only the cycles with a clock edge are executed."""
+    devices, network, monitors = make_clocked_network(0, [1000])
+    simulator = Simulator(devices, network, monitors)
+
+    executed = []
+    execute_network = network.execute_network
+
+    def record_execution():
+        executed.append(True)
+        return execute_network()
+
+    network.execute_network = record_execution
+    assert simulator.run(10000)
+    # One cycle per clock edge, plus the first cycle and the cycle after
+    # every edge, in which the D-type output changes
+    assert len(executed) <= 2 * 10 + 2
+    for trace in monitors.monitors_dictionary.values():
+        assert len(trace) == 10000
+
+    # Setting a switch or a cold start-up executes the next cycle
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    devices.set_switch(SW1_ID, devices.HIGH)
+    assert simulator.get_idle_cycles(1) == 0
+    assert simulator.run(1)
+    devices.cold_startup()
+    assert simulator.get_idle_cycles(1) == 0
+
+
+def test_run_oscillating_network():
+    """Test if run returns False for an oscillating network."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [NOR1, I1] = names.lookup(["Nor1", "I1"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    network.make_connection(NOR1, None, NOR1, I1)
+    monitors.make_monitor(NOR1, None)
+
+    simulator = Simulator(devices, network, monitors)
+    assert not simulator.run(10)
+    assert monitors.monitors_dictionary[(NOR1, None)] == []
+    assert simulator.get_oscillation_report() == (1, [NOR1], [[NOR1]])
+    assert simulator.get_oscillation_messages() == [
+        "Devices still changing: Nor1",
+        "Feedback loop: Nor1",
+    ]
+
+
+def test_run_deep_chain():
+    """Test if logic deeper than the iteration limit settles in a run."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [SW1_ID, I1] = names.lookup(["Sw1", "I1"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    not_ids = names.lookup(["Not" + str(i) for i in range(30)])
+    # Made in reverse order, so that each NOT executes before its input
+    for device_id in reversed(not_ids):
+        devices.make_device(device_id, devices.NOT)
+    previous_id = SW1_ID
+    for device_id in not_ids:
+        network.make_connection(previous_id, None, device_id, I1)
+        previous_id = device_id
+    monitors.make_monitor(previous_id, None)
+
+    simulator = Simulator(devices, network, monitors)
+    assert simulator.run(1)
+    assert monitors.monitors_dictionary[(previous_id, None)] == [devices.HIGH]
+    devices.set_switch(SW1_ID, devices.LOW)
+    assert simulator.run(1)
+    assert monitors.monitors_dictionary[(previous_id, None)] == [
+        devices.HIGH,
+        devices.LOW,
+    ]
+
+
+def test_oscillation_report_gives_cycle():
+    """Test if the oscillation report counts cycles from the cold start."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    # The switch closes a NOR loop, which oscillates once it is set to 0
+    [SW1, NOR1, I1, I2] = names.lookup(["Sw1", "Nor1", "I1", "I2"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(NOR1, devices.NOR, 2)
+    network.make_connection(SW1, None, NOR1, I1)
+    network.make_connection(NOR1, None, NOR1, I2)
+    simulator = Simulator(devices, network, monitors)
+
+    assert simulator.run(5)
+    assert simulator.get_oscillation_report() is None
+    devices.set_switch(SW1, devices.LOW)
+    assert not simulator.run(5)
+    assert simulator.get_oscillation_report() == (6, [NOR1], [[NOR1]])
+
+    devices.cold_startup()
+    assert not simulator.run(5)
+    assert simulator.get_oscillation_report()[0] == 1
+
+
+@pytest.mark.parametrize("detect_periods", [False, True])
+def test_run_repeats_periodic_states(detect_periods):
+    """Test if repeating periods gives the same traces and state."""
+    half_periods = [1, 2, 3]
+    devices, network, monitors = make_clocked_network(0, half_periods)
+    ref_devices, ref_network, ref_monitors = make_clocked_network(
+        0, half_periods
+    )
+    simulator = Simulator(devices, network, monitors)
+    simulator.detect_periods = detect_periods
+
+    executed = []
+    execute_network = network.execute_network
+
+    def record_execution():
+        executed.append(True)
+        return execute_network()
+
+    network.execute_network = record_execution
+    assert simulator.run(1000)
+    for _ in range(1000):
+        assert ref_network.execute_network()
+        ref_monitors.record_signals()
+
+    assert monitors.monitors_dictionary == ref_monitors.monitors_dictionary
+    for device_id in devices.find_devices():
+        device = devices.get_device(device_id)
+        ref_device = ref_devices.get_device(device_id)
+        assert device.outputs == ref_device.outputs
+        assert device.clock_counter == ref_device.clock_counter
+        assert device.dtype_memory == ref_device.dtype_memory
+    if detect_periods:
+        # The D-types divide the clocks, giving a period of at most 24
+        assert len(executed) < 100
+    else:
+        assert len(executed) == 1000
+
+
+@pytest.mark.parametrize(
+    "half_periods, period", [([1, 2, 3], 24), ([2, 7], 56), ([3, 5, 40], 480)]
+)
+def test_run_finds_smallest_period(half_periods, period):
+    """Test if the period repeated is the smallest period of the states."""
+    devices, network, monitors = make_clocked_network(0, half_periods)
+    simulator = Simulator(devices, network, monitors)
+
+    repeated = []
+    repeat_signals = monitors.repeat_signals
+
+    def record_repeat(each_period, repeats):
+        repeated.append(each_period)
+        return repeat_signals(each_period, repeats)
+
+    monitors.repeat_signals = record_repeat
+    assert simulator.run(5000)
+    assert repeated == [period]
+
+
+def make_separate_blocks(seed, half_periods):
+    """Return the devices, network and monitors of independent blocks.
+
+    Each block is a clock driving a D-type whose QBAR is fed back to its
+    DATA through an XOR gate with the switch of the block.
+    """
+    random.seed(seed)
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    [I1, I2] = names.lookup(["I1", "I2"])
+    for i, half_period in enumerate(half_periods):
+        [switch_id, clock_id, d_id, xor_id] = names.lookup(
+            ["Sw" + str(i), "Clk" + str(i), "D" + str(i), "Xor" + str(i)]
+        )
+        devices.make_device(switch_id, devices.SWITCH, 0)
+        devices.make_device(clock_id, devices.CLOCK, half_period)
+        devices.make_device(d_id, devices.D_TYPE)
+        devices.make_device(xor_id, devices.XOR)
+        network.make_connection(clock_id, None, d_id, devices.CLK_ID)
+        network.make_connection(switch_id, None, d_id, devices.SET_ID)
+        network.make_connection(switch_id, None, d_id, devices.CLEAR_ID)
+        network.make_connection(d_id, devices.QBAR_ID, xor_id, I1)
+        network.make_connection(switch_id, None, xor_id, I2)
+        network.make_connection(xor_id, None, d_id, devices.DATA_ID)
+        monitors.make_monitor(xor_id, None)
+        monitors.make_monitor(d_id, devices.Q_ID)
+    return devices, network, monitors
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="worker processes are forked",
+)
+def test_parallel_run_matches_run():
+    """Test if running the components in processes gives the same results."""
+    half_periods = [2, 3, 5, 7]
+    devices, network, monitors = make_separate_blocks(0, half_periods)
+    reference = make_separate_blocks(0, half_periods)
+    ref_devices, ref_network, ref_monitors = reference
+    simulator = Simulator(devices, network, monitors, processes=3)
+    ref_simulator = Simulator(ref_devices, ref_network, ref_monitors)
+    assert len(simulator._share_components()) == 3
+
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    for cycles, switch_state in [(20, 0), (13, 1)]:
+        devices.set_switch(SW1_ID, switch_state)
+        ref_devices.set_switch(SW1_ID, switch_state)
+        assert simulator.run(cycles)
+        assert ref_simulator.run(cycles)
+        assert list(monitors.monitors_dictionary.items()) == list(
+            ref_monitors.monitors_dictionary.items()
+        )
+        for device_id in devices.find_devices():
+            device = devices.get_device(device_id)
+            ref_device = ref_devices.get_device(device_id)
+            assert device.outputs == ref_device.outputs
+            assert device.clock_counter == ref_device.clock_counter
+            assert device.dtype_memory == ref_device.dtype_memory
+    assert simulator.cycles_completed == 33
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="worker processes are forked",
+)
+def test_parallel_run_reports_oscillation():
+    """Test if an oscillating component fails a run in processes."""
+    devices, network, monitors = make_separate_blocks(0, [2, 3])
+    names = devices.names
+    [NOR1, I1] = names.lookup(["Nor1", "I1"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    network.make_connection(NOR1, None, NOR1, I1)
+    simulator = Simulator(devices, network, monitors, processes=2)
+
+    assert not simulator.run(10)
+    assert simulator.get_oscillation_report() == (1, [NOR1], [[NOR1]])
+    for trace in monitors.monitors_dictionary.values():
+        assert trace == []
+
+
+def test_run_pruned_to_monitors():
+    """Test if only the devices that affect the monitors are executed."""
+    devices, network, monitors = make_separate_blocks(0, [2, 3, 5])
+    reference = make_separate_blocks(0, [2, 3, 5])
+    ref_devices, ref_network, ref_monitors = reference
+    [XOR0_ID, D0_ID, XOR1_ID, CLK0_ID] = devices.names.lookup(
+        ["Xor0", "D0", "Xor1", "Clk0"]
+    )
+    for each_monitors in [monitors, ref_monitors]:
+        each_monitors.remove_monitor(XOR0_ID, None)
+        each_monitors.remove_monitor(D0_ID, devices.Q_ID)
+    simulator = Simulator(devices, network, monitors)
+    simulator.prune_to_monitors = True
+    ref_simulator = Simulator(ref_devices, ref_network, ref_monitors)
+    clock_counter = devices.get_device(CLK0_ID).clock_counter
+
+    assert simulator.run(20)
+    assert ref_simulator.run(20)
+    assert monitors.monitors_dictionary == ref_monitors.monitors_dictionary
+    # The first block is outside the cone of the monitors
+    assert XOR1_ID in network.executed_devices
+    assert XOR0_ID not in network.executed_devices
+    assert D0_ID not in network.get_execution_plan().ranks
+    # Skipped cycles do not advance the clocks outside the cone
+    assert devices.get_device(CLK0_ID).clock_counter == clock_counter
+
+    # The cone is found again when a monitor is made
+    assert monitors.make_monitor(XOR0_ID, None, 20) == monitors.NO_ERROR
+    assert simulator.run(1)
+    assert XOR0_ID in network.executed_devices
+    assert D0_ID in network.get_execution_plan().ranks
+
+
+def read_vcd_signals(path, devices):
+    """Return {signal name: list of levels} of every signal in a VCD file."""
+    names = {}
+    changes = []  # (time, identifier, level)
+    levels = {"0": devices.LOW, "1": devices.HIGH, "x": devices.BLANK}
+    time = 0
+    for line in path.read_text().splitlines():
+        if line.startswith("$var"):
+            [_, _, _, identifier, name, _] = line.split()
+            names[identifier] = name
+        elif line.startswith("#"):
+            time = int(line[1:])
+        elif line and line[0] in levels:
+            changes.append((time, line[1:], levels[line[0]]))
+
+    signals = {name: [] for name in names.values()}
+    for change_time, identifier, level in changes:
+        signal_list = signals[names[identifier]]
+        signal_list.extend(signal_list[-1:] * (change_time - len(signal_list)))
+        signal_list.append(level)
+    for signal_list in signals.values():
+        signal_list.extend(signal_list[-1:] * (time - len(signal_list)))
+    return signals
+
+
+@pytest.mark.parametrize("tail_cycles", [None, 10, 1000])
+def test_run_dumps_signals(tmp_path, tail_cycles):
+    """Test if a dump holds the same signals as the full traces."""
+    half_periods = [3, 5, 40]
+    devices, network, monitors = make_clocked_network(0, half_periods)
+    ref_devices, ref_network, ref_monitors = make_clocked_network(
+        0, half_periods
+    )
+    simulator = Simulator(devices, network, monitors)
+    ref_simulator = Simulator(ref_devices, ref_network, ref_monitors)
+    path = tmp_path / "signals.vcd"
+    assert monitors.start_dump(path, tail_cycles)
+
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    for cycles, switch_state in [(500, 0), (37, 1), (2000, 0)]:
+        devices.set_switch(SW1_ID, switch_state)
+        ref_devices.set_switch(SW1_ID, switch_state)
+        assert simulator.run(cycles)
+        assert ref_simulator.run(cycles)
+    monitors.stop_dump()
+
+    signals = read_vcd_signals(path, devices)
+    for monitor, signal_trace in ref_monitors.monitors_dictionary.items():
+        name = devices.get_signal_name(*monitor)
+        assert signals[name] == signal_trace
+        kept_trace = monitors.monitors_dictionary[monitor]
+        if tail_cycles is None:
+            assert kept_trace == signal_trace
+        else:
+            assert tail_cycles <= len(kept_trace) <= 2 * tail_cycles
+            assert (
+                kept_trace
+                == signal_trace[len(signal_trace) - len(kept_trace) :]
+            )
+
+
+def test_monitors_are_kept_in_step_with_dump(tmp_path):
+    """Test if no monitor can be made while dumping, or past held cycles."""
+    devices, network, monitors = make_clocked_network(0, [3])
+    simulator = Simulator(devices, network, monitors)
+    [SW1_ID] = devices.names.lookup(["Sw1"])
+    monitors.remove_monitor(SW1_ID, None)
+
+    assert monitors.start_dump(tmp_path / "signals.vcd", 10)
+    assert (
+        monitors.make_monitor(SW1_ID, None, simulator.cycles_completed)
+        == monitors.DUMP_STARTED
+    )
+    assert simulator.run(50)
+    monitors.stop_dump()
+
+    held_cycles = monitors.get_held_cycles()
+    assert 10 <= held_cycles < simulator.cycles_completed
+    assert (
+        monitors.make_monitor(SW1_ID, None, simulator.cycles_completed)
+        == monitors.NO_ERROR
+    )
+    assert monitors.get_held_cycles() == held_cycles
+    assert len(monitors.monitors_dictionary[(SW1_ID, None)]) == held_cycles
@@ -0,0 +1,183 @@
+"""Test the store module."""
+import random
+import tracemalloc
+
+import pytest
+
+from names import Names
+from devices import Devices
+
+
+@pytest.fixture
+def devices_with_items():
+    """Return a Devices class instance with a gate, a D-type and a switch."""
+    new_names = Names()
+    new_devices = Devices(new_names)
+
+    [AND1_ID, D1_ID, SW1_ID] = new_names.lookup(["And1", "D1", "Sw1"])
+
+    new_devices.make_device(AND1_ID, new_devices.AND, 2)
+    new_devices.make_device(D1_ID, new_devices.D_TYPE)
+    new_devices.make_device(SW1_ID, new_devices.SWITCH, 1)
+
+    return new_devices
+
+
+def test_views_behave_as_dictionaries(devices_with_items):
+    """Test if the inputs and outputs views read and write the store."""
+    devices = devices_with_items
+    names = devices.names
+    [AND1_ID, D1_ID, SW1_ID, I1_ID, I2_ID] = names.lookup(
+        ["And1", "D1", "Sw1", "I1", "I2"]
+    )
+    and_device = devices.get_device(AND1_ID)
+
+    assert and_device.inputs == {I1_ID: None, I2_ID: None}
+    and_device.inputs[I1_ID] = (D1_ID, devices.Q_ID)
+    and_device.inputs[I2_ID] = (SW1_ID, None)
+    assert dict(and_device.inputs) == {
+        I1_ID: (D1_ID, devices.Q_ID),
+        I2_ID: (SW1_ID, None),
+    }
+    assert devices.get_device(AND1_ID).inputs[I2_ID] == (SW1_ID, None)
+
+    and_device.outputs[None] = devices.HIGH
+    assert devices.get_device(AND1_ID).outputs == {None: devices.HIGH}
+    with pytest.raises(KeyError):
+        and_device.outputs[devices.Q_ID]
+
+    assert devices.get_device(SW1_ID).switch_state == devices.HIGH
+    assert devices.get_device(AND1_ID).switch_state is None
+    assert devices.get_device(AND1_ID) == and_device
+    assert devices.get_device(SW1_ID) != and_device
+
+
+def test_adding_ports_moves_them(devices_with_items):
+    """Test if ports added to an earlier device keep their values."""
+    devices = devices_with_items
+    names = devices.names
+    [AND1_ID, SW1_ID, I1_ID, I2_ID, I3_ID, X_ID] = names.lookup(
+        ["And1", "Sw1", "I1", "I2", "I3", "X"]
+    )
+    and_device = devices.get_device(AND1_ID)
+    and_device.inputs[I1_ID] = (SW1_ID, None)
+    and_device.outputs[None] = devices.HIGH
+    switch_outputs = dict(devices.get_device(SW1_ID).outputs)
+
+    assert devices.add_input(AND1_ID, I3_ID)
+    assert devices.add_output(AND1_ID, X_ID, devices.RISING)
+    assert list(and_device.inputs) == [I1_ID, I2_ID, I3_ID]
+    assert and_device.inputs == {
+        I1_ID: (SW1_ID, None),
+        I2_ID: None,
+        I3_ID: None,
+    }
+    assert and_device.outputs == {None: devices.HIGH, X_ID: devices.RISING}
+    assert devices.get_device(SW1_ID).outputs == switch_outputs
+
+    del and_device.inputs[I2_ID]
+    del and_device.outputs[None]
+    assert and_device.inputs == {I1_ID: (SW1_ID, None), I3_ID: None}
+    assert and_device.outputs == {X_ID: devices.RISING}
+
+
+def test_devices_share_layouts(devices_with_items):
+    """Test if devices with the same ports share their layout."""
+    devices = devices_with_items
+    store = devices.store
+    names = devices.names
+    [AND1_ID, AND2_ID, OR1_ID] = names.lookup(["And1", "And2", "Or1"])
+    devices.make_device(AND2_ID, devices.AND, 2)
+    devices.make_device(OR1_ID, devices.OR, 2)
+
+    layouts = [
+        store.layouts[devices.get_store_index(device_id)]
+        for device_id in [AND1_ID, AND2_ID, OR1_ID]
+    ]
+    assert layouts[0] == layouts[1] == layouts[2]
+    assert store.get_output_position(
+        devices.get_store_index(AND2_ID), None
+    ) != store.get_output_position(devices.get_store_index(AND1_ID), None)
+
+
+def test_remove_device(devices_with_items):
+    """Test if a removed device leaves the other devices unchanged."""
+    devices = devices_with_items
+    names = devices.names
+    [AND1_ID, D1_ID, SW1_ID] = names.lookup(["And1", "D1", "Sw1"])
+
+    assert devices.remove_device(D1_ID)
+    assert not devices.remove_device(D1_ID)
+    assert devices.get_device(D1_ID) is None
+    assert devices.find_devices() == [AND1_ID, SW1_ID]
+    assert devices.find_devices(devices.D_TYPE) == []
+    assert [device.device_id for device in devices.devices_list] == [
+        AND1_ID,
+        SW1_ID,
+    ]
+    assert devices.get_device(SW1_ID).outputs == {None: devices.LOW}
+    assert devices.get_device(-1) is None
+    assert devices.get_device(None) is None
+
+
+def test_fanouts_follow_changes(devices_with_items):
+    """Test if the fanouts are found again after the ports change."""
+    devices = devices_with_items
+    store = devices.store
+    names = devices.names
+    [AND1_ID, D1_ID, SW1_ID, I1_ID, I2_ID, I3_ID] = names.lookup(
+        ["And1", "D1", "Sw1", "I1", "I2", "I3"]
+    )
+    and_device = devices.get_device(AND1_ID)
+    and_device.inputs[I1_ID] = (SW1_ID, None)
+    devices.get_device(D1_ID).inputs[devices.DATA_ID] = (SW1_ID, None)
+    switch_index = devices.get_store_index(SW1_ID)
+
+    assert store.get_fanouts(switch_index, None) == [
+        (AND1_ID, I1_ID),
+        (D1_ID, devices.DATA_ID),
+    ]
+    # The inputs of the AND gate are moved to the end of the arrays
+    assert devices.add_input(AND1_ID, I3_ID)
+    and_device.inputs[I3_ID] = (SW1_ID, None)
+    and_device.inputs[I1_ID] = None
+    assert store.get_fanouts(switch_index, None) == [
+        (AND1_ID, I3_ID),
+        (D1_ID, devices.DATA_ID),
+    ]
+    assert store.get_fanouts(switch_index, I2_ID) == []
+    assert devices.remove_device(D1_ID)
+    assert store.get_fanouts(switch_index, None) == [(AND1_ID, I3_ID)]
+
+
+def test_memory_per_device():
+    """Test if a large network keeps each device in under 100 bytes."""
+    names = Names()
+    devices = Devices(names)
+    [I1_ID, I2_ID] = names.lookup(["I1", "I2"])
+    switch_ids = names.lookup(["Sw" + str(i) for i in range(16)])
+    gate_ids = names.lookup(["G" + str(i) for i in range(5000)])
+    # Each gate is driven by two earlier devices
+    generator = random.Random(0)
+    sources = switch_ids + gate_ids
+    gate_inputs = [
+        [
+            (sources[generator.randrange(len(switch_ids) + number)], None)
+            for input_id in [I1_ID, I2_ID]
+        ]
+        for number in range(len(gate_ids))
+    ]
+
+    tracemalloc.start()
+    for switch_id in switch_ids:
+        devices.make_device(switch_id, devices.SWITCH, 0)
+    for gate_id, inputs in zip(gate_ids, gate_inputs):
+        devices.make_device(gate_id, devices.NAND, 2)
+        gate = devices.get_device(gate_id)
+        gate.inputs[I1_ID], gate.inputs[I2_ID] = inputs
+    devices.store.update_fanouts()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Python objects for each device took about 770 bytes
+    assert allocated / (len(switch_ids) + len(gate_ids)) < 100
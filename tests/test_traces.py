@@ -0,0 +1,91 @@
+"""Test the traces module."""
+import pickle
+
+import pytest
+
+from traces import SignalTrace, RunLengthTrace, BLANK
+
+
+@pytest.mark.parametrize("trace_class", [SignalTrace, RunLengthTrace])
+def test_trace_behaves_as_sequence(trace_class):
+    """Test if a trace appends, compares and slices like a list."""
+    signal_trace = trace_class([0, 1])
+    signal_trace.append(1)
+    signal_trace.append(0, 3)
+    signal_trace.append(None)
+    signal_trace.extend([1, None])
+    assert signal_trace == [0, 1, 1, 0, 0, 0, BLANK, 1, BLANK]
+    assert signal_trace != [0, 1]
+    assert len(signal_trace) == 9
+    assert signal_trace[1] == 1
+    assert signal_trace[-1] == BLANK
+    assert signal_trace[1:3] == trace_class([1, 1])
+    assert signal_trace[::4] == [0, 0, BLANK]
+    assert list(signal_trace) == signal_trace.tolist()
+
+    signal_trace.extend(signal_trace[:2])
+    assert signal_trace[-2:] == [0, 1]
+    assert pickle.loads(pickle.dumps(signal_trace)) == signal_trace
+
+
+@pytest.mark.parametrize("trace_class", [SignalTrace, RunLengthTrace])
+def test_repeat(trace_class):
+    """Test if the last period of the trace is repeated."""
+    signal_trace = trace_class([BLANK, 0, 1, 1])
+    signal_trace.repeat(3, 2)
+    assert signal_trace == [BLANK, 0, 1, 1, 0, 1, 1, 0, 1, 1]
+    signal_trace.repeat(3, 0)
+    assert len(signal_trace) == 10
+    assert (
+        signal_trace.get_runs()
+        == [(BLANK, 1), (0, 1), (1, 2)]
+        + [
+            (0, 1),
+            (1, 2),
+        ]
+        * 2
+    )
+
+
+def test_buffer_is_shared():
+    """Test if the buffer gives the levels without copying them."""
+    signal_trace = SignalTrace([0, 1, 0])
+    buffer = signal_trace.get_buffer()
+    assert buffer.readonly
+    assert buffer.itemsize == 1
+    assert buffer.tolist() == [0, 1, 0]
+    del buffer
+
+    copied_trace = signal_trace.copy()
+    copied_trace.append(1)
+    assert signal_trace == [0, 1, 0]
+
+    # One byte for each level
+    signal_trace.append(1, 100000)
+    assert signal_trace.get_memory_size() < 110000
+
+
+def test_run_length_trace():
+    """Test if a run-length trace stores each run of levels once."""
+    signal_trace = RunLengthTrace()
+    signal_trace.append(BLANK, 10**9)
+    signal_trace.append(0, 10**9)
+    signal_trace.append(0)
+    assert len(signal_trace) == 2 * 10**9 + 1
+    assert signal_trace.get_runs() == [(BLANK, 10**9), (0, 10**9 + 1)]
+    assert signal_trace[10**9 - 1] == BLANK
+    assert signal_trace[10**9] == 0
+    assert signal_trace[-1] == 0
+    with pytest.raises(IndexError):
+        signal_trace[2 * 10**9 + 1]
+
+    # A constant period is repeated in a single run
+    signal_trace.repeat(2, 10**9)
+    assert signal_trace.get_runs() == [(BLANK, 10**9), (0, 3 * 10**9 + 1)]
+    assert signal_trace.get_memory_size() < 1000
+
+    signal_trace = RunLengthTrace([0, 0, 1, 1, 1, 0])
+    assert signal_trace[1:4].get_runs() == [(0, 1), (1, 2)]
+    assert signal_trace.get_buffer().tolist() == [0, 0, 1, 1, 1, 0]
+    assert signal_trace == SignalTrace([0, 0, 1, 1, 1, 0])
+    assert pickle.loads(pickle.dumps(signal_trace)) == signal_trace
@@ -0,0 +1,57 @@
+"""Test the vcd module."""
+from names import Names
+from devices import Devices
+from vcd import VcdWriter
+
+
+def test_write_signals(tmp_path):
+    """Test if only the changes are written under the cycle they are in."""
+    devices = Devices(Names())
+    path = tmp_path / "signals.vcd"
+    vcd_writer = VcdWriter(devices, path, ["Sw1", "D1.Q"])
+    vcd_writer.write_signals([devices.LOW, None], 3)
+    vcd_writer.write_signals([devices.LOW, devices.HIGH])
+    vcd_writer.write_signals([devices.HIGH, devices.HIGH], 2)
+    vcd_writer.close()
+
+    lines = path.read_text().splitlines()
+    assert "$var wire 1 ! Sw1 $end" in lines
+    assert '$var wire 1 " D1.Q $end' in lines
+    assert lines[lines.index("$enddefinitions $end") + 1 :] == [
+        "#0",
+        "0!",
+        'x"',
+        "#3",
+        '1"',
+        "#4",
+        "1!",
+        "#6",
+    ]
+
+
+def test_edges_are_written_as_levels(tmp_path):
+    """Test if RISING and FALLING are written as the levels they settle to."""
+    devices = Devices(Names())
+    path = tmp_path / "signals.vcd"
+    vcd_writer = VcdWriter(devices, path, ["Clk1"])
+    for signal in [devices.RISING, devices.HIGH, devices.FALLING, devices.LOW]:
+        vcd_writer.write_signals([signal])
+    vcd_writer.close()
+
+    lines = path.read_text().splitlines()
+    assert lines[lines.index("$enddefinitions $end") + 1 :] == [
+        "#0",
+        "1!",
+        "#2",
+        "0!",
+        "#4",
+    ]
+
+
+def test_identifiers_are_unique():
+    """Test if every signal number is given a different identifier."""
+    identifiers = [VcdWriter._get_identifier(n) for n in range(20000)]
+    assert identifiers[:2] == ["!", '"']
+    assert identifiers[94] == "!!"
+    assert len(set(identifiers)) == len(identifiers)
+    assert all(" " not in identifier for identifier in identifiers)
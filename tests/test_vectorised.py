@@ -0,0 +1,47 @@
+"""Test the vectorised module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from test_netlist import make_random_network, assert_same_simulation
+
+pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("feedback", [False, True])
+def test_vectorised_engine_matches_dict_engine(seed, feedback):
+    """Test if the vectorised engine gives the same results as the default."""
+    reference = make_random_network(seed, feedback=feedback)
+    network = make_random_network(seed, feedback=feedback)
+    network.engine = network.VECTORISED_ENGINE
+
+    assert_same_simulation(reference, network)
+
+
+def test_waves_follow_execution_order():
+    """Test if gates reading earlier gates of their kind are in later waves."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    [SW1_ID, NOT1_ID, NOT2_ID, NOT3_ID, I1] = names.lookup(
+        ["Sw1", "Not1", "Not2", "Not3", "I1"]
+    )
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    for not_id in [NOT1_ID, NOT2_ID, NOT3_ID]:
+        devices.make_device(not_id, devices.NOT)
+    # Not1 reads the later Not2, Not2 reads Sw1 and Not3 reads Not2
+    network.make_connection(NOT2_ID, None, NOT1_ID, I1)
+    network.make_connection(SW1_ID, None, NOT2_ID, I1)
+    network.make_connection(NOT2_ID, None, NOT3_ID, I1)
+
+    vectorised = network.get_vectorised_network()
+    waves = vectorised.waves[vectorised.compiled.NOT]
+    assert [list(numbers) for numbers, _, _ in waves] == [[0, 1], [2]]
+
+    network.engine = network.VECTORISED_ENGINE
+    assert network.execute_network()
+    assert network.get_output_signal(NOT1_ID, None) == devices.HIGH
+    assert network.get_output_signal(NOT2_ID, None) == devices.LOW
+    assert network.get_output_signal(NOT3_ID, None) == devices.HIGH